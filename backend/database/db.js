@@ -3,6 +3,7 @@ const fs = require("fs");
 const path = require("path");
 const Database = require("better-sqlite3");
 const { app } = require("electron");
+const { parseLocal, seriesOccurrences } = require("./recurrence");
 
 let db = null;
 
@@ -27,6 +28,65 @@ function initDatabase() {
   return db;
 }
 
+// Times SQLite cannot parse get sentinel bounds so they always remain
+// candidates; range queries re-check the text predicate either way.
+const EPOCH_MIN = -100000000000;
+const EPOCH_MAX = 100000000000;
+
+function epochExpr(expr, sentinel) {
+  return `COALESCE(CAST(strftime('%s', ${expr}) AS INTEGER), ${sentinel})`;
+}
+
+// Largest UTC offset in use (+14:00): events_rtree boxes are built from the
+// text as written, so a naive local time can sit this far from its UTC epoch.
+const MAX_UTC_OFFSET = 14 * 60 * 60;
+
+function hasOffsetExpr(expr) {
+  return `(${expr} GLOB '*Z' OR ${expr} GLOB '*[+-][0-9][0-9]:[0-9][0-9]')`;
+}
+
+/**
+ * SET clause for the normalized time columns of an events row alias:
+ * UTC epoch seconds (naive times are local, suffixed ones taken as-is) and
+ * the local day of start_time. Mirrors calendar_interaction/schema.py.
+ */
+function normalizedSet(row) {
+  const utc = (col) =>
+    `CAST(strftime('%s', ${row}.${col}, CASE WHEN ${hasOffsetExpr(`${row}.${col}`)} THEN '+0 seconds' ELSE 'utc' END) AS INTEGER)`;
+  const start = `${row}.start_time`;
+  return `
+      start_utc = ${utc("start_time")},
+      end_utc   = ${utc("end_time")},
+      day_key   = CASE WHEN ${hasOffsetExpr(start)} THEN date(${start}, 'localtime') ELSE date(${start}) END`;
+}
+
+/**
+ * R*Tree box for an events row alias ("new", "e", ...). R*Tree rejects
+ * min > max, so a reversed event gets the covering box.
+ */
+function rtreeBox(row) {
+  const start = epochExpr(`${row}.start_time`, EPOCH_MIN);
+  const end = epochExpr(`${row}.end_time`, EPOCH_MAX);
+  return `min(${start}, ${end}), max(${start}, ${end})`;
+}
+
+// Columns whose changes are recorded in event_changes (see createTables)
+const CHANGELOG_COLUMNS = [
+  "title", "description", "start_time", "end_time", "all_day",
+  "location", "rrule", "uid",
+];
+
+/**
+ * Comma-separated list of the CHANGELOG_COLUMNS an UPDATE changed.
+ * Mirrors calendar_interaction/schema.py.
+ */
+function changedColumnsExpr() {
+  const parts = CHANGELOG_COLUMNS.map(
+    (c) => `CASE WHEN old.${c} IS NOT new.${c} THEN '${c},' ELSE '' END`
+  );
+  return `rtrim(${parts.join(" || ")}, ',')`;
+}
+
 /**
  * Create tables if they don't exist.
  */
@@ -46,6 +106,195 @@ function createTables() {
     );
   `);
 
+  // Normalized times: start_utc/end_utc (UTC epoch seconds) and day_key
+  // (local day of start_time), filled in by triggers because SQLite does
+  // not allow 'utc'/'localtime' in generated columns.
+  const columns = new Set(
+    db.prepare(`PRAGMA table_info(events)`).all().map((c) => c.name)
+  );
+  for (const [name, decl] of [
+    ["start_utc", "INTEGER"],
+    ["end_utc", "INTEGER"],
+    ["day_key", "TEXT"],
+    ["rrule", "TEXT"],
+    ["uid", "TEXT"],
+  ]) {
+    if (!columns.has(name)) {
+      db.exec(`ALTER TABLE events ADD COLUMN ${name} ${decl}`);
+    }
+  }
+
+  db.exec(`
+    CREATE INDEX IF NOT EXISTS idx_events_utc ON events(start_utc, end_utc);
+    CREATE INDEX IF NOT EXISTS idx_events_day_key ON events(day_key);
+
+    CREATE TRIGGER IF NOT EXISTS events_times_ai AFTER INSERT ON events BEGIN
+      UPDATE events
+      SET ${normalizedSet("new")}
+      WHERE id = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_times_au AFTER UPDATE OF start_time, end_time ON events BEGIN
+      UPDATE events
+      SET ${normalizedSet("new")}
+      WHERE id = new.id;
+    END;
+
+    UPDATE events
+    SET ${normalizedSet("events")}
+    WHERE day_key IS NULL;
+  `);
+
+  // Recurring series (rrule on the master row) are expanded on read
+  // (getEventsInRange here, recurrence.py on the Python side); these cache
+  // the Python side's per-month expansions and are cleared on edit.
+  db.exec(`
+    CREATE INDEX IF NOT EXISTS idx_events_rrule ON events(start_utc) WHERE rrule IS NOT NULL;
+
+    CREATE TABLE IF NOT EXISTS event_occurrences (
+      event_id    INTEGER NOT NULL,
+      bucket      TEXT NOT NULL,     -- local month of start_time, 'YYYY-MM'
+      start_time  TEXT NOT NULL,     -- naive local ISO 8601
+      end_time    TEXT NOT NULL,
+      start_utc   INTEGER,
+      end_utc     INTEGER,
+      PRIMARY KEY (event_id, start_time)
+    );
+
+    CREATE TABLE IF NOT EXISTS occurrence_windows (
+      event_id    INTEGER NOT NULL,
+      bucket      TEXT NOT NULL,
+      PRIMARY KEY (event_id, bucket)
+    );
+
+    CREATE TRIGGER IF NOT EXISTS events_occurrences_au AFTER UPDATE OF start_time, end_time, rrule ON events BEGIN
+      DELETE FROM occurrence_windows WHERE event_id = old.id;
+      DELETE FROM event_occurrences WHERE event_id = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_occurrences_ad AFTER DELETE ON events BEGIN
+      DELETE FROM occurrence_windows WHERE event_id = old.id;
+      DELETE FROM event_occurrences WHERE event_id = old.id;
+    END;
+  `);
+
+  // iCalendar UID of events imported from .ics files; unique so that
+  // re-importing a file updates events instead of duplicating them.
+  db.exec(`
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_events_uid ON events(uid) WHERE uid IS NOT NULL;
+  `);
+
+  // Change log: one row per insert/update/delete on events, so the UI and
+  // caches can apply deltas (changes since a version) instead of re-reading
+  // ranges. Only user-visible columns count as changes. Mirrors
+  // calendar_interaction/schema.py; pruned by calendar_interaction/changelog.py.
+  db.exec(`
+    CREATE TABLE IF NOT EXISTS event_changes (
+      version     INTEGER PRIMARY KEY AUTOINCREMENT,
+      op          TEXT NOT NULL,        -- 'insert' | 'update' | 'delete'
+      event_id    INTEGER NOT NULL,
+      columns     TEXT,                 -- changed columns (update), comma-separated
+      changed_at  INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+    );
+
+    CREATE TABLE IF NOT EXISTS event_changes_state (
+      id              INTEGER PRIMARY KEY CHECK (id = 1),
+      pruned_through  INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO event_changes_state (id, pruned_through) VALUES (1, 0);
+
+    CREATE TRIGGER IF NOT EXISTS events_changes_ai AFTER INSERT ON events BEGIN
+      INSERT INTO event_changes (op, event_id) VALUES ('insert', new.id);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_changes_au AFTER UPDATE ON events
+    WHEN ${CHANGELOG_COLUMNS.map((c) => `old.${c} IS NOT new.${c}`).join(" OR ")}
+    BEGIN
+      INSERT INTO event_changes (op, event_id, columns)
+      VALUES ('update', new.id, ${changedColumnsExpr()});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_changes_ad AFTER DELETE ON events BEGIN
+      INSERT INTO event_changes (op, event_id) VALUES ('delete', old.id);
+    END;
+  `);
+
+  // Full-text index over title/description/location (external content:
+  // rowid = events.id), kept in sync by triggers. Mirrors
+  // calendar_interaction/schema.py. 'delete' must be given the old values.
+  db.exec(`
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+      title, description, location,
+      content = 'events', content_rowid = 'id',
+      tokenize = 'unicode61 remove_diacritics 2',
+      prefix = '2 3'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+      INSERT INTO events_fts (rowid, title, description, location)
+      VALUES (new.id, new.title, new.description, new.location);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF id, title, description, location ON events BEGIN
+      INSERT INTO events_fts (events_fts, rowid, title, description, location)
+      VALUES ('delete', old.id, old.title, old.description, old.location);
+      INSERT INTO events_fts (rowid, title, description, location)
+      VALUES (new.id, new.title, new.description, new.location);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+      INSERT INTO events_fts (events_fts, rowid, title, description, location)
+      VALUES ('delete', old.id, old.title, old.description, old.location);
+    END;
+  `);
+
+  // Rebuild from events if rows were written before the index existed
+  const ftsIndexed = db.prepare(`SELECT count(*) AS n FROM events_fts_docsize`).get().n;
+  const ftsTotal = db.prepare(`SELECT count(*) AS n FROM events`).get().n;
+  if (ftsIndexed !== ftsTotal) {
+    db.exec(`INSERT INTO events_fts (events_fts) VALUES ('rebuild');`);
+  }
+
+  // Interval index over [start, end] in epoch seconds for range queries.
+  // Kept in sync with events by triggers. Mirrors
+  // calendar_interaction/schema.py (the Python side creates the same objects).
+  db.exec(`
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(
+      id,
+      start_epoch, end_epoch
+    );
+
+    CREATE TRIGGER IF NOT EXISTS events_rtree_ai AFTER INSERT ON events BEGIN
+      INSERT OR REPLACE INTO events_rtree (id, start_epoch, end_epoch)
+      VALUES (new.id, ${rtreeBox("new")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_rtree_au AFTER UPDATE OF id, start_time, end_time ON events BEGIN
+      DELETE FROM events_rtree WHERE id = old.id;
+      INSERT OR REPLACE INTO events_rtree (id, start_epoch, end_epoch)
+      VALUES (new.id, ${rtreeBox("new")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS events_rtree_ad AFTER DELETE ON events BEGIN
+      DELETE FROM events_rtree WHERE id = old.id;
+    END;
+  `);
+
+  // Backfill rows written before the index existed
+  const indexed = db.prepare(`SELECT count(*) AS n FROM events_rtree`).get().n;
+  const total = db.prepare(`SELECT count(*) AS n FROM events`).get().n;
+  if (indexed !== total) {
+    db.exec(`
+      BEGIN;
+      DELETE FROM events_rtree WHERE id NOT IN (SELECT id FROM events);
+      INSERT INTO events_rtree (id, start_epoch, end_epoch)
+      SELECT e.id, ${rtreeBox("e")}
+      FROM events e
+      WHERE e.id NOT IN (SELECT id FROM events_rtree);
+      COMMIT;
+    `);
+  }
+
   // Settings table (for OpenAI API key etc.)
   db.exec(`
     CREATE TABLE IF NOT EXISTS settings (
@@ -57,15 +306,129 @@ function createTables() {
 
 /* ---------- EVENTS API ---------- */
 
+// Series masters that may have occurrences before a range's end. Written so
+// the planner scans the partial idx_events_rrule (masters only).
+const RECURRING_MASTERS_SQL = `
+  SELECT *
+  FROM events
+  WHERE rrule IS NOT NULL AND rrule != ''
+    AND IFNULL(start_utc < @end_utc, 1)
+`;
+
 function getEventsInRange(startIso, endIso) {
+  // events_rtree narrows to candidate ids (a superset: its float coordinates
+  // are rounded outward and the window is widened by MAX_UTC_OFFSET), then
+  // the UTC columns decide. Rows whose times SQLite cannot parse keep the
+  // old text comparison. Recurring series are left to the expansion below.
   const stmt = db.prepare(`
-    SELECT *
-    FROM events
-    WHERE start_time < @end
-      AND end_time   > @start
-    ORDER BY start_time ASC
+    SELECT e.*
+    FROM events e
+    WHERE e.id IN (
+            SELECT id FROM events_rtree
+            WHERE start_epoch <= @end_utc + ${MAX_UTC_OFFSET}
+              AND end_epoch   >= @start_utc - ${MAX_UTC_OFFSET}
+          )
+      AND CASE
+            WHEN e.start_utc IS NULL OR e.end_utc IS NULL
+              THEN e.start_time < @end AND e.end_time > @start
+            ELSE e.start_utc < @end_utc AND e.end_utc > @start_utc
+          END
+      AND (e.rrule IS NULL OR e.rrule = '')
+    ORDER BY e.start_utc ASC, e.start_time ASC
   `);
-  return stmt.all({ start: startIso, end: endIso });
+  const endUtc = toUtcEpoch(endIso, EPOCH_MAX);
+  const rows = stmt.all({
+    start: startIso,
+    end: endIso,
+    start_utc: toUtcEpoch(startIso, EPOCH_MIN),
+    end_utc: endUtc,
+  });
+
+  // Each series as its occurrences in the range (recurrence.js), ordered
+  // in with the single events as events_between() does in schema.py
+  const rangeStart = parseLocal(startIso);
+  const rangeEnd = parseLocal(endIso);
+  if (rangeStart === null || rangeEnd === null || rangeEnd <= rangeStart) return rows;
+  const masters = db.prepare(RECURRING_MASTERS_SQL).all({ end_utc: endUtc });
+  if (!masters.length) return rows;
+  for (const master of masters) {
+    rows.push(...seriesOccurrences(master, rangeStart, rangeEnd));
+  }
+  const key = (r) => [r.start_utc != null ? 1 : 0, r.start_utc ?? 0];
+  return rows.sort((a, b) => {
+    const [ha, ua] = key(a);
+    const [hb, ub] = key(b);
+    return ha - hb || ua - ub || (a.start_time < b.start_time ? -1 : a.start_time > b.start_time ? 1 : 0);
+  });
+}
+
+/**
+ * Epoch seconds for an ISO string (naive date-times are local, like the
+ * triggers), or the fallback if it does not parse.
+ */
+function toUtcEpoch(iso, fallback) {
+  const ms = Date.parse(iso);
+  return Number.isNaN(ms) ? fallback : Math.floor(ms / 1000);
+}
+
+/**
+ * Changes to events after `version` (see event_changes in createTables):
+ * { version, reset, more, changes: [{ id, op, row? }] }, one entry per event
+ * (its latest change) with the current row for inserts/updates. reset means
+ * the history is gone (pruned, or version is null/unknown): reload
+ * everything and continue from the returned version.
+ * Mirrors changes_since() in calendar_interaction/changelog.py.
+ */
+function getChangesSince(version, limit = 1000) {
+  return db.transaction(() => {
+    const seq = db
+      .prepare(`SELECT seq FROM sqlite_sequence WHERE name = 'event_changes'`)
+      .get();
+    const latest = seq ? seq.seq : 0;
+    const state = db
+      .prepare(`SELECT pruned_through FROM event_changes_state WHERE id = 1`)
+      .get();
+    const prunedThrough = state ? state.pruned_through : 0;
+    if (version == null || version < prunedThrough || version > latest) {
+      return { version: latest, reset: true, more: false, changes: [] };
+    }
+
+    const log = db
+      .prepare(`
+        SELECT version, op, event_id
+        FROM event_changes
+        WHERE version > ?
+        ORDER BY version
+        LIMIT ?
+      `)
+      .all(version, limit + 1);
+    const more = log.length > limit;
+    const window = log.slice(0, limit);
+
+    // Latest op per event, ordered by when it last changed
+    const latestOp = new Map();
+    for (const c of window) {
+      latestOp.delete(c.event_id);
+      latestOp.set(c.event_id, c.op);
+    }
+    const ids = [...latestOp].filter(([, op]) => op !== "delete").map(([id]) => id);
+    const rows = new Map(
+      db
+        .prepare(`SELECT * FROM events WHERE id IN (SELECT value FROM json_each(?))`)
+        .all(JSON.stringify(ids))
+        .map((r) => [r.id, r])
+    );
+
+    const changes = [...latestOp].map(([id, op]) =>
+      op === "delete" || !rows.has(id) ? { id, op: "delete" } : { id, op, row: rows.get(id) }
+    );
+    return {
+      version: window.length ? window[window.length - 1].version : version,
+      reset: false,
+      more,
+      changes,
+    };
+  })();
 }
 
 function getAllEvents() {
@@ -144,6 +507,7 @@ module.exports = {
   initDatabase,
   getEventsInRange,
   getAllEvents,
+  getChangesSince,
   insertEvent,
   updateEvent,
   deleteEvent,
@@ -0,0 +1,228 @@
+// backend/database/recurrence.js
+//
+// Expansion of recurring series for getEventsInRange. A series is one
+// events row (the master) whose rrule column holds an RRULE; its
+// start_time/end_time are the first occurrence. Same supported subset and
+// results as calendar_interaction/recurrence.py:
+//
+//   FREQ      DAILY | WEEKLY | MONTHLY | YEARLY
+//   INTERVAL  every N periods (default 1)
+//   BYDAY     weekdays, WEEKLY only (default: the master's weekday)
+//   COUNT     total number of occurrences
+//   UNTIL     last allowed start, YYYYMMDD or YYYYMMDDTHHMMSS[Z]
+//
+// All arithmetic is on local wall time, so a 9:00 series stays at 9:00
+// across DST changes. Generation jumps to the first period that can touch
+// the range, so the cost depends on the range, not the age of the series.
+
+const FREQUENCIES = ["DAILY", "WEEKLY", "MONTHLY", "YEARLY"];
+const WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"];
+
+// A COUNT rule is resolved to its last start once; cap the walk for safety.
+const MAX_COUNT = 10000;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/** Stored ISO time as a Date (naive times are local, like the triggers). */
+function parseLocal(iso) {
+  if (typeof iso !== "string") return null;
+  let text = iso.trim();
+  // Date-only strings would otherwise be read as UTC midnight
+  if (/^\d{4}-\d{2}-\d{2}$/.test(text)) text += "T00:00:00";
+  const ms = Date.parse(text);
+  return Number.isNaN(ms) ? null : new Date(ms);
+}
+
+const pad = (n, width = 2) => String(n).padStart(width, "0");
+
+/** Naive local ISO, as recurrence.py writes occurrence times. */
+function formatLocal(dt) {
+  return (
+    `${pad(dt.getFullYear(), 4)}-${pad(dt.getMonth() + 1)}-${pad(dt.getDate())}` +
+    `T${pad(dt.getHours())}:${pad(dt.getMinutes())}:${pad(dt.getSeconds())}`
+  );
+}
+
+function addDays(dt, days) {
+  return new Date(dt.getFullYear(), dt.getMonth(), dt.getDate() + days,
+    dt.getHours(), dt.getMinutes(), dt.getSeconds());
+}
+
+/** dt shifted by whole months, or null if that month has no such day. */
+function addMonths(dt, months) {
+  const total = dt.getMonth() + months;
+  const year = dt.getFullYear() + Math.floor(total / 12);
+  const month = ((total % 12) + 12) % 12;
+  if (year > 9999 || dt.getDate() > new Date(year, month + 1, 0).getDate()) return null;
+  return new Date(year, month, dt.getDate(), dt.getHours(), dt.getMinutes(), dt.getSeconds());
+}
+
+// Monday = 0, as in Python
+const weekday = (dt) => (dt.getDay() + 6) % 7;
+// Calendar day number, unaffected by DST
+const dayNumber = (dt) => Math.round(Date.UTC(dt.getFullYear(), dt.getMonth(), dt.getDate()) / DAY_MS);
+
+function parseUntil(value) {
+  const m = /^(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})(Z)?)?$/.exec(value.trim().toUpperCase());
+  if (!m) return null;
+  const [, y, mo, d, h, mi, s, z] = m;
+  if (h === undefined) {
+    // Date-only UNTIL includes the whole day
+    return new Date(+y, +mo - 1, +d, 23, 59, 59);
+  }
+  return z
+    ? new Date(Date.UTC(+y, +mo - 1, +d, +h, +mi, +s))
+    : new Date(+y, +mo - 1, +d, +h, +mi, +s);
+}
+
+const ruleCache = new Map();
+
+/** The rule as an object, or null if it is outside the supported subset. */
+function parseRrule(text) {
+  if (ruleCache.has(text)) return ruleCache.get(text);
+  const parts = {};
+  let rule = null;
+  for (const piece of text.trim().replace(/^RRULE:/, "").split(";")) {
+    if (!piece.trim()) continue;
+    const eq = piece.indexOf("=");
+    if (eq < 0) return cacheRule(text, null);
+    parts[piece.slice(0, eq).trim().toUpperCase()] = piece.slice(eq + 1).trim();
+  }
+
+  const freq = (parts.FREQ || "").toUpperCase();
+  if (FREQUENCIES.includes(freq)) {
+    rule = { freq, interval: 1, byday: null, count: null, until: null };
+    const interval = parseInt(parts.INTERVAL ?? "1", 10);
+    const count = parts.COUNT === undefined ? null : parseInt(parts.COUNT, 10);
+    rule.interval = Math.max(1, interval);
+    if (count !== null) rule.count = Math.min(MAX_COUNT, Math.max(1, count));
+    if (parts.UNTIL !== undefined) rule.until = parseUntil(parts.UNTIL);
+    if (Number.isNaN(interval) || Number.isNaN(count) || rule.until === null && parts.UNTIL !== undefined) {
+      rule = null;
+    }
+  }
+  if (rule && parts.BYDAY !== undefined) {
+    const codes = parts.BYDAY.split(",").map((c) => c.trim().toUpperCase().slice(-2)).filter(Boolean);
+    if (codes.some((c) => !WEEKDAY_CODES.includes(c))) {
+      rule = null;
+    } else {
+      rule.byday = [...new Set(codes.map((c) => WEEKDAY_CODES.indexOf(c)))].sort((a, b) => a - b);
+    }
+  }
+  return cacheRule(text, rule);
+}
+
+function cacheRule(text, rule) {
+  if (ruleCache.size > 256) ruleCache.clear();
+  ruleCache.set(text, rule);
+  return rule;
+}
+
+/**
+ * Candidate starts in order, beginning at (or shortly before) the period
+ * containing `after`. Unbounded; the caller filters and stops it.
+ */
+function* periods(rule, dtstart, after) {
+  const { freq, interval } = rule;
+
+  if (freq === "DAILY") {
+    let k = Math.max(0, Math.floor((dayNumber(after) - dayNumber(dtstart)) / interval) - 1);
+    for (;;) {
+      yield addDays(dtstart, k * interval);
+      k += 1;
+    }
+  } else if (freq === "WEEKLY") {
+    const days = rule.byday || [weekday(dtstart)];
+    const week0 = addDays(dtstart, -weekday(dtstart));
+    let k = Math.max(0, Math.floor((dayNumber(after) - dayNumber(week0)) / (7 * interval)) - 1);
+    for (;;) {
+      const week = addDays(week0, k * 7 * interval);
+      for (const d of days) {
+        const candidate = addDays(week, d);
+        if (candidate >= dtstart) yield candidate;
+      }
+      k += 1;
+    }
+  } else {
+    const unit = freq === "YEARLY" ? 12 : 1;
+    const months = (after.getFullYear() - dtstart.getFullYear()) * 12 +
+      (after.getMonth() - dtstart.getMonth());
+    let k = Math.max(0, Math.floor(months / (unit * interval)) - 1);
+    for (;;) {
+      const candidate = addMonths(dtstart, k * unit * interval);
+      if (candidate !== null) {
+        yield candidate;
+      } else if (dtstart.getFullYear() + Math.floor((k * unit * interval) / 12) > 9999) {
+        return;
+      }
+      k += 1;
+    }
+  }
+}
+
+const lastStartCache = new Map();
+
+/**
+ * Latest start the series may have: UNTIL, or the COUNT-th occurrence
+ * (walked once from the beginning, then cached). null = unbounded.
+ */
+function lastStart(rrule, rule, dtstart) {
+  if (rule.count === null) return rule.until;
+  const key = `${rrule}|${dtstart.getTime()}`;
+  if (lastStartCache.has(key)) return lastStartCache.get(key);
+  let last = null;
+  let i = 0;
+  for (const start of periods(rule, dtstart, addDays(dtstart, -1))) {
+    if (i >= rule.count || (rule.until !== null && start > rule.until)) break;
+    last = start;
+    i += 1;
+  }
+  if (lastStartCache.size > 1024) lastStartCache.clear();
+  lastStartCache.set(key, last);
+  return last;
+}
+
+function occurrenceRow(master, start, end) {
+  return {
+    ...master,
+    start_time: formatLocal(start),
+    end_time: formatLocal(end),
+    start_utc: Math.floor(start.getTime() / 1000),
+    end_utc: Math.floor(end.getTime() / 1000),
+    day_key: formatLocal(start).slice(0, 10),
+    is_occurrence: 1,
+    // The master's own times, for edits that apply to the whole series
+    series_start_time: master.start_time,
+    series_end_time: master.end_time,
+  };
+}
+
+/**
+ * Occurrences of one series overlapping [rangeStart, rangeEnd) (Dates), as
+ * events rows (is_occurrence = 1, id = the master's id). A master whose
+ * rrule is outside the supported subset is treated as a single event.
+ */
+function seriesOccurrences(master, rangeStart, rangeEnd) {
+  const dtstart = parseLocal(master.start_time);
+  const dtend = parseLocal(master.end_time);
+  if (dtstart === null || dtend === null) return [];
+  const rule = parseRrule(master.rrule);
+  if (rule === null) {
+    return dtstart < rangeEnd && dtend > rangeStart ? [master] : [];
+  }
+
+  const duration = Math.max(dtend - dtstart, 0);
+  const last = lastStart(master.rrule, rule, dtstart);
+  const lo = new Date(rangeStart.getTime() - duration);
+  const rows = [];
+  for (const start of periods(rule, dtstart, lo)) {
+    if (start >= rangeEnd || (last !== null && start > last)) break;
+    if (start < lo) continue;
+    const end = new Date(start.getTime() + duration);
+    if (end > rangeStart || (!duration && start >= rangeStart)) {
+      rows.push(occurrenceRow(master, start, end));
+    }
+  }
+  return rows;
+}
+
+module.exports = { parseLocal, parseRrule, seriesOccurrences };
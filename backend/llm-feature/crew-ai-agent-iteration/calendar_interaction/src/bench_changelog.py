@@ -0,0 +1,144 @@
+"""
+Benchmark: keeping a view of the calendar current after a few writes, by
+re-reading a two-year range (what the UI polled every second) vs. asking the
+change log for the delta (calendar_interaction/changelog.py), on a calendar
+of 100k events over ten years. Also reports the insert cost of the change
+log triggers and checks that replaying deltas reproduces the range.
+
+    python bench_changelog.py [events]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.changelog import changes_since, current_version
+from calendar_interaction.schema import OVERLAP_SQL, ensure_schema, overlap_params
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+RANGE = ("2023-01-01T00:00:00", "2025-01-01T00:00:00")
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        start = HISTORY_START + timedelta(
+            days=rng.randrange(HISTORY_DAYS),
+            minutes=rng.randrange(7 * 60, 20 * 60, 15),
+        )
+        end = start + timedelta(minutes=rng.choice((15, 30, 60, 90)))
+        yield (f"event {i}", start.isoformat(), end.isoformat())
+
+
+def build(db_path: str, n: int, changelog: bool) -> float:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)
+    if not changelog:
+        for name in ("events_changes_ai", "events_changes_au", "events_changes_ad"):
+            conn.execute(f"DROP TRIGGER {name}")
+    started = time.perf_counter()
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, start_time, end_time) VALUES (?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def read_range(conn) -> dict:
+    rows = conn.execute(OVERLAP_SQL, overlap_params(*RANGE)).fetchall()
+    return {r["id"]: tuple(r) for r in rows}
+
+
+def some_writes(conn, rng: random.Random, k: int = 10):
+    """A chat turn's worth of writes: a few inserts, moves and deletes."""
+    for _ in range(k):
+        choice = rng.random()
+        day = datetime(2023, 1, 1) + timedelta(days=rng.randrange(730), hours=9)
+        if choice < 0.4:
+            conn.execute(
+                "INSERT INTO events (title, start_time, end_time) VALUES (?, ?, ?)",
+                ("new", day.isoformat(), (day + timedelta(hours=1)).isoformat()),
+            )
+        elif choice < 0.8:
+            conn.execute(
+                "UPDATE events SET start_time = ?, end_time = ? WHERE id = ?",
+                (day.isoformat(), (day + timedelta(hours=1)).isoformat(), rng.randrange(1, 1000)),
+            )
+        else:
+            conn.execute("DELETE FROM events WHERE id = ?", (rng.randrange(1, 100000),))
+    conn.commit()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = build(os.path.join(tmp, "plain.db"), n, changelog=False)
+        logged = build(os.path.join(tmp, "bench.db"), n, changelog=True)
+        print(f"{n} events inserted: {plain:.2f} s without change log, {logged:.2f} s with")
+
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.row_factory = sqlite3.Row
+        rng = random.Random(1)
+        view = read_range(conn)
+        version = current_version(conn)
+
+        bounds = overlap_params(*RANGE)
+        lo, hi = bounds["start_utc"], bounds["end_utc"]
+        rounds, reread, delta = 50, 0.0, 0.0
+        for _ in range(rounds):
+            some_writes(conn, rng)
+
+            started = time.perf_counter()
+            fresh = read_range(conn)
+            reread += time.perf_counter() - started
+
+            started = time.perf_counter()
+            result = changes_since(conn, version)
+            delta += time.perf_counter() - started
+            version = result["version"]
+
+            # Replaying the delta onto the old view gives the same range
+            for change in result["changes"]:
+                row = change.get("row")
+                if change["op"] == "delete" or not (row["start_utc"] < hi and row["end_utc"] > lo):
+                    view.pop(change["id"], None)
+                else:
+                    view[change["id"]] = tuple(row.values())
+            assert view == fresh
+
+        print(f"{len(view)} events in the two-year range, 10 writes per round")
+        print(f"  re-read range: {reread / rounds * 1e3:8.2f} ms per poll")
+        print(f"  changes_since: {delta / rounds * 1e3:8.2f} ms per poll")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: whole-calendar conflict report (calendar_interaction/conflicts.py)
+with the NumPy engine vs. the pure-Python fallback, on throwaway calendars
+of 10k, 100k and 1M events. Small sizes are checked against brute force.
+
+    python bench_conflict_report.py [sizes...]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.conflicts import REPORT_SQL, _load_numpy, conflict_report
+from calendar_interaction.schema import ensure_schema
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        start = HISTORY_START + timedelta(
+            days=rng.randrange(HISTORY_DAYS),
+            minutes=rng.randrange(7 * 60, 20 * 60, 15),
+        )
+        end = start + timedelta(minutes=rng.choice((15, 30, 60, 90, 120)))
+        yield (f"event {i}", start.isoformat(), end.isoformat())
+
+
+def build(db_path: str, n: int):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, start_time, end_time) VALUES (?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    conn.close()
+
+
+def brute_force_pair_count(conn: sqlite3.Connection) -> int:
+    rows = conn.execute(REPORT_SQL).fetchall()
+    return sum(
+        1
+        for i, (s1, e1, _) in enumerate(rows)
+        for (s2, e2, _) in rows[i + 1:]
+        if s1 < e2 and s2 < e1
+    )
+
+
+def timed(conn, use_numpy: bool):
+    started = time.perf_counter()
+    report = conflict_report(conn, use_numpy=use_numpy)
+    return time.perf_counter() - started, report
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    if not _load_numpy():
+        print("NumPy is not installed: only the Python engine will run")
+
+    print(f"{'events':>10} {'pairs':>9} {'python ms':>10} {'numpy ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            db_path = os.path.join(tmp, f"bench_{n}.db")
+            build(db_path, n)
+            conn = sqlite3.connect(db_path)
+
+            py_time, py_report = timed(conn, use_numpy=False)
+            np_time, np_report = timed(conn, use_numpy=True)
+            assert py_report["pair_count"] == np_report["pair_count"]
+            assert py_report["conflicting_events"] == np_report["conflicting_events"]
+            assert py_report["pairs"] == np_report["pairs"]
+            if n <= 2000:
+                assert py_report["pair_count"] == brute_force_pair_count(conn)
+            conn.close()
+
+            print(f"{n:>10} {py_report['pair_count']:>9} {py_time * 1e3:>10.1f} "
+                  f"{np_time * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Microbenchmark: per-query overhead of a fresh sqlite3 connection per call
+(the old sqlite_tool / db_client behaviour) vs. the pooled per-thread
+connections from calendar_interaction.db_pool.
+
+Runs against a throwaway database, never the real calendar:
+
+    python bench_db_pool.py [iterations]
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.db_pool import ConnectionManager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events(start_time);
+"""
+
+SELECT_SQL = "SELECT * FROM events WHERE start_time < ? AND end_time > ? ORDER BY start_time"
+INSERT_SQL = (
+    "INSERT INTO events (title, start_time, end_time, all_day) "
+    "VALUES ('bench', '2025-01-01T09:00:00', '2025-01-01T10:00:00', 0)"
+)
+SELECT_PARAMS = ("2025-01-02T00:00:00", "2025-01-01T00:00:00")
+
+
+def seed(db_path: str, n: int = 500):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO events (title, start_time, end_time, all_day) VALUES (?, ?, ?, 0)",
+        [(f"event {i}", f"2025-01-{1 + i % 28:02d}T09:00:00",
+          f"2025-01-{1 + i % 28:02d}T10:00:00") for i in range(n)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def per_call(db_path: str, sql: str, params=()):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cur = conn.execute(sql, params)
+    if sql.startswith("SELECT"):
+        [dict(r) for r in cur.fetchall()]
+    else:
+        conn.commit()
+    conn.close()
+
+
+def pooled(manager: ConnectionManager, sql: str, params=()):
+    conn = manager.connection_for(sql)
+    cur = conn.execute(sql, params)
+    if sql.startswith("SELECT"):
+        [dict(r) for r in cur.fetchall()]
+    else:
+        conn.commit()
+
+
+def timed(label: str, fn, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {elapsed * 1e6 / iterations:9.1f} us/query")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed(db_path)
+        manager = ConnectionManager(db_path)
+
+        print(f"SELECT (overlap on one day), {iterations} iterations")
+        timed("connect per call", lambda: per_call(db_path, SELECT_SQL, SELECT_PARAMS), iterations)
+        timed("pooled (read-only)", lambda: pooled(manager, SELECT_SQL, SELECT_PARAMS), iterations)
+
+        print(f"INSERT + commit, {iterations} iterations")
+        timed("connect per call", lambda: per_call(db_path, INSERT_SQL), iterations)
+        timed("pooled (writer)", lambda: pooled(manager, INSERT_SQL), iterations)
+
+        manager.close_all()
+
+
+if __name__ == "__main__":
+    main()
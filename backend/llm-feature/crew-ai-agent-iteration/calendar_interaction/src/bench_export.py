@@ -0,0 +1,127 @@
+"""
+Benchmark: streaming export (calendar_interaction/export.py) of a 200k-event
+calendar to .ics and .jsonl, whole and for one month, against building the
+same JSONL from a get_all_events()-style fetchall(). Reports time and peak
+Python memory (tracemalloc, measured on a separate run).
+
+    python bench_export.py [events]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.export import export_to_file
+from calendar_interaction.ics_import import import_ics
+from calendar_interaction.schema import ensure_schema
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        start = HISTORY_START + timedelta(
+            days=rng.randrange(HISTORY_DAYS),
+            minutes=rng.randrange(7 * 60, 20 * 60, 15),
+        )
+        end = start + timedelta(minutes=rng.choice((15, 30, 60, 90)))
+        yield (f"event {i}", f"notes for event {i}, agenda and links", start.isoformat(),
+               end.isoformat(), f"Room {i % 20}")
+
+
+def build(db_path: str, n: int):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, description, start_time, end_time, location) "
+            "VALUES (?, ?, ?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    conn.close()
+
+
+def fetchall_jsonl(conn, path: str):
+    """The pre-streaming way: every row as a dict in memory, then written."""
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute("SELECT * FROM events ORDER BY start_time ASC")]
+    conn.row_factory = None
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("".join(json.dumps(r) + "\n" for r in rows))
+
+
+def measure(fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build(db_path, n)
+        conn = sqlite3.connect(db_path)
+        month = {"start": "2021-06-01T00:00:00", "end": "2021-07-01T00:00:00"}
+
+        cases = [
+            ("fetchall jsonl", "all.jsonl", lambda p: fetchall_jsonl(conn, p)),
+            ("stream jsonl", "all.jsonl", lambda p: export_to_file(conn, p)),
+            ("stream ics", "all.ics", lambda p: export_to_file(conn, p)),
+            ("stream ics, 1 month", "month.ics", lambda p: export_to_file(conn, p, **month)),
+        ]
+        print(f"{n} events")
+        print(f"{'export':>20} {'MB out':>8} {'s':>7} {'peak MB':>8}")
+        for label, name, fn in cases:
+            path = os.path.join(tmp, name)
+            elapsed, peak = measure(lambda: fn(path))
+            print(f"{label:>20} {os.path.getsize(path) / 1e6:>8.1f} {elapsed:>7.2f} "
+                  f"{peak / 1e6:>8.2f}")
+
+        # The .ics export imports back as the same calendar
+        check = sqlite3.connect(os.path.join(tmp, "check.db"))
+        check.execute(EVENTS_DDL)
+        ensure_schema(check)
+        counts = import_ics(check, os.path.join(tmp, "all.ics"))
+        assert counts["inserted"] == n, counts
+        query = "SELECT start_utc, end_utc, title FROM events ORDER BY start_utc, title"
+        assert check.execute(query).fetchall() == conn.execute(query).fetchall()
+        check.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
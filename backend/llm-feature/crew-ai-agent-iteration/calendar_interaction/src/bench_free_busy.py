@@ -0,0 +1,110 @@
+"""
+Benchmark: free_busy() (calendar_interaction/freebusy.py) on a calendar of
+100k events over ten years, for a day, a week, a month and a whole year.
+Each result is checked against a brute-force minute-by-minute occupancy map.
+
+Runs against a throwaway database:
+
+    python bench_free_busy.py [events]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.freebusy import free_busy
+from calendar_interaction.schema import ensure_schema, utc_epoch
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+
+WINDOWS = [("day", 1), ("week", 7), ("month", 31), ("year", 365)]
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        start = HISTORY_START + timedelta(
+            days=rng.randrange(HISTORY_DAYS),
+            minutes=rng.randrange(7 * 60, 20 * 60, 5),
+        )
+        end = start + timedelta(minutes=rng.choice((15, 30, 45, 60, 90, 120)))
+        yield (f"event {i}", start.isoformat(), end.isoformat())
+
+
+def build(db_path: str, n: int):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, start_time, end_time) VALUES (?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    conn.close()
+
+
+def brute_force_busy_minutes(conn: sqlite3.Connection, start: str, end: str) -> int:
+    lo, hi = utc_epoch(start) // 60, utc_epoch(end) // 60
+    occupied = bytearray(hi - lo)
+    for s, e in conn.execute("SELECT start_utc, end_utc FROM events"):
+        for minute in range(max(s // 60, lo), min(e // 60, hi)):
+            occupied[minute - lo] = 1
+    return sum(occupied)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build(db_path, n)
+        conn = sqlite3.connect(db_path)
+        rng = random.Random(1)
+
+        print(f"{n} events")
+        print(f"{'window':>8} {'events':>8} {'blocks':>8} {'ms':>8}")
+        for label, days in WINDOWS:
+            first = HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS - days))
+            start, end = first.isoformat(), (first + timedelta(days=days)).isoformat()
+
+            result = free_busy(conn, start, end)
+            if days <= 7:
+                assert result["busy_minutes"] == brute_force_busy_minutes(conn, start, end)
+            assert result["busy_minutes"] + result["free_minutes"] == days * 24 * 60
+
+            repeat = 20
+            started = time.perf_counter()
+            for _ in range(repeat):
+                free_busy(conn, start, end, granularity=15)
+            elapsed = (time.perf_counter() - started) / repeat
+
+            events = sum(len(b["event_ids"]) for b in result["busy"])
+            print(f"{label:>8} {events:>8} {len(result['busy']):>8} {elapsed * 1e3:>8.2f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: keyword lookup with the LIKE '%word%' scans the planner used to
+generate vs. the events_fts full-text index (calendar_interaction/schema.py).
+
+Builds throwaway databases with 10k, 100k and 1M events:
+
+    python bench_fts.py [sizes...]
+    python bench_fts.py 10000 100000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.schema import ensure_schema, search_events
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+ACTIVITIES = ["Lunch", "Standup", "Review", "Dentist", "Gym", "Call", "Planning", "1:1", "Dinner"]
+PEOPLE = ["Jake", "Maria", "Priya", "Tom", "Chen", "Olga", "Sam", "Ana", "Lee", "Noor"]
+PLACES = ["Office", "Café Zürich", "Zoom", "Room 4B", "Downtown", None]
+# Rare names so matches stay selective as the calendar grows
+RARE = ["Bartholomew", "Ingrid", "Xavier"]
+
+LIKE_SQL = """
+SELECT * FROM events
+WHERE title LIKE :p OR description LIKE :p OR location LIKE :p
+ORDER BY start_time DESC
+LIMIT 20
+"""
+
+START = datetime(2016, 1, 1)
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        person = rng.choice(RARE) if rng.random() < 0.001 else rng.choice(PEOPLE)
+        start = START + timedelta(days=rng.randrange(3650), hours=rng.randrange(8, 19))
+        yield (
+            f"{rng.choice(ACTIVITIES)} with {person}",
+            f"Notes {i}: agenda for {rng.choice(ACTIVITIES).lower()}",
+            start.isoformat(),
+            (start + timedelta(hours=1)).isoformat(),
+            rng.choice(PLACES),
+        )
+
+
+def build(db_path: str, n: int) -> float:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)  # triggers maintain events_fts during the load
+    started = time.perf_counter()
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, description, start_time, end_time, location) "
+            "VALUES (?, ?, ?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def timed(fn, words, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            fn(word)
+    return (time.perf_counter() - started) / (repeat * len(words))
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    words = [w.lower() for w in RARE]
+
+    print(f"{'events':>10} {'load s':>8} {'LIKE ms':>9} {'fts ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            db_path = os.path.join(tmp, f"bench_{n}.db")
+            load = build(db_path, n)
+
+            conn = sqlite3.connect(db_path)
+            conn.row_factory = sqlite3.Row
+            for word in words:
+                # LIKE is case-insensitive for ASCII too, so both see the same events
+                like_ids = {r["id"] for r in conn.execute(
+                    LIKE_SQL.replace("LIMIT 20", ""), {"p": f"%{word}%"})}
+                fts_ids = {r["id"] for r in search_events(conn, word, limit=n)}
+                assert like_ids == fts_ids, (word, len(like_ids), len(fts_ids))
+
+            like = timed(lambda w: conn.execute(LIKE_SQL, {"p": f"%{w}%"}).fetchall(), words)
+            fts = timed(lambda w: search_events(conn, w), words)
+            conn.close()
+
+            print(f"{n:>10} {load:>8.2f} {like * 1e3:>9.2f} {fts * 1e3:>9.2f} "
+                  f"{like / fts:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: .ics import (calendar_interaction/ics_import.py) of generated
+calendars with 2k, 20k and 100k events: throughput, and peak Python memory
+(tracemalloc), which should not grow with the file. A second import of the
+same file must find every event unchanged.
+
+    python bench_ics_import.py [sizes...]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.ics_import import import_ics
+from calendar_interaction.schema import ensure_schema
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+
+
+def write_ics(path: str, n: int):
+    rng = random.Random(n)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//EN\r\n")
+        for i in range(n):
+            start = HISTORY_START + timedelta(
+                days=rng.randrange(HISTORY_DAYS),
+                minutes=rng.randrange(7 * 60, 20 * 60, 15),
+            )
+            end = start + timedelta(minutes=rng.choice((15, 30, 60, 90)))
+            f.write(
+                "BEGIN:VEVENT\r\n"
+                f"UID:event-{i}@bench\r\n"
+                f"SUMMARY:Meeting {i} with team {rng.randrange(50)}\r\n"
+                f"DESCRIPTION:Agenda item one\\, item two\\nand a longer note that gets\r\n"
+                f"  folded onto a continuation line {i}\r\n"
+                f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n"
+                f"DTEND:{end:%Y%m%dT%H%M%S}\r\n"
+                f"LOCATION:Room {rng.randrange(20)}\r\n"
+                + ("RRULE:FREQ=WEEKLY;COUNT=10\r\n" if i % 50 == 0 else "")
+                + "BEGIN:VALARM\r\nACTION:DISPLAY\r\nTRIGGER:-PT10M\r\nEND:VALARM\r\n"
+                "END:VEVENT\r\n"
+            )
+        f.write("END:VCALENDAR\r\n")
+
+
+def fresh_db(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)
+    return conn
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [2_000, 20_000, 100_000]
+
+    print(f"{'events':>8} {'file MB':>8} {'import s':>9} {'events/s':>9} "
+          f"{'peak MB':>8} {'reimport s':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            ics_path = os.path.join(tmp, f"bench_{n}.ics")
+            write_ics(ics_path, n)
+            conn = fresh_db(os.path.join(tmp, f"bench_{n}.db"))
+
+            started = time.perf_counter()
+            counts = import_ics(conn, ics_path)
+            elapsed = time.perf_counter() - started
+            assert counts["inserted"] == n, counts
+
+            # Memory is measured on a separate import: tracing slows it down
+            traced = fresh_db(os.path.join(tmp, f"bench_{n}_traced.db"))
+            tracemalloc.start()
+            import_ics(traced, ics_path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            traced.close()
+
+            started = time.perf_counter()
+            again = import_ics(conn, ics_path)
+            reimport = time.perf_counter() - started
+            assert again["unchanged"] == n and again["inserted"] == 0, again
+            assert conn.execute("SELECT count(*) FROM events").fetchone()[0] == n
+            conn.close()
+
+            print(f"{n:>8} {os.path.getsize(ics_path) / 1e6:>8.1f} {elapsed:>9.2f} "
+                  f"{n / elapsed:>9.0f} {peak / 1e6:>8.2f} {reimport:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
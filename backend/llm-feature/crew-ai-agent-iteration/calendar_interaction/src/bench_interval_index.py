@@ -0,0 +1,105 @@
+"""
+Benchmark: month-view overlap query without (OVERLAP_SQL_SCAN) and with
+(OVERLAP_SQL) the events_rtree interval index (calendar_interaction/schema.py).
+
+Builds throwaway databases with 10k, 100k and 1M events spread over ten
+years of history (1M takes a little while to seed):
+
+    python bench_interval_index.py [sizes...]
+    python bench_interval_index.py 10000 100000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from calendar_interaction.schema import OVERLAP_SQL, OVERLAP_SQL_SCAN, ensure_schema, overlap_params
+
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+HISTORY_START = datetime(2016, 1, 1)
+HISTORY_DAYS = 3650
+
+
+def random_rows(n: int, rng: random.Random):
+    for i in range(n):
+        start = HISTORY_START + timedelta(
+            days=rng.randrange(HISTORY_DAYS),
+            minutes=rng.randrange(7 * 60, 20 * 60, 15),
+        )
+        end = start + timedelta(minutes=rng.choice((15, 30, 60, 90, 120)))
+        yield (f"event {i}", start.isoformat(), end.isoformat())
+
+
+def build(db_path: str, n: int) -> float:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(EVENTS_DDL)
+    ensure_schema(conn)  # triggers maintain events_rtree during the load
+    started = time.perf_counter()
+    with conn:
+        conn.executemany(
+            "INSERT INTO events (title, start_time, end_time) VALUES (?, ?, ?)",
+            random_rows(n, random.Random(n)),
+        )
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def month_windows(count: int, rng: random.Random):
+    for _ in range(count):
+        first = HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS - 31))
+        yield overlap_params(first.isoformat(), (first + timedelta(days=31)).isoformat())
+
+
+def timed(conn: sqlite3.Connection, sql: str, windows) -> tuple:
+    started = time.perf_counter()
+    rows = 0
+    for params in windows:
+        rows += len(conn.execute(sql, params).fetchall())
+    return (time.perf_counter() - started) / len(windows), rows
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'events':>10} {'load s':>8} {'scan ms':>9} {'rtree ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            db_path = os.path.join(tmp, f"bench_{n}.db")
+            load = build(db_path, n)
+
+            conn = sqlite3.connect(db_path)
+            windows = list(month_windows(50, random.Random(1)))
+            scan, scan_rows = timed(conn, OVERLAP_SQL_SCAN, windows)
+            rtree, rtree_rows = timed(conn, OVERLAP_SQL, windows)
+            conn.close()
+
+            assert scan_rows == rtree_rows, (scan_rows, rtree_rows)
+            print(f"{n:>10} {load:>8.2f} {scan * 1e3:>9.2f} {rtree * 1e3:>9.2f} "
+                  f"{scan / rtree:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: what the per-request metrics line (calendar_interaction/metrics.py)
+costs a kickoff of the 3-task crew (canned LLM, see bench_quiet.py), and a
+sample of the line itself. Kickoffs go through kickoff_and_emit as in the
+runner, with emitted lines collected instead of printed.
+
+    python bench_metrics.py [kickoffs]
+"""
+
+import os
+import sys
+import json
+import time
+
+os.environ["CALENDAR_QUIET"] = "1"  # as in the runner
+
+import bench_quiet
+import crewai_runner
+from calendar_interaction.metrics import install_request_metrics
+
+lines = []
+
+
+def measure(calendar_crew, kickoffs: int):
+    times = []
+    cpu = time.process_time()
+    for i in range(kickoffs):
+        started = time.perf_counter()
+        crewai_runner.kickoff_and_emit(calendar_crew.copy(), None, i, "hi there", False, 0.0)
+        times.append((time.perf_counter() - started) * 1e3)
+    cpu = time.process_time() - cpu
+    times.sort()
+    return times[len(times) // 2], cpu / kickoffs * 1e3
+
+
+def main():
+    kickoffs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    crewai_runner.set_emit_sink(lines.append)
+
+    with crewai_runner.suppress_stdout_stderr():
+        calendar_crew = bench_quiet.build_crew()
+        crewai_runner.run_request(calendar_crew.copy(), 0, "hi")  # warm-up
+
+        # Off first: the handlers cannot be unregistered within a process
+        os.environ["CALENDAR_METRICS"] = "0"
+        off_p50, off_cpu = measure(calendar_crew, kickoffs)
+        os.environ["CALENDAR_METRICS"] = "1"
+        install_request_metrics()
+        on_p50, on_cpu = measure(calendar_crew, kickoffs)
+
+    sample = [json.loads(line) for line in lines if '"type": "metrics"' in line]
+    print(f"{kickoffs} kickoffs of the 3-task crew, canned LLM")
+    print(f"{'metrics':<8} {'p50 ms':>8} {'CPU ms':>8}")
+    print(f"{'off':<8} {off_p50:>8.1f} {off_cpu:>8.1f}")
+    print(f"{'on':<8} {on_p50:>8.1f} {on_cpu:>8.1f}")
+    print(f"{sum(1 for m in sample if m['complete'])}/{len(sample)} lines complete; last:")
+    print(json.dumps(sample[-1], indent=2))
+
+
+if __name__ == "__main__":
+    main()
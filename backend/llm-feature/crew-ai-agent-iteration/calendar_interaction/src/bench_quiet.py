@@ -0,0 +1,108 @@
+"""
+Benchmark: CPU time per crew kickoff with crewai's verbose console
+rendering (what the runner did, output thrown away by
+suppress_stdout_stderr) vs. quiet mode (calendar_interaction/quiet.py).
+The agents get a canned LLM that answers at once but emits the same LLM
+call events a real one does, so the difference is crewai's own overhead.
+CPU time is for the whole process, event bus handler threads included;
+crewai's telemetry is off so that only the rendering differs.
+
+    python bench_quiet.py [kickoffs]
+"""
+
+import os
+import sys
+import time
+import json
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNNER_DIR = os.path.join(BASE_DIR, "calendar_interaction")
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, RUNNER_DIR)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+os.environ["CALENDAR_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_quiet.db")
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.events.types.llm_events import LLMCallType
+
+import crewai_runner
+from calendar_interaction.quiet import QUIET_ENV
+
+PLAN = {"intent": "chit_chat", "fields": {}, "sql": None, "notes": "no calendar change"}
+
+# One answer per task, in the crew's order
+ANSWERS = [
+    'Thought: The user is just chatting.\nFinal Answer: {"intent": "chit_chat", "fields": {}}',
+    "Thought: No SQL is needed.\nFinal Answer: " + json.dumps(PLAN),
+    "Thought: I can reply directly.\nFinal Answer: Hello! How can I help with your calendar?",
+]
+
+
+class CannedLLM(BaseLLM):
+    """Answers from ANSWERS by task, emitting the usual LLM call events."""
+
+    def __init__(self, answer: str):
+        super().__init__(model="gpt-4.1-mini")
+        self.answer = answer
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self._emit_call_started_event(messages=messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions,
+                                      from_task=from_task, from_agent=from_agent)
+        self._emit_call_completed_event(response=self.answer, call_type=LLMCallType.LLM_CALL,
+                                        from_task=from_task, from_agent=from_agent,
+                                        messages=messages)
+        return self.answer
+
+
+def build_crew():
+    calendar_crew = crewai_runner.build_pipeline()
+    for task, answer in zip(calendar_crew.tasks, ANSWERS):
+        task.agent.llm = CannedLLM(answer)
+    return calendar_crew
+
+
+def measure(kickoffs: int):
+    with crewai_runner.suppress_stdout_stderr():
+        return _measure(kickoffs)
+
+
+def _measure(kickoffs: int):
+    calendar_crew = build_crew()
+    crewai_runner.run_request(calendar_crew.copy(), 0, "hi")  # warm-up
+    time.sleep(0.5)
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    for i in range(kickoffs):
+        reply = crewai_runner.run_request(calendar_crew.copy(), i, "hi there")
+        assert reply["error"] is None, reply["error"]
+    wall = time.perf_counter() - wall
+    # Let the event bus finish the handlers still queued on its threads
+    time.sleep(1.0)
+    cpu = time.process_time() - cpu
+    return cpu / kickoffs * 1e3, wall / kickoffs * 1e3
+
+
+def main():
+    kickoffs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    # Verbose first: quiet mode cannot be undone within a process
+    os.environ[QUIET_ENV] = "0"
+    verbose_cpu, verbose_wall = measure(kickoffs)
+    os.environ[QUIET_ENV] = "1"
+    quiet_cpu, quiet_wall = measure(kickoffs)
+
+    print(f"{kickoffs} kickoffs of the 3-task crew, canned LLM")
+    print(f"{'':<10} {'CPU ms':>8} {'wall ms':>8}")
+    print(f"{'verbose':<10} {verbose_cpu:>8.1f} {verbose_wall:>8.1f}")
+    print(f"{'quiet':<10} {quiet_cpu:>8.1f} {quiet_wall:>8.1f}")
+    print(f"rendering: {verbose_cpu - quiet_cpu:.1f} ms CPU per kickoff "
+          f"({(verbose_cpu - quiet_cpu) / verbose_cpu:.0%})")
+
+
+if __name__ == "__main__":
+    main()
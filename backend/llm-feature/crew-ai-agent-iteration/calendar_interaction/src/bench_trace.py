@@ -0,0 +1,90 @@
+"""
+Benchmark: kickoff latency of the 3-task crew (canned LLM, see
+bench_quiet.py) with no tracing, crewai's remote tracing (tracing=True,
+offline here), and the local trace sink (calendar_interaction/trace_sink.py)
+writing SQLite or JSONL. A last run gives the sink an exporter that takes
+200 ms per batch and a queue of 200 records, to show that a slow disk costs
+dropped spans, not kickoff time. Each mode runs in its own process.
+
+    python bench_trace.py [kickoffs]
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODES = ["off", "remote", "sqlite", "jsonl", "slow"]
+
+
+class SlowExporter:
+    def __init__(self):
+        self.spans = 0
+
+    def export(self, spans):
+        time.sleep(0.2)
+        self.spans += len(spans)
+
+    def close(self):
+        pass
+
+
+def run_mode(mode: str, kickoffs: int) -> dict:
+    os.environ["CALENDAR_QUIET"] = "1"  # as in the runner
+    os.environ["CALENDAR_TRACE"] = {"remote": "off", "slow": "sqlite"}.get(mode, mode)
+    import bench_quiet
+    import crewai_runner
+    from calendar_interaction.trace_sink import install_trace_sink
+
+    sink = None
+    if mode == "slow":
+        sink = install_trace_sink(SlowExporter, max_queue=200)
+    with crewai_runner.suppress_stdout_stderr():
+        calendar_crew = bench_quiet.build_crew()
+        if mode == "remote":
+            from crewai import Crew
+            calendar_crew = Crew(agents=calendar_crew.agents, tasks=calendar_crew.tasks,
+                                 process=calendar_crew.process, verbose=False, tracing=True)
+        if sink is None and mode not in ("off", "remote"):
+            sink = crewai_runner.build_trace_sink()
+        crewai_runner.run_request(calendar_crew.copy(), 0, "hi")  # warm-up
+
+        times = []
+        for i in range(kickoffs):
+            started = time.perf_counter()
+            reply = crewai_runner.run_request(calendar_crew.copy(), i, "hi there")
+            times.append((time.perf_counter() - started) * 1e3)
+            assert reply["error"] is None, reply["error"]
+        if sink is not None:
+            sink.close(timeout=30)
+    times.sort()
+    return {
+        "p50": times[len(times) // 2],
+        "max": times[-1],
+        "written": sink.exported if sink else None,
+        "dropped": sink.dropped if sink else None,
+    }
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        print(json.dumps(run_mode(sys.argv[2], int(sys.argv[3]))))
+        return
+    kickoffs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    print(f"{kickoffs} kickoffs per mode")
+    print(f"{'mode':<8} {'p50 ms':>8} {'max ms':>8} {'spans':>7} {'dropped':>8}")
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, str(kickoffs)],
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(next(line for line in out.splitlines() if line.startswith('{"p50"')))
+        written = "-" if r["written"] is None else r["written"]
+        dropped = "-" if r["dropped"] is None else r["dropped"]
+        print(f"{mode:<8} {r['p50']:>8.1f} {r['max']:>8.1f} {written:>7} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
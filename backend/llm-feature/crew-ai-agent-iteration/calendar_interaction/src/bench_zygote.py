@@ -0,0 +1,106 @@
+"""
+Benchmark: getting a crew worker ready in a fresh process (import crewai,
+build the pipeline) vs. forking it from the warm zygote
+(calendar_interaction/zygote.py), and what N workers of each kind cost in
+memory (Pss and private memory from /proc/<pid>/smaps_rollup; the forked
+total includes the zygote). Linux only. No LLM calls are made; the key is
+a dummy.
+
+    python bench_zygote.py [workers]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNNER_DIR = os.path.join(BASE_DIR, "calendar_interaction")
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, RUNNER_DIR)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from calendar_interaction.zygote import WorkerProcess, start_zygote
+
+# A separate process that does what a worker needs, then waits on stdin
+COLD_WORKER = """
+import sys
+import crewai_runner
+with crewai_runner.suppress_stdout_stderr():
+    crewai_runner.build_pipeline()
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+def memory_kb(pid: int) -> dict:
+    """Pss and Private_* (kB) of a process, from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def cold_workers(n: int):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([RUNNER_DIR, BASE_DIR]))
+    procs, times = [], []
+    for _ in range(n):
+        started = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", COLD_WORKER], env=env, text=True,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        assert proc.stdout.readline().strip() == "ready"
+        times.append((time.perf_counter() - started) * 1000)
+        procs.append(proc)
+    mem = [memory_kb(p.pid) for p in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return times, mem
+
+
+def forked_workers(n: int):
+    started = time.perf_counter()
+    ctx = start_zygote([RUNNER_DIR, BASE_DIR])
+    workers = [WorkerProcess(ctx, cache_enabled=False)]
+    first = (time.perf_counter() - started) * 1000
+    for _ in range(n - 1):
+        workers.append(WorkerProcess(ctx, cache_enabled=False))
+    times = [w.spawn_ms for w in workers[1:]]
+    # The zygote's own share of the pages counts toward the total
+    from multiprocessing import forkserver
+    mem = [memory_kb(w.pid) for w in workers] + [memory_kb(forkserver._forkserver._forkserver_pid)]
+    for worker in workers:
+        worker.close()
+    return first, times, mem
+
+
+def summary(label: str, times, mem, n: int):
+    total_pss = sum(m["pss"] for m in mem) / 1024
+    private = sum(m["private"] for m in mem[:n]) / n / 1024
+    avg = sum(times) / len(times) if times else 0.0
+    print(f"{label:<22} {avg:>9.1f} {private:>12.1f} {total_pss:>10.1f}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("needs Linux /proc/<pid>/smaps_rollup")
+
+    cold_times, cold_mem = cold_workers(n)
+    first, fork_times, fork_mem = forked_workers(n)
+
+    print(f"{n} workers; zygote start + first worker: {first:.0f} ms")
+    print(f"{'':<22} {'ready ms':>9} {'private MiB':>12} {'total Pss':>10}")
+    summary("separate processes", cold_times, cold_mem, n)
+    summary("forked from zygote", fork_times, fork_mem, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Batch scheduling: place several events at once under shared constraints,
+e.g. "three 1-hour study blocks before Friday, not back-to-back".
+
+One interpretation step produces the request (events + constraints) and
+everything else is solved locally:
+
+  - Candidates: for each event, every aligned free start in its window
+    (slots.candidate_starts over one busy timeline read for the whole
+    batch). Only working hours on working days count. Each event can have
+    its own earliest/latest bounds.
+  - Search: depth-first backtracking, most constrained event first (fewest
+    candidates). Candidates are tried in preference order: inside the
+    preferred hours first, then earliest. A placement must keep min_gap
+    minutes from every other batch event and respect max_per_day. The first
+    complete assignment wins. MAX_NODES bounds the search.
+  - Commit: schedule_batch() reads the calendar, solves and inserts the
+    plan inside one BEGIN IMMEDIATE transaction, so the plan is written
+    whole or not at all and nothing can be booked in between.
+"""
+
+import sqlite3
+from datetime import datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from calendar_interaction.schema import utc_epoch
+from calendar_interaction.slots import (
+    WORKDAYS, busy_timeline, candidate_starts, parse_hhmm, parse_window, working_hours,
+)
+
+
+# Upper bound on search nodes; enough for any realistic batch, and keeps an
+# infeasible request from running away.
+MAX_NODES = 200000
+
+INSERT_SQL = """
+INSERT INTO events (title, description, start_time, end_time, all_day, location)
+VALUES (?, ?, ?, ?, 0, ?)
+"""
+
+
+class BatchScheduleError(ValueError):
+    """No placement satisfies the constraints (or the request is malformed)."""
+
+
+def _local_iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
+
+
+def _bounds(event: Dict[str, Any], lo: int, hi: int) -> Tuple[int, int]:
+    """The event's own earliest/latest, clipped to the batch window."""
+    earliest = utc_epoch(event["earliest"]) if event.get("earliest") else None
+    latest = utc_epoch(event["latest"]) if event.get("latest") else None
+    return max(lo, earliest or lo), min(hi, latest or hi)
+
+
+def _in_preferred(start: int, end: int, preferred: Optional[Tuple[time, time]]) -> bool:
+    if preferred is None:
+        return True
+    s, e = datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+    return s.date() == e.date() and preferred[0] <= s.time() and e.time() <= preferred[1]
+
+
+def _search(candidates: List[List[Tuple[Any, int]]], durations: List[int],
+            kinds: List[Any], min_gap: int, max_per_day: Optional[int]) -> Optional[List[int]]:
+    """
+    Backtracking over candidates[i] (ordered (day, start) lists per event).
+    Events of the same kind (same duration and bounds) are interchangeable,
+    so each must start after the previous one of its kind; this removes the
+    K! equivalent orderings an infeasible batch would otherwise explore.
+    Returns one start per event, or None if infeasible / over MAX_NODES.
+    """
+    order = sorted(range(len(candidates)), key=lambda i: (len(candidates[i]), kinds[i]))
+    twin = {b: a for a, b in zip(order, order[1:]) if kinds[a] == kinds[b]}
+    chosen: Dict[int, Tuple[Any, int]] = {}
+    per_day: Dict[Any, int] = {}
+    nodes = 0
+
+    def fits(i: int, day, start: int) -> bool:
+        end = start + durations[i]
+        if max_per_day and per_day.get(day, 0) >= max_per_day:
+            return False
+        for j, (_, other) in chosen.items():
+            other_end = other + durations[j]
+            if start < other_end + min_gap and other < end + min_gap:
+                return False
+        return True
+
+    def place(k: int) -> bool:
+        nonlocal nodes
+        if k == len(order):
+            return True
+        i = order[k]
+        after = chosen[twin[i]][1] if i in twin else None
+        for day, start in candidates[i]:
+            nodes += 1
+            if nodes > MAX_NODES:
+                return False
+            if after is not None and start <= after:
+                continue
+            if not fits(i, day, start):
+                continue
+            chosen[i] = (day, start)
+            per_day[day] = per_day.get(day, 0) + 1
+            if place(k + 1):
+                return True
+            del chosen[i]
+            per_day[day] -= 1
+        return False
+
+    if not place(0):
+        return None
+    return [chosen[i][1] for i in range(len(candidates))]
+
+
+def plan_batch(conn: sqlite3.Connection, events: Sequence[Dict[str, Any]],
+               window_start: str, window_end: str,
+               min_gap_minutes: int = 0, max_per_day: Optional[int] = None,
+               preferred_start=None, preferred_end=None,
+               work_start="09:00", work_end="17:00", buffer_minutes: int = 0,
+               step_minutes: int = 15, weekdays: Sequence[int] = WORKDAYS,
+               not_before: Optional[str] = None,
+               cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    """
+    Solve without writing. events are dicts with title, duration_minutes and
+    optionally description, location, earliest, latest (ISO). Returns the
+    events with start_time/end_time filled in, in input order.
+    Raises BatchScheduleError if they cannot all be placed.
+    """
+    if not events:
+        raise BatchScheduleError("No events to schedule")
+    lo, hi = parse_window(window_start, window_end, not_before)
+    day_open, day_close = working_hours(work_start, work_end)
+    preferred = None
+    if preferred_start or preferred_end:
+        preferred = (parse_hhmm(preferred_start or day_open),
+                     parse_hhmm(preferred_end or day_close))
+    step = max(int(step_minutes), 1) * 60
+    try:
+        durations = [int(e["duration_minutes"]) * 60 for e in events]
+    except (KeyError, TypeError, ValueError):
+        raise BatchScheduleError("Every event needs a numeric duration_minutes") from None
+    if min(durations) <= 0:
+        raise BatchScheduleError("duration_minutes must be positive")
+
+    timeline = busy_timeline(conn, lo, hi, max(int(buffer_minutes or 0), 0) * 60,
+                             cache_conn=cache_conn)
+
+    candidates, kinds = [], []
+    for event, duration in zip(events, durations):
+        e_lo, e_hi = _bounds(event, lo, hi)
+        kinds.append((duration, e_lo, e_hi))
+        found = list(candidate_starts(timeline, e_lo, e_hi, duration, step,
+                                      day_open, day_close, weekdays))
+        if not found:
+            raise BatchScheduleError(f"No free time for {event.get('title')!r} in its window")
+        # Stable sort: preferred-hours slots first, each group earliest first
+        found.sort(key=lambda c: not _in_preferred(c[1], c[1] + duration, preferred))
+        candidates.append(found)
+
+    starts = _search(candidates, durations, kinds, int(min_gap_minutes or 0) * 60, max_per_day)
+    if starts is None:
+        raise BatchScheduleError(
+            f"Could not fit all {len(events)} events in the window with these constraints"
+        )
+    return [
+        dict(event, start_time=_local_iso(start), end_time=_local_iso(start + duration))
+        for event, start, duration in zip(events, starts, durations)
+    ]
+
+
+def schedule_batch(conn: sqlite3.Connection, events: Sequence[Dict[str, Any]],
+                   window_start: str, window_end: str, **constraints) -> List[Dict[str, Any]]:
+    """
+    plan_batch() and insert the result, all in one write transaction on
+    `conn` (a writable connection with no transaction open). Returns the
+    inserted rows with their ids. Nothing is written if planning fails.
+    """
+    constraints.pop("cache_conn", None)  # its commits would end our transaction
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        planned = plan_batch(conn, events, window_start, window_end, **constraints)
+        for row in planned:
+            cur = conn.execute(INSERT_SQL, (
+                row["title"], row.get("description") or "", row["start_time"],
+                row["end_time"], row.get("location") or "",
+            ))
+            row["id"] = cur.lastrowid
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return planned
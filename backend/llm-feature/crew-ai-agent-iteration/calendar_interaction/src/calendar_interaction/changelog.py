@@ -0,0 +1,220 @@
+"""
+Change log: "what changed since version N" for the events table.
+
+Triggers in schema.py append (version, op, event_id, columns) to
+event_changes on every insert, update and delete. A client (the UI, a
+cache) remembers the version it last saw and asks for the delta:
+
+  changes_since(conn, 41) -> {
+      "version": 57,          # pass this next time
+      "reset": False,         # True: history was pruned, reload everything
+      "more": False,          # True: call again from "version" for the rest
+      "changes": [{"id", "op", "columns", "row"}, ...],
+  }
+
+Changes are coalesced per event: one entry per id, in the order of its
+last change. An event inserted and deleted within the window is left out.
+An event inserted then edited is one "insert". Updates list the union of
+changed columns (None if unknown after compaction). Clients apply "insert"
+and "update" as an upsert of "row" and "delete" as a removal.
+
+Maintenance
+-----------
+compact_changes() applies the same coalescing to the stored log, keeping
+only each event's latest row. prune_changes() drops old history and
+records how far it went in event_changes_state; a client older than that
+gets reset=True. maintain_changelog() runs both and is called at runner
+startup.
+"""
+
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_LIMIT = 1000
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_ROWS = 50000
+
+# Rows are fetched back for the changed events in chunks of this many ids
+_ID_CHUNK = 500
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Latest change version (0 for an empty log)."""
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'event_changes'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def pruned_through(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT pruned_through FROM event_changes_state WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def _merge(changes: Iterable[Tuple[str, Optional[str]]]) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Coalesce one event's (op, columns) changes, oldest first, into a single
+    (op, columns). Returns None for an insert that was deleted again.
+    """
+    first_op, last_op, columns, unknown = None, None, set(), False
+    for op, cols in changes:
+        if first_op is None:
+            first_op = op
+        last_op = op
+        if op == "update":
+            if cols is None:
+                unknown = True
+            else:
+                columns.update(c for c in cols.split(",") if c)
+
+    if last_op == "delete":
+        return None if first_op == "insert" else ("delete", None)
+    if first_op == "insert":
+        return "insert", None
+    if unknown:
+        return "update", None
+    return "update", ",".join(sorted(columns))
+
+
+def fetch_rows(conn: sqlite3.Connection, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Current events rows for ids, by id (ids with no row are left out)."""
+    rows = {}
+    for i in range(0, len(ids), _ID_CHUNK):
+        chunk = ids[i:i + _ID_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        cur = conn.execute(f"SELECT * FROM events WHERE id IN ({marks})", chunk)
+        names = [d[0] for d in cur.description]
+        for r in cur.fetchall():
+            row = dict(zip(names, r))
+            rows[row["id"]] = row
+    return rows
+
+
+def changes_since(conn: sqlite3.Connection, version: int, limit: int = DEFAULT_LIMIT,
+                  with_rows: bool = True) -> Dict[str, Any]:
+    """
+    Coalesced changes after `version` (see the module docstring), reading
+    at most `limit` log rows. with_rows attaches each inserted/updated
+    event's current row, read in the same snapshot as the log.
+    """
+    version = int(version or 0)
+    own_txn = not conn.in_transaction
+    if own_txn:
+        conn.execute("BEGIN")  # one snapshot for the log and the rows
+    try:
+        latest = current_version(conn)
+        if version < pruned_through(conn) or version > latest:
+            # History before `version` is gone (or it is from another database)
+            return {"version": latest, "reset": True, "more": False, "changes": []}
+
+        cur = conn.execute(
+            "SELECT version, op, event_id, columns FROM event_changes "
+            "WHERE version > ? ORDER BY version LIMIT ?",
+            (version, int(limit) + 1),
+        )
+        log = [tuple(r) for r in cur.fetchall()]
+        more = len(log) > limit
+        log = log[:limit]
+        upto = log[-1][0] if log else version
+
+        per_event: Dict[int, List[Tuple[str, Optional[str]]]] = {}
+        last_seen: Dict[int, int] = {}
+        for v, op, event_id, cols in log:
+            per_event.setdefault(event_id, []).append((op, cols))
+            last_seen[event_id] = v
+
+        changes = []
+        for event_id in sorted(per_event, key=last_seen.get):
+            merged = _merge(per_event[event_id])
+            if merged is None:
+                continue
+            op, cols = merged
+            changes.append({"id": event_id, "op": op,
+                            "columns": cols.split(",") if cols else None})
+
+        if with_rows:
+            rows = fetch_rows(conn, [c["id"] for c in changes if c["op"] != "delete"])
+            for change in changes:
+                if change["op"] != "delete":
+                    change["row"] = rows.get(change["id"])
+        return {"version": upto, "reset": False, "more": more, "changes": changes}
+    finally:
+        if own_txn and conn.in_transaction:
+            conn.rollback()
+
+
+def compact_changes(conn: sqlite3.Connection, through_version: Optional[int] = None) -> int:
+    """
+    Merge each event's log rows up to through_version (default: all) into
+    its latest row. Returns the number of rows removed. `conn` must be
+    writable with no transaction open.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        upto = current_version(conn) if through_version is None else int(through_version)
+        cur = conn.execute(
+            """
+            SELECT event_id, version, op, columns FROM event_changes
+            WHERE version <= :upto AND event_id IN (
+              SELECT event_id FROM event_changes WHERE version <= :upto
+              GROUP BY event_id HAVING count(*) > 1
+            )
+            ORDER BY event_id, version
+            """,
+            {"upto": upto},
+        )
+        groups: Dict[int, List[Tuple[int, str, Optional[str]]]] = {}
+        for event_id, version, op, cols in cur.fetchall():
+            groups.setdefault(event_id, []).append((version, op, cols))
+
+        updates, removed = [], 0
+        for event_id, rows in groups.items():
+            merged = _merge((op, cols) for _, op, cols in rows)
+            # An insert that was deleted again still has to reach clients
+            # that saw the insert: keep it as a delete
+            op, cols = merged if merged is not None else ("delete", None)
+            updates.append((op, cols, rows[-1][0]))
+            removed += len(rows) - 1
+        conn.executemany("UPDATE event_changes SET op = ?, columns = ? WHERE version = ?", updates)
+        conn.executemany(
+            "DELETE FROM event_changes WHERE event_id = ? AND version <= ? AND version < ?",
+            [(event_id, upto, rows[-1][0]) for event_id, rows in groups.items()],
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return removed
+
+
+def prune_changes(conn: sqlite3.Connection, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                  max_rows: int = DEFAULT_MAX_ROWS) -> int:
+    """
+    Drop log rows older than max_age_days, and beyond the newest max_rows.
+    Clients last synced before the cut get reset=True from changes_since().
+    Returns the number of rows removed.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        latest = current_version(conn)
+        cutoff = int(time.time() - max_age_days * 86400)
+        by_age = conn.execute(
+            "SELECT IFNULL(max(version), 0) FROM event_changes WHERE changed_at < ?", (cutoff,)
+        ).fetchone()[0]
+        through = max(by_age, latest - int(max_rows), pruned_through(conn))
+        removed = conn.execute("DELETE FROM event_changes WHERE version <= ?", (through,)).rowcount
+        conn.execute("UPDATE event_changes_state SET pruned_through = ? WHERE id = 1", (through,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return removed
+
+
+def maintain_changelog(conn: sqlite3.Connection, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                       max_rows: int = DEFAULT_MAX_ROWS) -> Dict[str, int]:
+    """Prune, then compact, the change log. Returns {"pruned", "compacted"}."""
+    pruned = prune_changes(conn, max_age_days, max_rows)
+    return {"pruned": pruned, "compacted": compact_changes(conn)}
@@ -0,0 +1,237 @@
+"""
+Conflict detection.
+
+Write path
+----------
+_run_sql (sqlite_tool) reports overlaps with whatever a write just created
+or moved, so the reply can mention them without another crew run:
+
+  - track_writes() installs TEMP triggers on the writer connection that
+    record the id of every row an INSERT or a time-changing UPDATE
+    touches. This works for any SQL the planner writes, not just single
+    INSERTs.
+  - find_conflicts() checks each touched event with events_between(), an
+    indexed overlap query (events_rtree, see schema.py), so occurrences of
+    recurring series are included.
+
+The same triggers also record every insert, update (of a column in
+schema.CHANGELOG_COLUMNS) and delete with its op; written_events() reads
+them back so the runner can push the rows to the UI.
+
+All-day events never conflict: they mark a day rather than block it. A
+recurring master is checked at its own (first) occurrence.
+
+Audit
+-----
+conflict_report() lists every overlapping pair in the whole calendar, e.g.
+after importing a large calendar. It is vectorized with NumPy when NumPy is
+installed: sort by start (lexsort), then one searchsorted per event finds
+how many later events start before it ends. Without NumPy it falls back to a
+pure-Python sweep with the same output. Recurring series are not expanded
+here.
+"""
+
+import sqlite3
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+from calendar_interaction.schema import CHANGELOG_COLUMNS, events_between
+
+# NumPy is optional and only needed by conflict_report(), so it is imported
+# there (_load_numpy) rather than on every runner start
+np = None
+
+
+def _load_numpy() -> bool:
+    """Import NumPy on first use; False if it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # optional: conflict_report() falls back to pure Python
+            np = False
+        else:
+            np = numpy
+    return np is not False
+
+
+# Touched ids are only checked up to this many per write (e.g. a bulk UPDATE)
+MAX_CHECKED = 50
+
+# Per-connection (TEMP) write tracking; see track_writes()
+TRACKING_DDL = f"""
+CREATE TEMP TABLE IF NOT EXISTS touched_events (id INTEGER PRIMARY KEY);
+CREATE TEMP TABLE IF NOT EXISTS written_events (id INTEGER PRIMARY KEY, op TEXT NOT NULL);
+
+CREATE TEMP TRIGGER IF NOT EXISTS touched_events_ai AFTER INSERT ON main.events BEGIN
+  INSERT OR IGNORE INTO touched_events (id) VALUES (new.id);
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS touched_events_au
+AFTER UPDATE OF start_time, end_time, all_day, rrule ON main.events BEGIN
+  INSERT OR IGNORE INTO touched_events (id) VALUES (new.id);
+END;
+
+-- An insert stays an insert when it is then updated, and disappears when
+-- it is deleted again
+CREATE TEMP TRIGGER IF NOT EXISTS written_events_ai AFTER INSERT ON main.events BEGIN
+  INSERT OR REPLACE INTO written_events (id, op) VALUES (new.id, 'insert');
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS written_events_au AFTER UPDATE ON main.events
+WHEN {" OR ".join(f"old.{c} IS NOT new.{c}" for c in CHANGELOG_COLUMNS)}
+BEGIN
+  INSERT OR IGNORE INTO written_events (id, op) VALUES (new.id, 'update');
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS written_events_ad AFTER DELETE ON main.events BEGIN
+  INSERT OR REPLACE INTO written_events (id, op)
+  SELECT old.id, 'delete'
+  WHERE NOT EXISTS (SELECT 1 FROM written_events WHERE id = old.id AND op = 'insert');
+  DELETE FROM written_events WHERE id = old.id AND op = 'insert';
+END;
+"""
+
+# A plain table scan, sorted in memory: walking idx_events_utc instead costs
+# a table lookup per row and is several times slower on large calendars.
+REPORT_SQL = """
+SELECT start_utc, end_utc, id
+FROM events NOT INDEXED
+WHERE all_day = 0
+  AND start_utc IS NOT NULL AND end_utc > start_utc
+  AND (rrule IS NULL OR rrule = '')
+"""
+
+
+def track_writes(conn: sqlite3.Connection):
+    """
+    Start (or reset) recording the ids of events rows written on conn. Call
+    before the write and read them back with touched_ids() afterwards.
+    """
+    try:
+        conn.execute("DELETE FROM temp.touched_events")
+        conn.execute("DELETE FROM temp.written_events")
+    except sqlite3.OperationalError:
+        # First write on this connection (TEMP objects are per connection)
+        conn.executescript(TRACKING_DDL)
+
+
+def touched_ids(conn: sqlite3.Connection) -> List[int]:
+    """Ids recorded since the last track_writes() on conn."""
+    return [r[0] for r in conn.execute("SELECT id FROM temp.touched_events ORDER BY id")]
+
+
+def written_events(conn: sqlite3.Connection) -> Dict[str, List[int]]:
+    """
+    Ids written since the last track_writes() on conn, by op:
+    {"insert": [...], "update": [...], "delete": [...]} (ops with no ids left out).
+    """
+    written: Dict[str, List[int]] = {}
+    for event_id, op in conn.execute("SELECT id, op FROM temp.written_events ORDER BY id"):
+        written.setdefault(op, []).append(event_id)
+    return written
+
+
+def _brief(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: row.get(k) for k in ("id", "title", "start_time", "end_time", "is_occurrence")
+            if row.get(k) is not None}
+
+
+def find_conflicts(conn: sqlite3.Connection, event_ids: Iterable[int],
+                   cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    """
+    For each event id, the other (timed) events overlapping it:
+    [{id, title, start_time, end_time, conflicts_with: [event, ...]}], only
+    for events that have conflicts.
+    """
+    ids = list(event_ids)[:MAX_CHECKED]
+    if not ids:
+        return []
+    marks = ",".join("?" * len(ids))
+    rows = conn.execute(
+        f"SELECT id, title, start_time, end_time, all_day FROM events WHERE id IN ({marks})",
+        ids,
+    ).fetchall()
+
+    found = []
+    for row in rows:
+        row = dict(row)
+        if row["all_day"]:
+            continue
+        others = [
+            _brief(other)
+            for other in events_between(conn, row["start_time"], row["end_time"], cache_conn)
+            if other["id"] != row["id"] and not other.get("all_day")
+        ]
+        if others:
+            found.append(dict(_brief(row), conflicts_with=others))
+    return found
+
+
+def _pairs_numpy(rows, max_pairs: int):
+    table = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    table = table[np.lexsort((table[:, 2], table[:, 1], table[:, 0]))]
+    starts, ends, ids = table[:, 0], table[:, 1], table[:, 2]
+    index = np.arange(len(starts))
+    # Rows are sorted by start: events i+1 .. last[i]-1 start before i ends
+    last = np.searchsorted(starts, ends, side="left")
+    counts = np.maximum(last - index - 1, 0)
+    # An event also conflicts if some earlier event's span reaches past it
+    reach = np.maximum.accumulate(last)
+    covered = np.zeros(len(starts), dtype=bool)
+    covered[1:] = index[1:] < reach[:-1]
+    conflicting = int(((counts > 0) | covered).sum())
+
+    # Materialize at most max_pairs pairs, in (first, second) order
+    before = np.cumsum(counts) - counts
+    taken = np.minimum(counts, np.maximum(max_pairs - before, 0))
+    first = np.repeat(index, taken)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(taken) - taken, taken)
+    overlap = np.minimum(ends[first], ends[second]) - starts[second]
+    pairs = list(zip(ids[first].tolist(), ids[second].tolist(), (overlap // 60).tolist()))
+    return pairs, int(counts.sum()), conflicting
+
+
+def _pairs_python(rows, max_pairs: int):
+    rows = sorted(rows)
+    starts = [r[0] for r in rows]
+    ends = [r[1] for r in rows]
+    ids = [r[2] for r in rows]
+    pairs, total, conflicting, reach = [], 0, 0, 0
+    for i in range(len(starts)):
+        last = bisect_left(starts, ends[i], lo=i + 1)
+        total += last - i - 1
+        if last > i + 1 or i < reach:
+            conflicting += 1
+        reach = max(reach, last)
+        for j in range(i + 1, min(last, i + 1 + max_pairs - len(pairs))):
+            pairs.append((ids[i], ids[j], (min(ends[i], ends[j]) - starts[j]) // 60))
+    return pairs, total, conflicting
+
+
+def conflict_report(conn: sqlite3.Connection, max_pairs: int = 1000,
+                    use_numpy: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Every pair of overlapping timed, non-recurring events in the calendar:
+      {events, conflicting_events, pair_count,
+       pairs: [{a, b, overlap_minutes}] (at most max_pairs), truncated, engine}
+    use_numpy=None uses NumPy when installed.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    rows = cur.execute(REPORT_SQL).fetchall()
+
+    vectorized = _load_numpy() if use_numpy is None else (use_numpy and _load_numpy())
+    if vectorized and rows:
+        pairs, total, conflicting = _pairs_numpy(rows, max_pairs)
+    else:
+        pairs, total, conflicting = _pairs_python(rows, max_pairs)
+
+    return {
+        "events": len(rows),
+        "conflicting_events": conflicting,
+        "pair_count": total,
+        "pairs": [{"a": a, "b": b, "overlap_minutes": m} for a, b, m in pairs],
+        "truncated": total > len(pairs),
+        "engine": "numpy" if vectorized and rows else "python",
+    }
@@ -1,7 +1,12 @@
 import os
+import json
+from typing import Any, Tuple
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from calendar_interaction.tools.sqlite_tool import sqlite_tool  # module-level tool function
+from calendar_interaction.tools.sqlite_tool import (
+    parse_plan, execute_plan_sql, free_busy_tool, find_slots_tool, search_events_tool,
+)
+from calendar_interaction.quiet import crew_verbose
 from crewai import LLM
 
 def default_llm():
@@ -11,6 +16,28 @@ def default_llm():
         max_tokens=1024,
     )
 
+def run_planned_sql(output) -> Tuple[bool, Any]:
+    """
+    Guardrail on plan_sql_for_intent that replaces the old execute_sql task:
+    the planner's SQL is executed directly via _run_sql (no LLM round-trip)
+    and the structured result is appended to the planner output, which is
+    what respond_to_user receives as context.
+
+    If the planner did not return a JSON object, the guardrail fails and
+    CrewAI re-prompts the planner with the error message.
+    """
+    plan = parse_plan(output.raw)
+    if plan is None:
+        return (
+            False,
+            "Return ONLY a JSON object with the keys intent, fields, sql and notes.",
+        )
+    result = execute_plan_sql(plan)
+    return (
+        True,
+        output.raw + "\n\nSQL execution result:\n" + json.dumps(result, default=str),
+    )
+
 @CrewBase
 class CalendarInteractionCrew():
     """Calendar LLM crew for natural language → SQL → SQLite → response"""
@@ -35,7 +62,7 @@ class CalendarInteractionCrew():
         """Understands natural language and extracts structured intent."""
         return Agent(
             config=self.agents_config['nl_agent'],
-            verbose=True,
+            verbose=crew_verbose(),
         )
 
     @agent
@@ -43,16 +70,10 @@ class CalendarInteractionCrew():
         """Turns interpreted intent into a single SQL statement (or none)."""
         return Agent(
             config=self.agents_config['sql_generator_agent'],
-            verbose=True,
-        )
-
-    @agent
-    def sql_executor_agent(self) -> Agent:
-        """Executes SQL on the SQLite calendar DB via the sqlite_tool."""
-        return Agent(
-            config=self.agents_config['sql_executor_agent'],
-            tools=[sqlite_tool],   # <-- explicitly attach the tool object
-            verbose=True,
+            # find_slots_tool picks a free time when none was given;
+            # search_events_tool finds the event an update/delete targets
+            tools=[find_slots_tool, search_events_tool],
+            verbose=crew_verbose(),
         )
 
     @agent
@@ -60,7 +81,8 @@ class CalendarInteractionCrew():
         """Produces the final, human-friendly response to the user."""
         return Agent(
             config=self.agents_config['responder_agent'],
-            verbose=True,
+            tools=[free_busy_tool],  # free/busy for ranges the plan did not cover
+            verbose=crew_verbose(),
         )
 
     # ---------- TASKS ----------
@@ -74,16 +96,10 @@ class CalendarInteractionCrew():
 
     @task
     def plan_sql_for_intent(self) -> Task:
-        """Planner: take intent/fields and produce SQL (or none)."""
+        """Planner: take intent/fields and produce SQL (or none), then run it."""
         return Task(
             config=self.tasks_config['plan_sql_for_intent'],
-        )
-
-    @task
-    def execute_sql(self) -> Task:
-        """Executor: run the SQL using sqlite_tool and return results."""
-        return Task(
-            config=self.tasks_config['execute_sql'],
+            guardrail=run_planned_sql,  # executes the SQL without an LLM turn
         )
 
     @task
@@ -97,11 +113,12 @@ class CalendarInteractionCrew():
 
     @crew
     def crew(self) -> Crew:
-        """Creates the CalendarInteraction crew with a 4-step sequential pipeline."""
+        """Creates the CalendarInteraction crew with a 3-step sequential pipeline."""
         return Crew(
             agents=self.agents,  # Automatically created from @agent methods
             tasks=self.tasks,    # Automatically created from @task methods, in this file's order
             process=Process.sequential,
-            verbose=True,
-            tracing=True,
+            verbose=crew_verbose(),
+            # Traces go to the local sink (trace_sink.py), not crewai's backend
+            tracing=False,
         )
@@ -1,25 +1,89 @@
+import time
+
+# Startup is timed from the first line of the runner (see StartupTimer)
+_STARTED = time.perf_counter()
+
 import os
 import sys
+import copy
 import json
-import sqlite3
 import io
+import queue
+import threading
 import contextlib
 from datetime import datetime
 
+# The real stdout is captured once at import time so JSON lines for Electron
+# can be written from any worker thread, even while sys.stdout is redirected.
+_REAL_STDOUT = sys.stdout
+_emit_lock = threading.Lock()
+
+# In a worker forked from the zygote (zygote.py) lines go to the runner
+# over a pipe instead; see set_emit_sink()
+_emit_sink = None
+
+_suppress_lock = threading.Lock()
+_suppress_depth = 0
+_saved_streams = None
+
+
+def emit(payload: dict):
+    """
+    Write one JSON line to Electron. Safe to call from any thread.
+    """
+    line = json.dumps(payload, default=str)
+    if _emit_sink is not None:
+        _emit_sink(line)
+        return
+    write_line(line)
+
+
+def write_line(line: str):
+    """Write an already serialized JSON line to Electron."""
+    with _emit_lock:
+        _REAL_STDOUT.write(line + "\n")
+        _REAL_STDOUT.flush()
+
+
+def set_emit_sink(sink):
+    """Send every emit()ted line to sink(line) instead of stdout (None: stdout)."""
+    global _emit_sink
+    _emit_sink = sink
+
+
+def emit_error(req_id, error: str, stream: bool = False):
+    """Answer a request with an error (as a "done" line if it was streaming)."""
+    resp = {"id": req_id, "reply": None, "error": error}
+    if stream:
+        resp["type"] = "done"
+    emit(resp)
+
+
 @contextlib.contextmanager
 def suppress_stdout_stderr():
     """
     Temporarily redirect stdout and stderr so CrewAI's pretty boxes
     do NOT leak into Electron. We only print our own JSON manually.
+
+    Reference-counted so overlapping kickoffs on worker threads do not
+    restore each other's StringIO: the first one in swaps the streams,
+    the last one out puts the originals back.
     """
-    old_out, old_err = sys.stdout, sys.stderr
+    global _suppress_depth, _saved_streams
+    with _suppress_lock:
+        if _suppress_depth == 0:
+            _saved_streams = (sys.stdout, sys.stderr)
+            sys.stdout = io.StringIO()
+            sys.stderr = io.StringIO()
+        _suppress_depth += 1
     try:
-        sys.stdout = io.StringIO()
-        sys.stderr = io.StringIO()
         yield
     finally:
-        sys.stdout = old_out
-        sys.stderr = old_err
+        with _suppress_lock:
+            _suppress_depth -= 1
+            if _suppress_depth == 0:
+                sys.stdout, sys.stderr = _saved_streams
+                _saved_streams = None
 
 
 # Make sure we can import local modules (tools, crew, etc.)
@@ -33,10 +97,217 @@ PARENT_DIR = os.path.dirname(CURRENT_DIR)
 if PARENT_DIR not in sys.path:
     sys.path.insert(0, PARENT_DIR)
 
-# This registers the tool with CrewAI via the @tool decorator
-import tools.sqlite_tool
+# Only light modules are imported here. crewai (and through it numpy,
+# chromadb, OpenTelemetry, grpc, ...) comes in with crew.py / single_call.py
+# in build_pipeline(), and the LLM provider SDK when the first LLM is built.
+from fast_path import try_fast_path, stats as fast_path_stats
+from llm_cache import LLMResponseCache, get_cache_path, install_llm_cache
+from calendar_interaction.changelog import maintain_changelog
+from calendar_interaction.db_pool import get_manager
+from calendar_interaction.export import export_to_file
+from calendar_interaction.ics_import import import_ics
+from calendar_interaction.quiet import QUIET_ENV, install_quiet_mode, quiet_enabled
+from calendar_interaction.metrics import begin_request, install_request_metrics
+# The package module (not a top-level tools.sqlite_tool): it is the one
+# crew.py and fast_path.py call, so its write listener is the one that fires
+from calendar_interaction.tools.sqlite_tool import set_write_listener
+
+
+class StartupTimer:
+    """
+    Milliseconds spent in each startup phase, in order. The first phase,
+    "imports", runs from the top of this module to the end of its imports.
+    """
+
+    def __init__(self, started: float = _STARTED):
+        self.started = started
+        self._last = started
+        self.phases = {}
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    def total_ms(self) -> float:
+        return round((self._last - self.started) * 1000, 1)
+
+
+startup_timer = StartupTimer()
+startup_timer.mark("imports")
+
+
+def get_worker_count() -> int:
+    """
+    Number of crew kickoffs allowed to run at the same time.
+    CALENDAR_RUNNER_WORKERS overrides the default of 2; set it to 1 to get
+    the old strictly sequential behaviour.
+    """
+    try:
+        return max(1, int(os.getenv("CALENDAR_RUNNER_WORKERS", "2")))
+    except ValueError:
+        return 2
+
+
+def get_queue_size() -> int:
+    """
+    Maximum number of requests waiting for a free worker.
+    CALENDAR_RUNNER_QUEUE_SIZE overrides the default of 32.
+    """
+    try:
+        return max(1, int(os.getenv("CALENDAR_RUNNER_QUEUE_SIZE", "32")))
+    except ValueError:
+        return 32
+
+
+def get_pipeline_mode() -> str:
+    """
+    Which pipeline answers messages the fast path does not handle:
+      - "crew" (default): the three-task Process.sequential CalendarInteractionCrew
+      - "single_call": one structured-output LLM call + local SQL (single_call.py)
+    Set per deployment with CALENDAR_PIPELINE.
+    """
+    mode = os.getenv("CALENDAR_PIPELINE", "crew").strip().lower()
+    return mode if mode in ("crew", "single_call") else "crew"
+
+
+def zygote_enabled() -> bool:
+    """
+    CALENDAR_RUNNER_ZYGOTE=1 runs kickoffs in worker processes forked from a
+    warm zygote (zygote.py) instead of on threads. Off by default; needs
+    fork (not available on Windows).
+    """
+    return os.getenv("CALENDAR_RUNNER_ZYGOTE", "0") == "1"
+
+
+def get_startup_mode() -> str:
+    """
+    When the pipeline is built (CALENDAR_RUNNER_STARTUP):
+      - "lazy" (default): on a background thread after the "ready" line, so
+        fast-path commands, imports and exports are served right away and
+        LLM requests wait only for whatever of the build is left
+      - "eager": before "ready", as the runner always used to
+    """
+    mode = os.getenv("CALENDAR_RUNNER_STARTUP", "lazy").strip().lower()
+    return mode if mode in ("lazy", "eager") else "lazy"
+
+
+def build_pipeline(timer: StartupTimer = None):
+    """
+    Build the pipeline for get_pipeline_mode(). Both expose kickoff(inputs)
+    and copy(), so the worker pool does not care which one it runs.
+    This is where crewai is imported (and, in quiet mode, its console
+    listener unregistered) and the trace sink and request metrics
+    installed; timer, if given, gets a "pipeline_import" and a
+    "pipeline_build" phase.
+    """
+    if get_pipeline_mode() == "single_call":
+        from single_call import SingleCallPipeline as build
+    else:
+        from crew import CalendarInteractionCrew
+
+        def build():
+            return CalendarInteractionCrew().crew()
+    if quiet_enabled():
+        install_quiet_mode()
+    build_trace_sink()
+    if metrics_enabled():
+        install_request_metrics()
+    if timer is not None:
+        timer.mark("pipeline_import")
+    pipeline = build()
+    if timer is not None:
+        timer.mark("pipeline_build")
+    return pipeline
 
-from crew import CalendarInteractionCrew
+
+def fast_path_enabled() -> bool:
+    """
+    The deterministic fast path is on by default; CALENDAR_FAST_PATH=0
+    sends every message through the crew (useful for A/B comparisons).
+    """
+    return os.getenv("CALENDAR_FAST_PATH", "1") != "0"
+
+
+def llm_cache_enabled() -> bool:
+    """
+    The persistent LLM response cache is on by default; CALENDAR_LLM_CACHE=0
+    turns it off.
+    """
+    return os.getenv("CALENDAR_LLM_CACHE", "1") != "0"
+
+
+def metrics_enabled() -> bool:
+    """
+    A { "type": "metrics" } line with stage timings after every kickoff
+    (metrics.py) is on by default; CALENDAR_METRICS=0 turns it off.
+    """
+    return os.getenv("CALENDAR_METRICS", "1") != "0"
+
+
+def get_trace_mode() -> str:
+    """
+    Where crew traces go (CALENDAR_TRACE): "sqlite" (default, traces.db next
+    to the calendar DB), "jsonl" (traces.jsonl) or "off". Never to a remote
+    backend; see trace_sink.py.
+    """
+    mode = os.getenv("CALENDAR_TRACE", "sqlite").strip().lower()
+    return mode if mode in ("sqlite", "jsonl", "off") else "sqlite"
+
+
+def build_trace_sink():
+    """
+    Install the local trace sink on crewai's event bus (once per process).
+    CALENDAR_TRACE_MAX_SPANS (default 50000) caps traces.db. Returns None
+    if tracing is off or the sink cannot be installed.
+    """
+    mode = get_trace_mode()
+    if mode == "off":
+        return None
+    from calendar_interaction.trace_sink import (
+        DEFAULT_MAX_SPANS, get_trace_path, install_trace_sink, make_exporter_factory,
+    )
+    try:
+        max_spans = int(os.getenv("CALENDAR_TRACE_MAX_SPANS", str(DEFAULT_MAX_SPANS)))
+    except ValueError:
+        max_spans = DEFAULT_MAX_SPANS
+    try:
+        return install_trace_sink(make_exporter_factory(mode, get_trace_path(mode), max_spans))
+    except Exception as e:
+        emit({
+            "type": "log",
+            "level": "warn",
+            "message": f"Trace sink disabled: {e}"
+        })
+        return None
+
+
+def build_llm_cache():
+    """
+    Open llm_cache.db next to the calendar DB. Entry lifetime and size come
+    from CALENDAR_LLM_CACHE_TTL (seconds, default one day) and
+    CALENDAR_LLM_CACHE_MAX_ENTRIES (default 1000). Returns None if disabled
+    or if the cache cannot be opened; requests then go straight to the LLM.
+    """
+    if not llm_cache_enabled():
+        return None
+    try:
+        ttl = int(os.getenv("CALENDAR_LLM_CACHE_TTL", "86400"))
+    except ValueError:
+        ttl = 86400
+    try:
+        max_entries = int(os.getenv("CALENDAR_LLM_CACHE_MAX_ENTRIES", "1000"))
+    except ValueError:
+        max_entries = 1000
+    try:
+        return LLMResponseCache(get_cache_path(), get_db_path(), ttl, max_entries)
+    except Exception as e:
+        emit({
+            "type": "log",
+            "level": "warn",
+            "message": f"LLM response cache disabled: {e}"
+        })
+        return None
 
 
 def get_db_path() -> str:
@@ -48,51 +319,613 @@ def get_db_path() -> str:
     return os.getenv("CALENDAR_DB_PATH", "calendar_llm.db")
 
 
-def load_openai_key_from_sqlite():
+def load_openai_key_from_sqlite() -> bool:
     """
     Load the OpenAI API key from the SQLite 'settings' table:
       key='openai_api_key'
     and set OPENAI_API_KEY in the environment so CrewAI/OpenAI client can use it.
+    Returns True if a key was loaded.
     """
     db_path = get_db_path()
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_manager(db_path).reader()
         cur = conn.cursor()
         cur.execute("SELECT value FROM settings WHERE key = 'openai_api_key'")
         row = cur.fetchone()
-        conn.close()
     except Exception as e:
         # Send a JSON log line back to Electron
-        print(json.dumps({
+        emit({
             "type": "log",
             "level": "error",
             "message": f"Error reading OpenAI key from DB: {e}"
-        }), flush=True)
-        return
+        })
+        return False
 
     if row and row[0]:
         os.environ["OPENAI_API_KEY"] = row[0]
-        print(json.dumps({
+        emit({
             "type": "log",
             "level": "info",
             "message": "Loaded OPENAI_API_KEY from SQLite settings"
-        }), flush=True)
+        })
+        return True
+    emit({
+        "type": "log",
+        "level": "warn",
+        "message": "No openai_api_key found in settings table"
+    })
+    return False
+
+
+def _with_current_key(llm):
+    """
+    A copy of llm that authenticates with the current OPENAI_API_KEY.
+    Native providers (OpenAICompletion) build their HTTP client once, in
+    __init__, so the client is rebuilt; LiteLLM-backed LLMs read api_key
+    on every call.
+    """
+    fresh = copy.copy(llm)
+    fresh.api_key = os.getenv("OPENAI_API_KEY")
+    if getattr(fresh, "client", None) is not None and hasattr(fresh, "_get_client_params"):
+        fresh.client = type(fresh.client)(**fresh._get_client_params())
+    return fresh
+
+
+def refresh_llm_clients(pipeline):
+    """
+    Give every LLM of a crew (or of a SingleCallPipeline) a client for the
+    current key. Only for a pipeline no kickoff is using yet.
+    """
+    if hasattr(pipeline, "agents"):
+        for agent in pipeline.agents:
+            if agent.llm is not None:
+                agent.llm = _with_current_key(agent.llm)
+    elif getattr(pipeline, "llm", None) is not None:
+        pipeline.llm = _with_current_key(pipeline.llm)
+
+
+def maintain_change_log():
+    """
+    Prune and compact the events change log (changelog.py) once per start,
+    so it stays small however long the app runs. Failures are only logged.
+    """
+    try:
+        counts = maintain_changelog(get_manager(get_db_path()).writer())
+    except Exception as e:
+        emit({"type": "log", "level": "warn", "message": f"Change log maintenance failed: {e}"})
+        return
+    emit({
+        "type": "log",
+        "level": "info",
+        "message": f"change log: pruned {counts['pruned']}, compacted {counts['compacted']} row(s)",
+    })
+
+
+def emit_events_changed(change: dict):
+    """
+    Push one write made by sqlite_tool (or the batch scheduler) to Electron:
+    { "type": "events_changed", "op", "ids", "rows" }, rows being the new
+    values of inserted/updated events, so the UI can patch its state
+    without re-reading its range.
+    """
+    emit({"type": "events_changed", **change})
+
+
+def reload_settings(pool, req_id):
+    """
+    Re-read the OpenAI key and rebuild the workers' LLM clients in place,
+    instead of restarting the runner (Electron sends this when the key is
+    changed in settings). Without a key the current clients are kept.
+    """
+    if not load_openai_key_from_sqlite():
+        emit({"id": req_id, "reply": None, "error": "No OpenAI API key found in settings."})
+        return
+    try:
+        pool.reload_llms()
+    except Exception as e:
+        emit({"id": req_id, "reply": None, "error": f"Reloading settings failed: {e}"})
+        return
+    emit({"id": req_id, "reply": "Settings reloaded.", "error": None})
+
+
+def build_inputs(message: str) -> dict:
+    """
+    Template inputs for one kickoff.
+    """
+    now = datetime.now()
+    # Pass both user_input and user_query so any template is satisfied
+    # AND inject current date context
+    return {
+        "user_input": message,
+        "user_query": message,
+        "current_date": now.strftime("%Y-%m-%d"),
+        "current_time": now.strftime("%H:%M"),
+        "current_year": str(now.year),
+    }
+
+
+def run_request(calendar_crew, req_id, message: str) -> dict:
+    """
+    Run one chat message through a crew and build the reply line for Electron.
+    """
+    try:
+        # Suppress CrewAI's pretty printing (boxes, tracing banners, etc.)
+        with suppress_stdout_stderr():
+            result = calendar_crew.kickoff(inputs=build_inputs(message))
+
+        reply = result if isinstance(result, str) else str(result)
+        return {"id": req_id, "reply": reply, "error": None}
+    except Exception as e:
+        return {"id": req_id, "reply": None, "error": str(e)}
+
+
+class FinalAnswerFilter:
+    """
+    The responder still answers in CrewAI's ReAct format
+    ("Thought: ...\nFinal Answer: ..."), so raw LLM deltas are held back
+    until the "Final Answer:" marker has streamed past and only the text
+    after it is forwarded to the chat box.
+    """
+
+    MARKER = "Final Answer:"
+
+    def __init__(self):
+        self._buffer = ""
+        self._open = False
+        self._started = False
+
+    def feed(self, text: str) -> str:
+        if not self._open:
+            self._buffer += text
+            idx = self._buffer.find(self.MARKER)
+            if idx < 0:
+                return ""
+            self._open = True
+            text = self._buffer[idx + len(self.MARKER):]
+            self._buffer = ""
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+def run_streaming_request(calendar_crew, req_id, message: str) -> dict:
+    """
+    Like run_request(), but uses CrewAI's streaming kickoff and emits a
+    { "type": "chunk", "id", "delta" } line for every piece of the responder
+    agent's final answer as it arrives. Returns the terminal "done" line,
+    which carries the full reply so Electron never depends on the chunks.
+    """
+    from crewai.types.streaming import StreamChunkType
+
+    if not getattr(calendar_crew, "streams", True):
+        resp = run_request(calendar_crew, req_id, message)
+        resp["type"] = "done"
+        return resp
+
+    # respond_to_user is the last task; only its agent's tokens are user-facing.
+    # The stream handler is global on the event bus, so chunks from other
+    # workers' crews show up here too and are dropped by agent id.
+    responder_id = str(calendar_crew.tasks[-1].agent.id)
+    answer = FinalAnswerFilter()
+    # A streaming kickoff also switches every agent's LLM to streaming and
+    # leaves it so. The crew is pooled: put all of it back for the next request.
+    llm_streams = [(agent.llm, getattr(agent.llm, "stream", False))
+                   for agent in calendar_crew.agents if agent.llm is not None]
+    streaming = None
+
+    try:
+        with suppress_stdout_stderr():
+            calendar_crew.stream = True
+            try:
+                streaming = calendar_crew.kickoff(inputs=build_inputs(message))
+                for chunk in streaming:
+                    if chunk.agent_id != responder_id:
+                        continue
+                    if chunk.chunk_type != StreamChunkType.TEXT:
+                        continue
+                    delta = answer.feed(chunk.content)
+                    if delta:
+                        emit({"type": "chunk", "id": req_id, "delta": delta})
+                result = streaming.result
+            finally:
+                if streaming is not None and not streaming.is_completed:
+                    # Let crewai's kickoff thread finish first: it sets
+                    # crew.stream back to True on its way out
+                    try:
+                        for _ in streaming:
+                            pass
+                    except Exception:
+                        pass
+                calendar_crew.stream = False
+                for llm, was_streaming in llm_streams:
+                    llm.stream = was_streaming
+
+        reply = result if isinstance(result, str) else str(result)
+        return {"type": "done", "id": req_id, "reply": reply, "error": None}
+    except Exception as e:
+        return {"type": "done", "id": req_id, "reply": None, "error": str(e)}
+
+
+def describe_import(counts: dict) -> str:
+    """One-line summary of an import_ics() result for the chat box."""
+    skipped = counts["overrides_skipped"] + counts["cancelled_skipped"] + counts["invalid_skipped"]
+    text = (f"Imported {counts['read']} event(s): {counts['inserted']} new, "
+            f"{counts['updated']} updated, {counts['unchanged']} unchanged")
+    if skipped:
+        text += f", {skipped} skipped"
+    if counts["rrules_dropped"]:
+        text += (f". {counts['rrules_dropped']} repeat rule(s) were not supported, "
+                 "so only their first occurrence was imported")
+    return text + "."
+
+
+def run_import(req_id, path: str):
+    """
+    Import an .ics file (ics_import.py), reporting progress as
+    { "type": "log", "id", "progress": {...} } lines after every batch, then
+    reply { "id", "reply", "error", "import": counts } like a chat request.
+    Runs on its own thread so chat requests are not held up behind it.
+    """
+    def progress(counts):
+        percent = 100 * counts["bytes_read"] // max(counts["total_bytes"], 1)
+        emit({
+            "type": "log",
+            "level": "info",
+            "id": req_id,
+            "message": f"ics_import {req_id}: {percent}% ({counts['read']} events read)",
+            "progress": counts,
+        })
+
+    conn = None
+    try:
+        conn = get_manager(get_db_path()).open_private()
+        with suppress_stdout_stderr():
+            counts = import_ics(conn, path, progress=progress)
+        emit({"id": req_id, "reply": describe_import(counts), "error": None, "import": counts})
+    except Exception as e:
+        emit({"id": req_id, "reply": None, "error": f"Import failed: {e}"})
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def run_export(req_id, path: str, fmt=None, start=None, end=None):
+    """
+    Stream events into a file (export.py: .ics or .jsonl, optionally only a
+    date range), with the same progress log lines and reply as run_import().
+    """
+    def progress(counts):
+        emit({
+            "type": "log",
+            "level": "info",
+            "id": req_id,
+            "message": f"export {req_id}: {counts['exported']} events written",
+            "progress": counts,
+        })
+
+    conn = None
+    try:
+        conn = get_manager(get_db_path()).open_private()
+        counts = export_to_file(conn, path, fmt, start=start, end=end, progress=progress)
+        reply = f"Exported {counts['exported']} event(s) to {path}."
+        if counts["skipped"]:
+            reply += f" {counts['skipped']} event(s) with unreadable times were left out."
+        emit({"id": req_id, "reply": reply, "error": None, "export": counts})
+    except Exception as e:
+        emit({"id": req_id, "reply": None, "error": f"Export failed: {e}"})
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def install_pipeline_cache(calendar_crew, cache):
+    """
+    Wrap a pipeline's LLMs with the response cache. The responder's answer
+    is built from rows in the calendar, so its entries are dropped whenever
+    the calendar DB changes.
+    """
+    tasks = getattr(calendar_crew, "tasks", None)
+    data_dependent = {tasks[-1].agent.role.strip()} if tasks else set()
+    return install_llm_cache(calendar_crew, cache, data_dependent)
+
+
+def kickoff_and_emit(calendar_crew, scope, req_id, message: str, stream: bool,
+                     queue_ms: float = None):
+    """
+    One request on one pipeline, reply (then cache stats and the metrics
+    line) emitted. queue_ms is how long the request waited for a worker.
+    """
+    metrics = begin_request(calendar_crew, req_id, queue_ms) if metrics_enabled() else None
+    if scope is not None:
+        scope.begin(message)
+    if stream:
+        resp = run_streaming_request(calendar_crew, req_id, message)
     else:
-        print(json.dumps({
+        resp = run_request(calendar_crew, req_id, message)
+    emit(resp)
+    if scope is not None:
+        emit({
             "type": "log",
-            "level": "warn",
-            "message": "No openai_api_key found in settings table"
-        }), flush=True)
+            "level": "info",
+            "message": f"llm_cache request {req_id}: {scope.hits} hit(s), "
+                       f"{scope.misses} miss(es); {scope.cache.summary()}",
+        })
+    if metrics is not None:
+        emit(metrics.finish(failed=resp.get("error") is not None))
+
+
+class CrewWorkerPool:
+    """
+    Runs up to `workers` kickoffs concurrently, each worker on its own copy
+    of the crew (kickoff mutates task/agent state, so crews are never shared).
+
+    Requests wait in a bounded queue; when it is full, submit() answers the
+    request with an error instead of blocking the stdin reader. Replies are
+    emitted as soon as each kickoff finishes, so they may arrive out of order;
+    Electron matches them by id.
+
+    With an LLMResponseCache, every copy gets its own LLM wrappers (copies
+    are made first, since copy() would not carry instance patches along).
+
+    reload_llms() swaps in new copies whose LLM clients use the current
+    OPENAI_API_KEY. Each worker picks up its crew per request, so kickoffs
+    already running finish on the old clients.
+
+    `build` returns the base crew. With background=True it runs on its own
+    thread and the pool accepts requests at once; workers wait for the build
+    before their first kickoff (and answer with an error if it failed).
+    """
+
+    def __init__(self, build, workers: int, queue_size: int, cache=None,
+                 background: bool = False):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._cache = cache
+        self._workers = workers
+        self._template = None
+        self._slots = None
+        self._build_error = None
+        self._built = threading.Event()
+        self._threads = []
+        if background:
+            threading.Thread(target=self._build, args=(build,), name="crew-build",
+                             daemon=True).start()
+        else:
+            self._build(build)
+        for i in range(workers):
+            t = threading.Thread(
+                target=self._worker_loop,
+                args=(i,),
+                name=f"crew-worker-{i}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def _build(self, build):
+        try:
+            base_crew = build()
+            # Unwrapped copy that reload_llms() makes new worker crews from
+            self._template = base_crew.copy()
+            crews = [base_crew] + [base_crew.copy() for _ in range(self._workers - 1)]
+            self._slots = [self._prepare(crew_copy) for crew_copy in crews]
+        except Exception as e:
+            self._build_error = e
+            emit({"type": "log", "level": "error", "message": f"Building the pipeline failed: {e}"})
+        finally:
+            self._built.set()
+
+    def _prepare(self, calendar_crew):
+        scope = install_pipeline_cache(calendar_crew, self._cache) if self._cache is not None else None
+        return calendar_crew, scope
+
+    def reload_llms(self):
+        """Rebuild every worker's LLM clients for the current key."""
+        self._built.wait()  # a build still running may have read the old key
+        if self._build_error is not None:
+            raise RuntimeError(f"the pipeline could not be built: {self._build_error}")
+        slots = []
+        for _ in self._threads:
+            crew_copy = self._template.copy()
+            refresh_llm_clients(crew_copy)
+            slots.append(self._prepare(crew_copy))
+        self._slots = slots  # one assignment: workers see old or new, never a mix
+
+    def _worker_loop(self, index: int):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                req_id, message, stream, queued_at = item
+                self._built.wait()
+                if self._build_error is not None:
+                    emit_error(req_id, f"The assistant could not start: {self._build_error}", stream)
+                    continue
+                calendar_crew, scope = self._slots[index]
+                queue_ms = round((time.perf_counter() - queued_at) * 1000, 1)
+                kickoff_and_emit(calendar_crew, scope, req_id, message, stream, queue_ms)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, req_id, message: str, stream: bool = False) -> bool:
+        """
+        Queue a request. Returns False (and replies with an error) if full.
+        """
+        try:
+            self._queue.put_nowait((req_id, message, stream, time.perf_counter()))
+            return True
+        except queue.Full:
+            emit_error(req_id, "The assistant is busy with other requests. "
+                               "Please try again in a moment.", stream)
+            return False
+
+    def shutdown(self):
+        """
+        Let queued requests finish, then stop the workers.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+
+def build_pipeline_timed():
+    """build_pipeline() for the lazy startup, logging how long it took."""
+    timer = StartupTimer(time.perf_counter())
+    pipeline = build_pipeline(timer)
+    emit({
+        "type": "log",
+        "level": "info",
+        "message": f"pipeline built in {timer.total_ms()} ms: {timer.phases}",
+    })
+    return pipeline
+
+
+class ForkedWorkerPool(CrewWorkerPool):
+    """
+    CrewWorkerPool whose workers are processes forked from the zygote
+    (zygote.py) rather than threads holding crew copies. The queue, submit()
+    and shutdown() are the same; each thread here owns one worker process
+    and relays its lines to Electron.
+
+    A worker that dies is forked again for the next request (the request it
+    was running gets an error). reload_llms() makes every worker reload
+    the current key before its next request, so running kickoffs finish on
+    the old one.
+    """
+
+    def __init__(self, workers: int, queue_size: int, cache_enabled: bool):
+        from zygote import start_zygote
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._cache_enabled = cache_enabled
+        self._generation = 0
+        self._ctx = start_zygote([CURRENT_DIR, PARENT_DIR])
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(
+                target=self._relay_loop,
+                name=f"crew-relay-{i}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def reload_llms(self):
+        self._generation += 1
+
+    def _spawn(self):
+        from zygote import WorkerProcess
+        generation = self._generation
+        worker = WorkerProcess(self._ctx, self._cache_enabled, os.getenv("OPENAI_API_KEY"))
+        worker.generation = generation
+        emit({
+            "type": "log",
+            "level": "info",
+            "message": f"forked crew worker {worker.pid} in {worker.spawn_ms} ms",
+        })
+        return worker
+
+    def _relay_loop(self):
+        from zygote import WorkerDied
+        worker = None
+        try:
+            # Fork ahead of the first request (this waits for the zygote to warm up)
+            worker = self._spawn()
+        except WorkerDied as e:
+            emit({"type": "log", "level": "warn", "message": f"Crew worker not started: {e}"})
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    req_id, message, stream, queued_at = item
+                    if worker is None or not worker.alive():
+                        if worker is not None:
+                            worker.close(0)
+                        try:
+                            worker = self._spawn()
+                        except WorkerDied as e:
+                            worker = None
+                            emit_error(req_id, f"The assistant could not start: {e}", stream)
+                            continue
+                    try:
+                        if worker.generation != self._generation:
+                            generation = self._generation
+                            worker.request(("reload", os.getenv("OPENAI_API_KEY")), write_line)
+                            worker.generation = generation
+                        queue_ms = round((time.perf_counter() - queued_at) * 1000, 1)
+                        worker.request(("kickoff", req_id, message, stream, queue_ms), write_line)
+                    except WorkerDied as e:
+                        emit_error(req_id, f"The assistant stopped unexpectedly ({e}). "
+                                           "Please try again.", stream)
+                        worker.close(0)
+                        worker = None
+                finally:
+                    self._queue.task_done()
+        finally:
+            if worker is not None:
+                worker.close()
 
 
 def main():
+    # 0. No crewai console rendering: nothing would ever see it (quiet.py).
+    #    CALENDAR_QUIET=0 keeps it, still behind suppress_stdout_stderr()
+    os.environ.setdefault(QUIET_ENV, "1")
+
     # 1. Load key
     load_openai_key_from_sqlite()
+    maintain_change_log()
+    set_write_listener(emit_events_changed)
+    startup_timer.mark("settings")
 
-    # 2. Build the CrewAI pipeline
-    calendar_crew = CalendarInteractionCrew().crew()
+    # 2. Build the pipeline (one independent copy per worker): before
+    #    "ready" when eager, on a background thread when lazy, in the
+    #    zygote's fork server with CALENDAR_RUNNER_ZYGOTE=1
+    workers = get_worker_count()
+    startup_mode = get_startup_mode()
+    if zygote_enabled():
+        from zygote import zygote_supported
+        if zygote_supported():
+            startup_mode = "zygote"
+        else:
+            emit({"type": "log", "level": "warn",
+                  "message": "CALENDAR_RUNNER_ZYGOTE needs fork; using worker threads"})
+    # Zygote workers open their own cache; the runner does not use one
+    llm_cache = build_llm_cache() if startup_mode != "zygote" else None
+    startup_timer.mark("llm_cache")
+    zygote_cache = startup_mode == "zygote" and llm_cache_enabled()
+    if startup_mode == "zygote":
+        pool = ForkedWorkerPool(workers, get_queue_size(), zygote_cache)
+    elif startup_mode == "eager":
+        pool = CrewWorkerPool(lambda: build_pipeline(startup_timer), workers,
+                              get_queue_size(), llm_cache)
+    else:
+        pool = CrewWorkerPool(build_pipeline_timed, workers, get_queue_size(), llm_cache,
+                              background=True)
+    startup_timer.mark("pool")
+    emit({
+        "type": "log",
+        "level": "info",
+        "message": f"crewai_runner ready with {workers} worker(s), "
+                   f"pipeline={get_pipeline_mode()}, startup={startup_mode}, "
+                   f"llm_cache={'on' if llm_cache is not None or zygote_cache else 'off'}, "
+                   f"quiet={'on' if quiet_enabled() else 'off'}, trace={get_trace_mode()}, "
+                   f"metrics={'on' if metrics_enabled() else 'off'}",
+    })
+    emit({
+        "type": "ready",
+        "startup_ms": startup_timer.total_ms(),
+        "phases": startup_timer.phases,
+    })
 
-    # 3. Listen for JSON lines: { "id": <number>, "message": <string> }
+    # 3. Listen for JSON lines: { "id": <number>, "message": <string>, "stream"?: <bool> }
+    #    or { "id": <number>, "type": "import_ics", "path": <string> }
+    #    or { "id": <number>, "type": "export_events", "path": <string>,
+    #         "format"?: "ics" | "jsonl", "start"?: <iso>, "end"?: <iso> }
+    #    or { "id": <number>, "type": "reload_settings" }
+    transfers = []
     for line in sys.stdin:
         line = line.strip()
         if not line:
@@ -102,39 +935,64 @@ def main():
             req = json.loads(line)
             req_id = req.get("id")
             message = req.get("message", "")
+            stream = bool(req.get("stream", False))
+            command = req.get("type")
         except Exception as e:
             err_resp = {
                 "id": None,
                 "reply": None,
                 "error": f"Invalid JSON from Electron: {e}"
             }
-            print(json.dumps(err_resp), flush=True)
+            emit(err_resp)
             continue
 
-        try:
-            # Suppress CrewAI's pretty printing (boxes, tracing banners, etc.)
+        if command == "reload_settings":
+            reload_settings(pool, req_id)
+            continue
+
+        if command in ("import_ics", "export_events"):
+            if command == "import_ics":
+                target, args = run_import, (req_id, req.get("path", ""))
+            else:
+                target, args = run_export, (req_id, req.get("path", ""), req.get("format"),
+                                            req.get("start"), req.get("end"))
+            t = threading.Thread(target=target, args=args,
+                                 name=f"{command}-{req_id}", daemon=True)
+            t.start()
+            # Only the running ones need joining at exit
+            transfers = [other for other in transfers if other.is_alive()] + [t]
+            continue
+
+        # Formulaic commands are answered right here, without queueing
+        # behind (or paying for) a crew kickoff.
+        if fast_path_enabled():
             with suppress_stdout_stderr():
-                now = datetime.now()
-                # Pass both user_input and user_query so any template is satisfied
-                # AND inject current date context
-                result = calendar_crew.kickoff(
-                    inputs={
-                        "user_input": message,
-                        "user_query": message,
-                        "current_date": now.strftime("%Y-%m-%d"),
-                        "current_time": now.strftime("%H:%M"),
-                        "current_year": str(now.year),
-                    }
-                )
-
-            reply = result if isinstance(result, str) else str(result)
-            resp = {"id": req_id, "reply": reply, "error": None}
-        except Exception as e:
-            resp = {"id": req_id, "reply": None, "error": str(e)}
+                hit = try_fast_path(message)
+            emit({
+                "type": "log",
+                "level": "info",
+                "message": f"fast_path {'hit (' + hit[0] + ')' if hit else 'miss'}: "
+                           f"{fast_path_stats.summary()}",
+            })
+            if hit:
+                resp = {"id": req_id, "reply": hit[1], "error": None}
+                if stream:
+                    resp["type"] = "done"
+                emit(resp)
+                continue
+
+        # Replies ({ "id", "reply", "error" }, or chunk lines followed by a
+        # "done" line when streaming) are emitted by the workers
+        pool.submit(req_id, message, stream)
 
-        # This is the ONLY non-log thing we print: one JSON line for Electron
-        print(json.dumps(resp), flush=True)
+    # stdin closed: finish what is already queued before exiting
+    pool.shutdown()
+    for t in transfers:
+        t.join()
 
 
 if __name__ == "__main__":
+    # Lets a frozen (PyInstaller) runner start the zygote's fork server
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Shared SQLite connection manager.
+
+sqlite_tool, the runner and iteration_1/db_client used to open (and close)
+a fresh sqlite3 connection for every query. Each thread now keeps two
+persistent connections per database file:
+
+  - a read/write connection in WAL mode, for INSERT/UPDATE/DELETE/DDL
+  - a read-only connection (mode=ro), for SELECTs
+
+Both wait up to busy_timeout for Electron's better-sqlite3 writer instead of
+failing with "database is locked", and keep a larger prepared-statement cache
+so repeated queries skip the parse/plan step.
+
+Tuning via environment:
+  CALENDAR_DB_BUSY_TIMEOUT_MS   (default 5000)
+  CALENDAR_DB_STATEMENT_CACHE   (default 256)
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_STATEMENT_CACHE = 256
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class ConnectionManager:
+    """Per-thread read/write and read-only connections to one database file."""
+
+    def __init__(self, db_path: str,
+                 busy_timeout_ms: Optional[int] = None,
+                 cached_statements: Optional[int] = None):
+        self.db_path = os.path.abspath(db_path)
+        self.busy_timeout_ms = (
+            busy_timeout_ms if busy_timeout_ms is not None
+            else _env_int("CALENDAR_DB_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS)
+        )
+        self.cached_statements = (
+            cached_statements if cached_statements is not None
+            else _env_int("CALENDAR_DB_STATEMENT_CACHE", DEFAULT_STATEMENT_CACHE)
+        )
+        self._local = threading.local()
+        # Every connection ever handed out, so close_all() can reach the
+        # ones owned by other threads (hence check_same_thread=False; each
+        # connection is still only used by the thread that opened it).
+        self._all = []
+        self._all_lock = threading.Lock()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self, read_only: bool, busy_timeout_ms: Optional[int] = None) -> sqlite3.Connection:
+        if busy_timeout_ms is None:
+            busy_timeout_ms = self.busy_timeout_ms
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                timeout=busy_timeout_ms / 1000.0,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=busy_timeout_ms / 1000.0,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
+            # Electron already puts the file in WAL mode; this keeps a
+            # standalone Python process (tests, db_client) consistent with it.
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _open(self, read_only: bool, busy_timeout_ms: Optional[int] = None) -> sqlite3.Connection:
+        conn = self._connect(read_only, busy_timeout_ms)
+        with self._all_lock:
+            self._all.append(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        """Run schema.ensure_schema() once per database file."""
+        if self._schema_ready:
+            return
+        from calendar_interaction.schema import ensure_schema
+        with self._schema_lock:
+            if not self._schema_ready:
+                self._schema_ready = ensure_schema(conn)
+
+    def writer(self) -> sqlite3.Connection:
+        """This thread's read/write connection."""
+        conn = getattr(self._local, "writer", None)
+        if conn is None:
+            conn = self._local.writer = self._open(read_only=False)
+        self._ensure_schema(conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """
+        This thread's read-only connection. Falls back to the writer if the
+        file cannot be opened read-only (e.g. it does not exist yet).
+        """
+        if not self._schema_ready:
+            self.writer()
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            try:
+                conn = self._open(read_only=True)
+            except sqlite3.OperationalError:
+                conn = self.writer()
+            self._local.reader = conn
+        return conn
+
+    def cache_writer(self) -> Optional[sqlite3.Connection]:
+        """
+        This thread's connection for best-effort cache writes (the recurrence
+        month cache), or None if it cannot be opened. It is separate from
+        writer(), so a cache fill never commits that connection's transaction,
+        and it does not wait for the write lock: a busy database means no fill.
+        """
+        conn = getattr(self._local, "cache_writer", None)
+        if conn is None:
+            if not self._schema_ready:
+                self.writer()
+            try:
+                conn = self._open(read_only=False, busy_timeout_ms=0)
+            except sqlite3.Error:
+                return None
+            self._local.cache_writer = conn
+        return conn
+
+    def open_private(self) -> sqlite3.Connection:
+        """
+        A read/write connection outside the pool, for one-off threads (an
+        import or export) that would otherwise leave a pooled connection
+        behind when they exit. The caller closes it.
+        """
+        conn = self._connect(read_only=False)
+        try:
+            self._ensure_schema(conn)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def connection_for(self, sql: str) -> sqlite3.Connection:
+        """reader() for SELECT statements, writer() for everything else."""
+        return self.reader() if is_read_only_sql(sql) else self.writer()
+
+    def close_all(self):
+        """Close every connection this manager opened, on any thread."""
+        with self._all_lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+def is_read_only_sql(sql: str) -> bool:
+    return sql.lstrip().upper().startswith("SELECT")
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(db_path: Optional[str] = None) -> ConnectionManager:
+    """
+    The process-wide ConnectionManager for db_path (default:
+    CALENDAR_DB_PATH), created on first use.
+    """
+    db_path = os.path.abspath(db_path or os.getenv("CALENDAR_DB_PATH", "calendar_llm.db"))
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None:
+            manager = _managers[db_path] = ConnectionManager(db_path)
+        return manager
+
+
+def close_all():
+    """Close every pooled connection (all databases, all threads)."""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.close_all()
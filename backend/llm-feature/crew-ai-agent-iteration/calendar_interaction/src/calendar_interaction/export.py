@@ -0,0 +1,225 @@
+"""
+Streaming export of the events table, as iCalendar (.ics) or JSONL.
+
+Rows come from one cursor read with fetchmany(batch_size) and are written
+to the output as they arrive, so memory depends on the batch size, not the
+calendar. The single SELECT also reads one consistent snapshot, even if the
+calendar is written to during a long export.
+
+Range filters
+-------------
+start/end (ISO, naive local or "Z") limit the export to non-recurring
+events overlapping [start, end), plus recurring series starting before
+end. Series are exported as their master row with its RRULE, never as
+expanded occurrences, so a range export still imports back as the same
+series. Without a range every event is exported.
+
+Formats
+-------
+ics    one VEVENT per row, lines folded at 75 octets and CRLF-terminated.
+       UID is the row's uid (set by ics_import.py) or "event-<id>@calendar-llm",
+       so exporting and importing again updates instead of duplicating.
+       Timed events are written in UTC. Recurring series keep their local
+       wall time (floating), so their occurrences do not shift across DST
+       changes. All-day events are DATE values. Rows whose times SQLite
+       cannot parse are skipped and counted.
+jsonl  one JSON object per row with the stored columns (not the derived
+       start_utc/end_utc/day_key, which the triggers rebuild on import).
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+
+from calendar_interaction.recurrence import parse_local
+from calendar_interaction.schema import EPOCH_MAX, EPOCH_MIN, utc_epoch
+
+
+DEFAULT_BATCH_SIZE = 500
+FORMATS = ("ics", "jsonl")
+
+COLUMNS = ("id", "uid", "title", "description", "start_time", "end_time", "all_day",
+           "location", "rrule", "created_at", "updated_at")
+
+# Rowid order: a plain table walk, no sort
+EXPORT_SQL = f"SELECT {', '.join(COLUMNS)}, start_utc, end_utc FROM events ORDER BY id"
+
+EXPORT_RANGE_SQL = f"""
+SELECT {', '.join(COLUMNS)}, start_utc, end_utc
+FROM events
+WHERE (start_utc < :end_utc AND end_utc > :start_utc AND (rrule IS NULL OR rrule = ''))
+   OR (rrule IS NOT NULL AND rrule <> '' AND IFNULL(start_utc < :end_utc, 1))
+ORDER BY id
+"""
+
+ICS_HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//calendar-llm//export//EN\r\nCALSCALE:GREGORIAN\r\n"
+ICS_FOOTER = "END:VCALENDAR\r\n"
+
+
+def iter_events(conn, start: Optional[str] = None, end: Optional[str] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Events rows as dicts, in id order, fetched batch_size at a time.
+    start/end filter as described in the module docstring.
+    Raises ValueError for an unparseable bound.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    if start is None and end is None:
+        cur.execute(EXPORT_SQL)
+    else:
+        start_utc = utc_epoch(start) if start else EPOCH_MIN
+        end_utc = utc_epoch(end) if end else EPOCH_MAX
+        if start_utc is None or end_utc is None:
+            raise ValueError(f"Invalid export range: {start!r} to {end!r}")
+        cur.execute(EXPORT_RANGE_SQL, {"start_utc": start_utc, "end_utc": end_utc})
+
+    names = [d[0] for d in cur.description]
+    try:
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                yield dict(zip(names, row))
+    finally:
+        cur.close()
+
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """RFC 5545 folding: at most 75 octets per line, never splitting a character."""
+    if len(line) <= 75 and len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], "", 0
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += ch
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc_stamp(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _sqlite_stamp(value: Optional[str]) -> Optional[str]:
+    """created_at/updated_at (SQLite datetime('now'), UTC) as an iCalendar UTC time."""
+    try:
+        return datetime.fromisoformat(value).strftime("%Y%m%dT%H%M%SZ")
+    except (TypeError, ValueError):
+        return None
+
+
+def _times(row: Dict[str, Any]) -> Optional[tuple]:
+    """(DTSTART line, DTEND line) for a row, or None if its times are unusable."""
+    if row["all_day"]:
+        first, last = parse_local(row["start_time"]), parse_local(row["end_time"])
+        if first is None:
+            return None
+        first = first.date()
+        last = last.date() if last is not None and last.date() > first else first + timedelta(days=1)
+        return f"DTSTART;VALUE=DATE:{first:%Y%m%d}", f"DTEND;VALUE=DATE:{last:%Y%m%d}"
+    if row["rrule"]:
+        first, last = parse_local(row["start_time"]), parse_local(row["end_time"])
+        if first is None or last is None:
+            return None
+        return f"DTSTART:{first:%Y%m%dT%H%M%S}", f"DTEND:{last:%Y%m%dT%H%M%S}"
+    if row["start_utc"] is None or row["end_utc"] is None:
+        return None
+    return f"DTSTART:{_utc_stamp(row['start_utc'])}", f"DTEND:{_utc_stamp(row['end_utc'])}"
+
+
+def vevent(row: Dict[str, Any]) -> Optional[str]:
+    """One events row as a folded VEVENT block, or None if it has no usable times."""
+    times = _times(row)
+    if times is None:
+        return None
+    uid = row["uid"] or f"event-{row['id']}@calendar-llm"
+    stamp = _sqlite_stamp(row["updated_at"]) or _utc_stamp(int(datetime.now().timestamp()))
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{_escape(uid)}",
+        f"DTSTAMP:{stamp}",
+        *times,
+        f"SUMMARY:{_escape(row['title'] or '')}",
+    ]
+    if row["description"]:
+        lines.append(f"DESCRIPTION:{_escape(row['description'])}")
+    if row["location"]:
+        lines.append(f"LOCATION:{_escape(row['location'])}")
+    if row["rrule"]:
+        lines.append(f"RRULE:{row['rrule'].strip().removeprefix('RRULE:')}")
+    created = _sqlite_stamp(row["created_at"])
+    if created:
+        lines.append(f"CREATED:{created}")
+    lines.append(f"LAST-MODIFIED:{stamp}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def _json_line(row: Dict[str, Any]) -> str:
+    return json.dumps({k: row[k] for k in COLUMNS}, ensure_ascii=False) + "\n"
+
+
+def export_events(conn, out: IO[str], fmt: str = "ics",
+                  start: Optional[str] = None, end: Optional[str] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """
+    Write events to `out` (a text file or pipe; open .ics files with
+    newline="" so CRLFs are kept) as they are read. progress, if given, is
+    called with the running counts every batch_size rows.
+    Returns {"exported", "skipped"}. Raises ValueError for an unknown
+    format or an unparseable range.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {FORMATS})")
+    counts = {"exported": 0, "skipped": 0}
+
+    if fmt == "ics":
+        out.write(ICS_HEADER)
+    for n, row in enumerate(iter_events(conn, start, end, batch_size), 1):
+        text = vevent(row) if fmt == "ics" else _json_line(row)
+        if text is None:
+            counts["skipped"] += 1
+        else:
+            out.write(text)
+            counts["exported"] += 1
+        if progress is not None and n % batch_size == 0:
+            progress(dict(counts))
+    if fmt == "ics":
+        out.write(ICS_FOOTER)
+
+    if progress is not None:
+        progress(dict(counts))
+    return counts
+
+
+def export_to_file(conn, path: str, fmt: Optional[str] = None, **options) -> Dict[str, int]:
+    """
+    export_events() into the file at path (format from its extension unless
+    given). Written to a temporary file first and moved into place, so a
+    failed export never leaves a truncated backup behind.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "ics"
+    tmp_path = f"{path}.partial"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+            counts = export_events(conn, out, fmt, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return counts
@@ -0,0 +1,456 @@
+"""
+Deterministic fast path for formulaic calendar commands.
+
+Messages like "what do I have tomorrow", "delete everything on Friday" or
+"lunch with Sam at 1pm tomorrow" are matched against a small set of strict
+patterns, run directly against SQLite with parameterized SQL and answered
+from a template. Anything that does not match with high confidence returns
+None so the caller falls through to CalendarInteractionCrew.
+"""
+
+import re
+import json
+import threading
+from datetime import date, datetime, time, timedelta
+
+from calendar_interaction.tools.sqlite_tool import _run_sql, _events_between
+from calendar_interaction.schema import DELETE_ON_DAY_SQL
+
+
+WEEKDAYS = [
+    "monday", "tuesday", "wednesday", "thursday",
+    "friday", "saturday", "sunday",
+]
+
+DEFAULT_DURATION = timedelta(hours=1)
+
+# Words that make a message a question / edit rather than a new event title.
+NON_TITLE_WORDS = {
+    "what", "whats", "what's", "when", "where", "who", "why", "how",
+    "is", "am", "are", "do", "does", "did", "can", "could", "should",
+    "will", "would", "any", "show", "list", "get", "find", "delete",
+    "remove", "clear", "cancel", "move", "push", "reschedule", "change",
+    "update", "rename", "shift", "postpone", "i", "my", "please",
+    # Commands that are not "create an event called ..."
+    "skip", "drop", "remind", "stop", "undo", "block", "free", "keep",
+    "tell", "ask", "let", "make", "don't", "dont", "no", "not", "never",
+    "nothing", "none",
+}
+
+# Words that, anywhere in a would-be title, make the message a negation or
+# an instruction ("lunch is not at 1pm tomorrow", "wake me at 7am tomorrow")
+NON_TITLE_ANYWHERE = {
+    "not", "no", "don't", "dont", "never", "nothing", "anything",
+    "everything", "instead", "me",
+}
+
+# ---------- building blocks ----------
+
+DAY = (
+    r"(?P<day>today|tonight|tomorrow|tmrw"
+    r"|(?:on\s+)?(?:this\s+)?(?:" + "|".join(WEEKDAYS) + r")"
+    r"|(?:on\s+)?\d{4}-\d{2}-\d{2})"
+)
+WEEK = r"(?P<week>this\s+week|next\s+week)"
+CLOCK = r"(?:\d{1,2}(?::\d{2})?\s*(?:am|pm)?|noon|midnight)"
+TIME = (
+    r"(?:at\s+(?P<at>" + CLOCK + r")"
+    r"|from\s+(?P<start>" + CLOCK + r")\s+(?:to|until|till|-)\s+(?P<end>" + CLOCK + r"))"
+)
+DURATION = (
+    r"(?:\s+for\s+(?P<dur_n>\d+|an?|half\s+an)\s*"
+    r"(?P<dur_unit>minutes?|mins?|hours?|hrs?|h))?"
+)
+
+LIST_PATTERNS = [
+    re.compile(
+        r"^what\s+(?:do\s+i\s+have|have\s+i\s+got|is\s+on(?:\s+my\s+(?:calendar|schedule))?"
+        r"|is\s+happening|events\s+do\s+i\s+have)"
+        r"(?:\s+(?:on|for))?\s+(?:" + DAY + "|" + WEEK + r")$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^(?:show|list|get)(?:\s+me)?(?:\s+all)?(?:\s+(?:of\s+)?my)?\s+"
+        r"(?:events|schedule|calendar|agenda|meetings)"
+        r"(?:\s+(?:for|on))?\s+(?:" + DAY + "|" + WEEK + r")$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^what\s+is\s+(?:my\s+)?(?:schedule|agenda|calendar)"
+        r"(?:\s+(?:for|on|like))?\s+(?:" + DAY + "|" + WEEK + r")$",
+        re.IGNORECASE,
+    ),
+]
+
+DELETE_PATTERNS = [
+    re.compile(
+        r"^(?:delete|remove|clear|cancel)\s+"
+        r"(?:everything|all(?:\s+(?:of\s+)?my)?\s+events|all|my\s+events)"
+        r"(?:\s+(?:on|for))?\s+" + DAY + r"$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^clear\s+(?:my\s+)?(?:calendar|schedule)(?:\s+(?:on|for))?\s+" + DAY + r"$",
+        re.IGNORECASE,
+    ),
+]
+
+CREATE_VERB = r"(?:(?:schedule|add|create|book|put|set\s+up)\s+(?:an?\s+)?)?"
+CREATE_PATTERNS = [
+    # "lunch with Sam at 1pm tomorrow"
+    re.compile(
+        r"^" + CREATE_VERB + r"(?P<title>[a-z][\w'&\- ]*?)\s+" + TIME + DURATION
+        + r"\s+" + DAY + r"$",
+        re.IGNORECASE,
+    ),
+    # "lunch with Sam tomorrow at 1pm"
+    re.compile(
+        r"^" + CREATE_VERB + r"(?P<title>[a-z][\w'&\- ]*?)\s+" + DAY + r"\s+" + TIME
+        + DURATION + r"$",
+        re.IGNORECASE,
+    ),
+]
+
+
+# ---------- parsing helpers ----------
+
+def _normalize(message: str) -> str:
+    text = re.sub(r"\s+", " ", message.strip())
+    text = text.rstrip(".!")
+    # Contractions that would otherwise need their own pattern variants
+    text = re.sub(r"\bwhat'?s\b", "what is", text, flags=re.IGNORECASE)
+    return text
+
+
+def resolve_day(text: str, today: date):
+    """Resolve a DAY match to a concrete date, or None if ambiguous."""
+    text = text.lower()
+    text = re.sub(r"^(?:on\s+)?(?:this\s+)?", "", text)
+    if text in ("today", "tonight"):
+        return today
+    if text in ("tomorrow", "tmrw"):
+        return today + timedelta(days=1)
+    if text in WEEKDAYS:
+        # The next occurrence, counting today ("on Friday" said on a Friday)
+        return today + timedelta(days=(WEEKDAYS.index(text) - today.weekday()) % 7)
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def resolve_week(text: str, today: date):
+    """Return [monday, next monday) for "this week" / "next week"."""
+    monday = today - timedelta(days=today.weekday())
+    if text.lower().split()[0] == "next":
+        monday += timedelta(days=7)
+    return monday, monday + timedelta(days=7)
+
+
+def parse_clock(text: str, default_meridiem=None):
+    """
+    Parse '1pm', '1:30 pm', '13:00', 'noon'. Bare hours without am/pm
+    ('at 3') are ambiguous and return None unless a meridiem is inherited
+    from the other end of a range ('from 2 to 3pm').
+    """
+    text = text.lower().replace(" ", "")
+    if text == "noon":
+        return time(12, 0)
+    if text == "midnight":
+        return time(0, 0)
+    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?(am|pm)?", text)
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = m.group(3) or default_meridiem
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif m.group(2) is None or hour > 23:
+        return None
+    if minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def _parse_duration(n: str, unit: str):
+    if n is None:
+        return None
+    n = n.lower()
+    if n in ("a", "an"):
+        amount = 1.0
+    elif n.startswith("half"):
+        amount = 0.5
+    else:
+        amount = float(n)
+    if unit.lower().startswith(("h", "hr")):
+        return timedelta(hours=amount)
+    return timedelta(minutes=amount)
+
+
+def _meridiem(text: str):
+    m = re.search(r"(am|pm)\s*$", text.lower())
+    return m.group(1) if m else None
+
+
+def parse_command(message: str, now: datetime = None):
+    """
+    Classify `message` into one of the fast-path intents.
+
+    Returns a dict { "intent": ..., "fields": {...} } shaped like the
+    interpret_user_query output, or None when not confident.
+    """
+    now = now or datetime.now()
+    today = now.date()
+    text = _normalize(message)
+    if not text or "?" in text.rstrip("?"):
+        return None
+    text = text.rstrip("?").strip()
+
+    for pattern in LIST_PATTERNS:
+        m = pattern.match(text)
+        if not m:
+            continue
+        if m.group("week"):
+            start, end = resolve_week(m.group("week"), today)
+            label = m.group("week").lower()
+        else:
+            start = resolve_day(m.group("day"), today)
+            if start is None:
+                return None
+            end = start + timedelta(days=1)
+            label = m.group("day").lower()
+        return {
+            "intent": "list_events",
+            "fields": {"start": start, "end": end, "label": label},
+        }
+
+    for pattern in DELETE_PATTERNS:
+        m = pattern.match(text)
+        if not m:
+            continue
+        day = resolve_day(m.group("day"), today)
+        if day is None:
+            return None
+        return {
+            "intent": "delete_event",
+            "fields": {"date": day, "label": m.group("day").lower()},
+        }
+
+    for pattern in CREATE_PATTERNS:
+        m = pattern.match(text)
+        if not m:
+            continue
+        title = m.group("title").strip()
+        words = title.lower().split()
+        if (not words or words[0] in NON_TITLE_WORDS or len(words) > 8
+                or NON_TITLE_ANYWHERE.intersection(words)):
+            return None
+        day = resolve_day(m.group("day"), today)
+        if day is None:
+            return None
+
+        if m.group("at"):
+            start_t = parse_clock(m.group("at"))
+            end_t = None
+        else:
+            end_meridiem = _meridiem(m.group("end"))
+            start_t = parse_clock(m.group("start"), default_meridiem=end_meridiem)
+            end_t = parse_clock(m.group("end"))
+        if start_t is None or (m.group("end") and end_t is None):
+            return None
+
+        start_dt = datetime.combine(day, start_t)
+        if end_t is not None:
+            end_dt = datetime.combine(day, end_t)
+            if end_dt <= start_dt:
+                return None
+        else:
+            duration = _parse_duration(m.group("dur_n"), m.group("dur_unit") or "")
+            end_dt = start_dt + (duration or DEFAULT_DURATION)
+
+        return {
+            "intent": "create_event",
+            "fields": {
+                "title": title[0].upper() + title[1:],
+                "start": start_dt,
+                "end": end_dt,
+            },
+        }
+
+    return None
+
+
+# ---------- execution + templated replies ----------
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _fmt_day(d: date, label: str) -> str:
+    pretty = d.strftime("%A, %b %d").replace(" 0", " ")
+    if label in ("today", "tonight", "tomorrow", "tmrw"):
+        return f"{'tomorrow' if label == 'tmrw' else label} ({pretty})"
+    return f"on {pretty}"
+
+
+def _fmt_time(dt: datetime) -> str:
+    return dt.strftime("%I:%M %p").lstrip("0")
+
+
+def _parse_stored(value: str):
+    """Best-effort parse of a stored start/end_time for display."""
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def describe_event(row: dict) -> str:
+    """Render one events row as a bullet line for templated replies."""
+    if row.get("all_day"):
+        return f"• All day: {row['title']}"
+    start, end = _parse_stored(row["start_time"]), _parse_stored(row["end_time"])
+    if start is None or end is None:
+        return f"• {row['start_time']} – {row['end_time']}: {row['title']}"
+    return f"• {_fmt_time(start)} – {_fmt_time(end)}: {row['title']}"
+
+
+def describe_conflicts(conflicts) -> str:
+    """
+    A note listing the events a write now overlaps (the "conflicts" of a
+    _run_sql result), starting with a blank line; "" if there are none.
+    """
+    others = {}
+    for entry in conflicts or []:
+        for other in entry.get("conflicts_with", []):
+            others.setdefault((other.get("id"), other.get("start_time")), other)
+    if not others:
+        return ""
+    lines = "\n".join(describe_event(o) for o in others.values())
+    return f"\n\nHeads up, this overlaps with:\n{lines}"
+
+
+def describe_span(span: dict) -> str:
+    """Render one free/busy block ({start, end} local ISO) as a bullet line."""
+    start, end = _parse_stored(span["start"]), _parse_stored(span["end"])
+    if start is None or end is None:
+        return f"• {span['start']} – {span['end']}"
+    end_day = "" if end.date() == start.date() else end.strftime("%a ")
+    return f"• {start:%a} {_fmt_time(start)} – {end_day}{_fmt_time(end)}"
+
+
+def _sql(sql: str, params) -> dict:
+    result = json.loads(_run_sql(sql, params))
+    if not result.get("success"):
+        raise RuntimeError(result.get("error") or "SQL failed")
+    return result
+
+
+def execute_command(parsed: dict) -> str:
+    """Run a parsed fast-path command against SQLite and render the reply."""
+    intent, fields = parsed["intent"], parsed["fields"]
+
+    if intent == "list_events":
+        start = datetime.combine(fields["start"], time(0, 0))
+        end = datetime.combine(fields["end"], time(0, 0))
+        listed = _events_between(_iso(start), _iso(end))
+        if not listed.get("success"):
+            raise RuntimeError(listed.get("error") or "SQL failed")
+        rows = listed["rows"]
+        label = fields["label"]
+        when = label if "week" in label else _fmt_day(fields["start"], label)
+        if not rows:
+            return f"Nothing on your calendar {when}. Enjoy the free time!"
+        noun = "event" if len(rows) == 1 else "events"
+        lines = [f"You have {len(rows)} {noun} {when}:"]
+        for row in rows:
+            line = describe_event(row)
+            if "week" in label:
+                start_dt = _parse_stored(row["start_time"])
+                if start_dt is not None:
+                    line = line.replace("• ", f"• {start_dt.strftime('%a')} ", 1)
+            lines.append(line)
+        return "\n".join(lines)
+
+    if intent == "delete_event":
+        day = fields["date"]
+        deleted = _sql(DELETE_ON_DAY_SQL, (day.isoformat(),))["rows_affected"]
+        when = _fmt_day(day, fields["label"])
+        if deleted == 0:
+            return f"There were no events to delete {when}."
+        noun = "event" if deleted == 1 else "events"
+        return f"Done — I removed {deleted} {noun} {when}."
+
+    if intent == "create_event":
+        start, end = fields["start"], fields["end"]
+        result = _sql(
+            """
+            INSERT INTO events (title, description, start_time, end_time, all_day, location)
+            VALUES (?, ?, ?, ?, 0, ?)
+            """,
+            (fields["title"], "", _iso(start), _iso(end), ""),
+        )
+        return (
+            f"Got it — I've added **{fields['title']}** on "
+            f"{start.strftime('%A, %b %d').replace(' 0', ' ')} from "
+            f"{_fmt_time(start)} to {_fmt_time(end)}."
+            + describe_conflicts(result.get("conflicts"))
+        )
+
+    raise ValueError(f"Unknown fast-path intent: {intent}")
+
+
+class FastPathStats:
+    """Thread-safe hit/miss counters so we can see how much load skips the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.by_intent = {}
+
+    def record(self, intent=None):
+        with self._lock:
+            if intent is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+
+    def summary(self) -> str:
+        with self._lock:
+            total = self.hits + self.misses
+            rate = (100.0 * self.hits / total) if total else 0.0
+            per_intent = ", ".join(f"{k}={v}" for k, v in sorted(self.by_intent.items()))
+            return (
+                f"{self.hits}/{total} requests ({rate:.1f}%) answered without the LLM"
+                + (f" [{per_intent}]" if per_intent else "")
+            )
+
+
+stats = FastPathStats()
+
+
+def try_fast_path(message: str, now: datetime = None):
+    """
+    Answer `message` deterministically if possible.
+
+    Returns (intent, reply) on a hit, or None to fall through to the crew.
+    Execution errors also fall through so the crew can handle (and explain) them.
+    """
+    parsed = parse_command(message, now)
+    if parsed is None:
+        stats.record(None)
+        return None
+    try:
+        reply = execute_command(parsed)
+    except Exception:
+        stats.record(None)
+        return None
+    stats.record(parsed["intent"])
+    return parsed["intent"], reply
@@ -0,0 +1,161 @@
+"""
+Free/busy computation.
+
+free_busy() answers "when am I free/busy between A and B" without handing
+raw rows to an LLM: it fetches only (id, start_utc, end_utc) for the events
+overlapping the range (events_rtree narrows the candidates, see schema.py),
+adds recurring occurrences, and merges the intervals with one sorted sweep.
+The free gaps are the complement of the merged busy blocks.
+
+Granularity (minutes) snaps busy blocks outward to a grid anchored at the
+range start, so a 10:05-10:50 meeting blocks 10:00-11:00 at 30 minutes and
+gaps shorter than one step disappear. 0 keeps exact times.
+
+All-day events are skipped unless include_all_day is set: a birthday or a
+holiday marker should not make the whole day look busy. Events whose times
+SQLite cannot parse (NULL start_utc/end_utc) cannot be placed on the time
+line and are left out.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from calendar_interaction.schema import MAX_UTC_OFFSET, overlap_params, utc_epoch
+
+
+# Non-recurring events overlapping [:start_utc, :end_utc), as Interval tuples.
+BUSY_SQL = f"""
+SELECT e.start_utc, e.end_utc, e.id
+FROM events e
+WHERE e.id IN (
+        SELECT id FROM events_rtree
+        WHERE start_epoch <= :end_utc + {MAX_UTC_OFFSET}
+          AND end_epoch   >= :start_utc - {MAX_UTC_OFFSET}
+      )
+  AND e.start_utc < :end_utc AND e.end_utc > :start_utc
+  AND (e.rrule IS NULL OR e.rrule = '')
+  AND (:include_all_day OR e.all_day = 0)
+"""
+
+# Same result without the R*Tree (idx_events_utc still serves the range).
+BUSY_SQL_SCAN = """
+SELECT start_utc, end_utc, id
+FROM events
+WHERE start_utc < :end_utc AND end_utc > :start_utc
+  AND (rrule IS NULL OR rrule = '')
+  AND (:include_all_day OR all_day = 0)
+"""
+
+Interval = Tuple[int, int, int]  # (start_utc, end_utc, event id)
+
+
+def merge_intervals(intervals: Iterable[Interval], lo: int, hi: int,
+                    step: int = 0) -> List[Tuple[int, int, List[int]]]:
+    """
+    Sweep-line merge: clip each interval to [lo, hi), snap it outward to a
+    `step`-second grid anchored at lo (0 = no snapping), then coalesce
+    overlapping or touching intervals in start order.
+    Returns [(start, end, event ids), ...], sorted and disjoint.
+    """
+    merged: List[Tuple[int, int, List[int]]] = []
+    for start, end, event_id in sorted(intervals):
+        start, end = max(start, lo), min(end, hi)
+        if step:
+            start = lo + (start - lo) // step * step
+            end = min(hi, lo - (lo - end) // step * step)
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            last_start, last_end, ids = merged[-1]
+            ids.append(event_id)
+            if end > last_end:
+                merged[-1] = (last_start, end, ids)
+        else:
+            merged.append((start, end, [event_id]))
+    return merged
+
+
+def _local_iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
+
+
+def _busy_intervals(conn: sqlite3.Connection, params: Dict[str, Any]) -> List[Interval]:
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples even on pooled (sqlite3.Row) connections
+    try:
+        cur.execute(BUSY_SQL, params)
+    except sqlite3.OperationalError:
+        cur.execute(BUSY_SQL_SCAN, params)
+    return cur.fetchall()
+
+
+def busy_intervals(conn: sqlite3.Connection, start_iso: str, end_iso: str,
+                   include_all_day: bool = False,
+                   cache_conn: Optional[sqlite3.Connection] = None) -> List[Interval]:
+    """
+    Unmerged (start_utc, end_utc, id) for every event overlapping
+    [start_iso, end_iso), recurring occurrences included. Only the range is
+    read: events_rtree (or idx_events_utc) narrows the scan.
+    """
+    from calendar_interaction.recurrence import occurrences_between
+
+    params = overlap_params(start_iso, end_iso)
+    params["include_all_day"] = 1 if include_all_day else 0
+
+    intervals = _busy_intervals(conn, params)
+    for occ in occurrences_between(conn, start_iso, end_iso, cache_conn):
+        if occ.get("start_utc") is None or occ.get("end_utc") is None:
+            continue
+        if occ.get("all_day") and not include_all_day:
+            continue
+        intervals.append((occ["start_utc"], occ["end_utc"], occ["id"]))
+    return intervals
+
+
+def free_busy(conn: sqlite3.Connection, start_iso: str, end_iso: str,
+              granularity: int = 0, include_all_day: bool = False,
+              cache_conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+    """
+    Busy blocks and free gaps in [start_iso, end_iso).
+
+    granularity is in minutes (0 = exact). Returns
+      {range_start, range_end, granularity,
+       busy: [{start, end, minutes, event_ids}], free: [{start, end, minutes}],
+       busy_minutes, free_minutes}
+    with times as naive local ISO 8601. Raises ValueError for an unparseable
+    or empty range.
+    """
+    lo, hi = utc_epoch(start_iso), utc_epoch(end_iso)
+    if lo is None or hi is None or lo >= hi:
+        raise ValueError(f"Invalid range: {start_iso!r} to {end_iso!r}")
+
+    intervals = busy_intervals(conn, start_iso, end_iso, include_all_day, cache_conn)
+    step = max(int(granularity or 0), 0) * 60
+    busy = merge_intervals(intervals, lo, hi, step)
+
+    free = []
+    cursor = lo
+    for start, end, _ in busy:
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = end
+    if cursor < hi:
+        free.append((cursor, hi))
+
+    return {
+        "range_start": _local_iso(lo),
+        "range_end": _local_iso(hi),
+        "granularity": step // 60,
+        "busy": [
+            {"start": _local_iso(s), "end": _local_iso(e), "minutes": (e - s) // 60,
+             "event_ids": sorted(set(ids))}
+            for s, e, ids in busy
+        ],
+        "free": [
+            {"start": _local_iso(s), "end": _local_iso(e), "minutes": (e - s) // 60}
+            for s, e in free
+        ],
+        "busy_minutes": sum(e - s for s, e, _ in busy) // 60,
+        "free_minutes": sum(e - s for s, e in free) // 60,
+    }
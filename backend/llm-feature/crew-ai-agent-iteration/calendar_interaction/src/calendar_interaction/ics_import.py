@@ -0,0 +1,339 @@
+"""
+Bulk import of .ics (iCalendar) files.
+
+The file is read as a stream, so memory stays flat however large the
+export is:
+
+  - iter_vevents() unfolds content lines as they are read and yields one
+    event row per VEVENT. Nothing is held beyond the current event and the
+    current batch.
+  - import_ics() writes rows with executemany() in batches of batch_size,
+    committing every commit_rows rows. Each commit is a BEGIN IMMEDIATE
+    transaction, so Electron's writer only waits for one chunk at a time.
+  - Duplicates are resolved by the database: rows carry the VEVENT UID
+    and idx_events_uid (schema.py) makes it unique. A UID that is already
+    there updates that event instead, and identical rows are left alone.
+    Re-running an import (or resuming one that failed half way) is
+    therefore safe.
+
+Mapping to events rows:
+
+  DTSTART/DTEND   naive local ISO; UTC and TZID times are converted to
+                  local time. DATE values become all-day events stored as
+                  YYYY-MM-DD with an exclusive end, as the calendar UI does.
+                  A missing DTEND comes from DURATION, else one day
+                  (all-day) or zero length.
+  RRULE           kept if recurrence.py supports it; otherwise only the
+                  first occurrence is imported.
+  SUMMARY, DESCRIPTION, LOCATION, UID   as-is (text unescaped)
+
+Skipped and counted in the summary: events without a usable DTSTART,
+STATUS:CANCELLED events and RECURRENCE-ID overrides of single occurrences.
+EXDATE is ignored. An unknown TZID is read as local time.
+"""
+
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from calendar_interaction.recurrence import RRuleError, parse_rrule
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9: TZID times are read as local time
+    ZoneInfo = None
+
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_COMMIT_ROWS = 10000
+
+# Upsert on the UID. The WHERE on DO UPDATE skips rows that did not change,
+# so they neither count as updated nor fire the update triggers.
+UPSERT_SQL = """
+INSERT INTO events (uid, title, description, start_time, end_time, all_day, location, rrule)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (uid) WHERE uid IS NOT NULL DO UPDATE SET
+  title = excluded.title,
+  description = excluded.description,
+  start_time = excluded.start_time,
+  end_time = excluded.end_time,
+  all_day = excluded.all_day,
+  location = excluded.location,
+  rrule = excluded.rrule,
+  updated_at = datetime('now')
+WHERE (title, description, start_time, end_time, all_day, location, rrule)
+      IS NOT (excluded.title, excluded.description, excluded.start_time,
+              excluded.end_time, excluded.all_day, excluded.location, excluded.rrule)
+"""
+
+# Rule parts recurrence.py understands; rules with anything else are dropped
+SUPPORTED_RRULE_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "WKST"}
+
+_DURATION_RE = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+_UNESCAPE_RE = re.compile(r"\\([\\;,nN])")
+
+# Row tuple in UPSERT_SQL order
+Row = Tuple[Optional[str], str, str, str, str, int, str, Optional[str]]
+
+
+class IcsImportError(ValueError):
+    """The file is not an iCalendar file."""
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Content lines with RFC 5545 folding undone (continuations start with a space/tab)."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split(line: str) -> Tuple[str, Dict[str, str], str]:
+    """NAME;PARAM=VALUE;...:value -> (NAME, {PARAM: VALUE}, value); quotes respected."""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.strip().upper(), {}, ""
+    name, *params = head.split(";")
+    parsed = {}
+    for param in params:
+        key, _, val = param.partition("=")
+        parsed[key.strip().upper()] = val.strip().strip('"')
+    return name.strip().upper(), parsed, value
+
+
+def _unescape(text: str) -> str:
+    return _UNESCAPE_RE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def _parse_time(value: str, params: Dict[str, str]) -> Tuple[Optional[Any], bool]:
+    """
+    (value, is_date) for a DTSTART/DTEND: a date for DATE values, else a
+    naive local datetime. (None, False) if unparseable.
+    """
+    value = value.strip()
+    try:
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return datetime.strptime(value[:8], "%Y%m%d").date(), True
+        if value.endswith("Z"):
+            utc = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+            return utc.astimezone().replace(tzinfo=None), False
+        parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None, False
+
+    tzid = params.get("TZID")
+    if tzid and ZoneInfo is not None:
+        try:
+            parsed = parsed.replace(tzinfo=ZoneInfo(tzid)).astimezone().replace(tzinfo=None)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # e.g. a Windows zone name: keep the wall time
+    return parsed, False
+
+
+def _parse_duration(value: str) -> Optional[timedelta]:
+    m = _DURATION_RE.match(value.strip().upper())
+    if not m or not any(m.groups()[1:]):
+        return None
+    weeks, days, hours, minutes, seconds = (int(g or 0) for g in m.groups()[1:])
+    delta = timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+    return -delta if m.group(1) == "-" else delta
+
+
+def _supported_rrule(value: str) -> Optional[str]:
+    """The rule if recurrence.py can expand it exactly, else None."""
+    rule = value.strip()
+    try:
+        parsed = parse_rrule(rule)
+    except RRuleError:
+        return None
+    parts = {}
+    for piece in rule.split(";"):
+        key, _, val = piece.partition("=")
+        parts[key.strip().upper()] = val.strip()
+    if not set(parts) <= SUPPORTED_RRULE_PARTS:
+        return None
+    if "BYDAY" in parts and (parsed["freq"] != "WEEKLY"
+                             or any(not c.strip().isalpha() for c in parts["BYDAY"].split(","))):
+        return None  # e.g. BYDAY=2MO (second Monday)
+    return rule
+
+
+def _iso(value, is_date: bool) -> str:
+    return value.isoformat() if is_date else value.isoformat(timespec="seconds")
+
+
+def _to_row(props: Dict[str, Tuple[Dict[str, str], str]], counts: Dict[str, int]) -> Optional[Row]:
+    """One VEVENT's properties -> an events row, or None (counted) to skip it."""
+    if "RECURRENCE-ID" in props:
+        counts["overrides_skipped"] += 1
+        return None
+    if props.get("STATUS", ({}, ""))[1].strip().upper() == "CANCELLED":
+        counts["cancelled_skipped"] += 1
+        return None
+    if "DTSTART" not in props:
+        counts["invalid_skipped"] += 1
+        return None
+
+    start, is_date = _parse_time(props["DTSTART"][1], props["DTSTART"][0])
+    if start is None:
+        counts["invalid_skipped"] += 1
+        return None
+    end = None
+    if "DTEND" in props:
+        end, end_is_date = _parse_time(props["DTEND"][1], props["DTEND"][0])
+        if end is not None and end_is_date != is_date:
+            # Mixed value types: keep the day of a DATE-TIME end, drop a DATE one
+            end = end.date() if is_date else None
+    if end is None and "DURATION" in props:
+        delta = _parse_duration(props["DURATION"][1])
+        if delta is not None:
+            end = start + (timedelta(days=max(delta.days, 1)) if is_date else delta)
+    if end is None or end < start:
+        end = start + timedelta(days=1) if is_date else start
+
+    rrule = None
+    if "RRULE" in props:
+        rrule = _supported_rrule(props["RRULE"][1])
+        if rrule is None:
+            counts["rrules_dropped"] += 1
+
+    def text(name: str) -> str:
+        return _unescape(props[name][1]).strip() if name in props else ""
+
+    return (
+        text("UID") or None,
+        text("SUMMARY") or "(no title)",
+        text("DESCRIPTION"),
+        _iso(start, is_date),
+        _iso(end, is_date),
+        1 if is_date else 0,
+        text("LOCATION"),
+        rrule,
+    )
+
+
+def iter_vevents(lines: Iterable[str], counts: Optional[Dict[str, int]] = None) -> Iterator[Row]:
+    """
+    Stream events rows (UPSERT_SQL order) out of iCalendar text lines.
+    Skipped VEVENTs are tallied in counts (see new_counts()). Raises
+    IcsImportError if the text does not start with BEGIN:VCALENDAR.
+    """
+    counts = counts if counts is not None else new_counts()
+    stack = []
+    props = None
+    for line in _unfold(lines):
+        if not stack:
+            line = line.lstrip("\ufeff")  # byte order mark from some exporters
+        if not line.strip():
+            continue
+        name, params, value = _split(line)
+        if not stack and name != "BEGIN":
+            raise IcsImportError("Not an iCalendar file (expected BEGIN:VCALENDAR)")
+        if name == "BEGIN":
+            component = value.strip().upper()
+            if not stack and component != "VCALENDAR":
+                raise IcsImportError("Not an iCalendar file (expected BEGIN:VCALENDAR)")
+            stack.append(component)
+            if component == "VEVENT":
+                props = {}
+        elif name == "END":
+            component = stack.pop() if stack else None
+            if component == "VEVENT" and props is not None:
+                counts["read"] += 1
+                row = _to_row(props, counts)
+                props = None
+                if row is not None:
+                    yield row
+        elif props is not None and stack[-1] == "VEVENT":
+            # First occurrence wins (e.g. several DESCRIPTIONs); VALARMs are nested
+            props.setdefault(name, (params, value))
+
+
+def new_counts() -> Dict[str, int]:
+    return {
+        "read": 0, "inserted": 0, "updated": 0, "unchanged": 0,
+        "overrides_skipped": 0, "cancelled_skipped": 0, "invalid_skipped": 0,
+        "rrules_dropped": 0,
+    }
+
+
+def _read_lines(binary, counts: Dict[str, int]) -> Iterator[str]:
+    """Decoded lines from a binary file, keeping counts["bytes_read"] current."""
+    for raw in binary:
+        counts["bytes_read"] += len(raw)
+        yield raw.decode("utf-8", errors="replace")
+
+
+def import_ics(conn: sqlite3.Connection, path: str,
+               batch_size: int = DEFAULT_BATCH_SIZE,
+               commit_rows: int = DEFAULT_COMMIT_ROWS,
+               progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """
+    Import every VEVENT in the .ics file at path through `conn` (a writable
+    connection with no transaction open). progress, if given, is called
+    with the running counts after every batch.
+
+    Returns the counts: read, inserted, updated, unchanged, the skipped
+    tallies, rrules_dropped, bytes_read and total_bytes. Raises
+    IcsImportError / OSError; batches committed before an error stay.
+    """
+    batch_size = max(int(batch_size), 1)
+    commit_rows = max(int(commit_rows), batch_size)
+    counts = new_counts()
+    counts["bytes_read"] = 0
+    counts["total_bytes"] = os.path.getsize(path)
+
+    def flush(batch):
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        first_new = conn.execute("SELECT IFNULL(max(id), 0) FROM events").fetchone()[0]
+        changed = conn.executemany(UPSERT_SQL, batch).rowcount
+        inserted = conn.execute("SELECT count(*) FROM events WHERE id > ?", (first_new,)).fetchone()[0]
+        counts["inserted"] += inserted
+        counts["updated"] += changed - inserted
+        counts["unchanged"] += len(batch) - changed
+
+    with open(path, "rb") as binary:
+        batch, pending = [], 0
+        try:
+            for row in iter_vevents(_read_lines(binary, counts), counts):
+                batch.append(row)
+                if len(batch) < batch_size:
+                    continue
+                flush(batch)
+                pending += len(batch)
+                batch = []
+                if pending >= commit_rows:
+                    conn.commit()
+                    pending = 0
+                if progress is not None:
+                    progress(dict(counts))
+            if batch:
+                flush(batch)
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    if progress is not None:
+        progress(dict(counts))
+    return counts
@@ -0,0 +1,274 @@
+"""
+Persistent LLM response cache for crewai_runner.
+
+Responses are stored in llm_cache.db next to calendar_llm.db, keyed by
+agent role, model and a hash of the normalized rendered prompt. Entries
+expire after a TTL and the least recently used ones are evicted once the
+cache is full.
+
+Entries whose answers depend on calendar contents (the responder, whose
+prompt carries the SQL results) are dropped whenever an event changes,
+detected through the event change log's version (schema.py) on a long-lived
+connection. Writes that leave events alone, such as the recurrence month
+cache, do not count.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+
+# Messages that mention these depend on the current time of day, so the
+# "Current Time: HH:MM" line must stay part of the cache key for them.
+TIME_SENSITIVE = re.compile(
+    r"\b(now|right now|soon|later|earlier|ago|tonight|in an? (?:hour|minute)"
+    r"|in \d+\s*(?:min|minute|hour|hr)s?|half an hour|this (?:morning|afternoon|evening)"
+    r"|rest of (?:the|my|today)|remaining|next (?:meeting|event|appointment|one|thing|up))\b",
+    re.IGNORECASE,
+)
+CURRENT_TIME_LINE = re.compile(r"(current time:\s*)\d{1,2}:\d{2}", re.IGNORECASE)
+
+
+def is_time_sensitive(message: str) -> bool:
+    return bool(TIME_SENSITIVE.search(message or ""))
+
+
+def normalize_prompt(messages, mask_time: bool) -> str:
+    """
+    Canonical text for a rendered prompt: whitespace collapsed in every
+    message, and the current time masked out when it cannot matter.
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+
+    normalized = []
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, str):
+            content = re.sub(r"\s+", " ", content).strip()
+            if mask_time:
+                content = CURRENT_TIME_LINE.sub(r"\1*", content)
+        normalized.append({"role": m.get("role"), "content": content})
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def get_cache_path() -> str:
+    """llm_cache.db in the same directory as the calendar DB."""
+    db_path = os.getenv("CALENDAR_DB_PATH", "calendar_llm.db")
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "llm_cache.db")
+
+
+class LLMResponseCache:
+    """Disk-backed, thread-safe response cache with TTL + LRU eviction."""
+
+    def __init__(self, path: str, calendar_db_path: str,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+              key            TEXT PRIMARY KEY,
+              role           TEXT NOT NULL,
+              model          TEXT NOT NULL,
+              response       TEXT NOT NULL,
+              data_dependent INTEGER NOT NULL DEFAULT 0,
+              created_at     REAL NOT NULL,
+              last_used_at   REAL NOT NULL,
+              hits           INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache(last_used_at)"
+        )
+        # We cannot know what happened to the calendar while we were not
+        # running, so content-dependent answers never survive a restart.
+        self._conn.execute("DELETE FROM llm_cache WHERE data_dependent = 1")
+        self._conn.commit()
+
+        self._calendar_conn = sqlite3.connect(calendar_db_path, check_same_thread=False)
+        self._data_version = self._read_data_version()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _read_data_version(self):
+        # The AUTOINCREMENT counter only moves on event INSERT/UPDATE/DELETE
+        # (the change log triggers) and survives pruning of event_changes
+        try:
+            row = self._calendar_conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'event_changes'"
+            ).fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error:
+            # No change log yet: any commit by another connection counts
+            try:
+                return ("data_version",
+                        self._calendar_conn.execute("PRAGMA data_version").fetchone()[0])
+            except sqlite3.Error:
+                return None
+
+    def check_data_version(self) -> bool:
+        """Drop content-dependent entries if the calendar changed. Returns True if it did."""
+        with self._lock:
+            version = self._read_data_version()
+            if version == self._data_version:
+                return False
+            self._data_version = version
+            cur = self._conn.execute("DELETE FROM llm_cache WHERE data_dependent = 1")
+            self._conn.commit()
+            self.invalidations += cur.rowcount
+            return True
+
+    @staticmethod
+    def make_key(role: str, model: str, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{role}\0{model}\0{digest}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str, data_dependent: bool):
+        if data_dependent:
+            self.check_data_version()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, role: str, model: str, response: str, data_dependent: bool):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache
+                  (key, role, model, response, data_dependent, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (key, role, model, response, 1 if data_dependent else 0, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            """
+            DELETE FROM llm_cache
+            WHERE key IN (
+              SELECT key FROM llm_cache
+              ORDER BY last_used_at DESC
+              LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def summary(self) -> str:
+        with self._lock:
+            total = self.hits + self.misses
+            rate = (100.0 * self.hits / total) if total else 0.0
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return (
+                f"{self.hits} hits / {self.misses} misses ({rate:.1f}%), "
+                f"{size} entries, {self.invalidations} invalidated by calendar changes"
+            )
+
+
+class CacheScope:
+    """
+    Per-crew (so per-worker) state for the wrapped LLMs: whether the current
+    request may ignore the time of day, and hit/miss counts for that request.
+    """
+
+    def __init__(self, cache: LLMResponseCache):
+        self.cache = cache
+        self.mask_time = False
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self, message: str):
+        self.mask_time = not is_time_sensitive(message)
+        self.hits = 0
+        self.misses = 0
+
+
+def _wrap_llm(llm, role: str, data_dependent: bool, scope: CacheScope):
+    """Replace llm.call on this instance with a cache-aware version."""
+    if getattr(llm, "_response_cache_scope", None) is scope:
+        return
+    original_call = llm.call
+    model = getattr(llm, "model", "") or ""
+
+    def cached_call(messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        cacheable = not tools and not available_functions
+        if cacheable:
+            prompt = normalize_prompt(messages, scope.mask_time)
+            if response_model is not None:
+                prompt += f"\0{response_model.__name__}"
+            key = scope.cache.make_key(role, model, prompt)
+            cached = scope.cache.get(key, data_dependent)
+            if cached is not None:
+                scope.hits += 1
+                return cached
+            scope.misses += 1
+
+        answer = original_call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+        if cacheable and isinstance(answer, str) and answer.strip():
+            scope.cache.put(key, role, model, answer, data_dependent)
+        return answer
+
+    llm.call = cached_call
+    llm._response_cache_scope = scope
+
+
+def install_llm_cache(pipeline, cache: LLMResponseCache, data_dependent_roles=()) -> CacheScope:
+    """
+    Wrap every LLM of a crew (or of a SingleCallPipeline) with the cache.
+    Must be called on each crew copy separately, after copy().
+    """
+    scope = CacheScope(cache)
+    if hasattr(pipeline, "agents"):
+        for agent in pipeline.agents:
+            if agent.llm is not None:
+                role = agent.role.strip()
+                _wrap_llm(agent.llm, role, role in data_dependent_roles, scope)
+    elif getattr(pipeline, "llm", None) is not None:
+        _wrap_llm(pipeline.llm, type(pipeline).__name__, False, scope)
+    return scope
@@ -0,0 +1,340 @@
+"""
+Per-request stage timings for crewai_runner (CALENDAR_METRICS, on by
+default).
+
+After every kickoff the runner emits one line after the reply:
+
+  {"type": "metrics", "id", "pipeline", "status", "queue_ms", "total_ms",
+   "tasks":     [{"name", "agent", "ms", "status"}],
+   "llm_calls": [{"agent", "task", "model", "ms", "status"}],
+   "tokens":    {agent: {"in", "out", "cached"}},
+   "tools":     [{"name", "agent", "ms", "from_cache", "status"}],
+   "sql":       {"queries", "ms", "rows", "by_kind": {kind: {...}}},
+   "complete"}
+
+Task, LLM call and tool timings come from crewai's event bus, using the
+events' own timestamps. Handlers are matched to a request by the ids of
+its crew copy's tasks and agents (each worker runs its own copy, one
+request at a time), or by the LLM object for SingleCallPipeline. Token
+counts are the difference in each agent LLM's usage counters over the
+kickoff, so cache hits count zero. SQL timings come from sqlite_tool's
+query listener. It runs on the kickoff thread and finds its request
+through crewai's crew context (or the worker thread for SingleCallPipeline).
+
+Bus handlers run on the bus's thread pool, so finish() waits briefly
+(FINISH_TIMEOUT) for the last ones. If they are still missing,
+"complete" is false.
+
+crewai is imported only by install_request_metrics().
+"""
+
+import time
+import threading
+
+FINISH_TIMEOUT = 0.5
+# Per-request list caps, so a runaway agent loop cannot grow the line without bound
+MAX_ITEMS = 100
+
+_install_lock = threading.Lock()
+_installed = False
+
+# Task id, agent id, crew id, id(llm) or ("thread", ident) -> RequestMetrics
+_active = {}
+_active_lock = threading.Lock()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _usage(llm) -> dict:
+    summary = getattr(llm, "get_token_usage_summary", None)
+    if summary is None:
+        return {}
+    try:
+        usage = summary()
+    except Exception:
+        return {}
+    return {"in": usage.prompt_tokens, "out": usage.completion_tokens,
+            "cached": usage.cached_prompt_tokens}
+
+
+class RequestMetrics:
+    """Everything one kickoff reported, filled in from bus handler threads."""
+
+    def __init__(self, pipeline, req_id, queue_ms=None):
+        self.req_id = req_id
+        self.queue_ms = queue_ms
+        self.started = time.perf_counter()
+        self._cond = threading.Condition()
+        self._open = {}       # pairing key -> [start time, end time, fields]
+        self._done = []       # (kind, fields) of paired spans, in end order
+        self._crew_done = False
+        self.tools = []
+        self.sql = []
+        self.status = "ok"
+
+        tasks = getattr(pipeline, "tasks", None)
+        if tasks is not None:
+            self.pipeline = "crew"
+            self._keys = [str(pipeline.id)]
+            self._keys += [str(t.id) for t in tasks]
+            self._keys += [str(a.id) for a in pipeline.agents]
+            self._llms = {a.role.strip(): a.llm for a in pipeline.agents if a.llm is not None}
+        else:
+            self.pipeline = type(pipeline).__name__
+            self._crew_done = True  # no crew events to wait for
+            llm = getattr(pipeline, "llm", None)
+            self._keys = [id(llm)] if llm is not None else []
+            self._llms = {self.pipeline: llm} if llm is not None else {}
+        self._keys.append(("thread", threading.get_ident()))
+        self._usage_before = {role: _usage(llm) for role, llm in self._llms.items()}
+
+    # ---------- from handlers ----------
+
+    def start(self, key, at: float, **fields):
+        with self._cond:
+            span = self._open.setdefault(key, [None, None, {}])
+            if span[0] is not None and span[1] is None:
+                # crewai retried the same agent/LLM step: close the earlier attempt
+                self._close(key, span, at, "retried")
+                span = self._open.setdefault(key, [None, None, {}])
+            span[0] = at
+            span[2].update(fields)
+            self._pair(key, span)
+
+    def end(self, key, at: float, status: str = "ok", **fields):
+        with self._cond:
+            span = self._open.setdefault(key, [None, None, {}])
+            span[1] = at
+            span[2].update(fields, status=status)
+            self._pair(key, span)
+
+    def _close(self, key, span, at, status):
+        span[1] = at
+        span[2]["status"] = status
+        self._pair(key, span)
+
+    def _pair(self, key, span):
+        if span[0] is None or span[1] is None:
+            return
+        del self._open[key]
+        fields = dict(span[2], ms=_ms(span[1] - span[0]))
+        if len(self._done) < MAX_ITEMS:
+            self._done.append((key[0], fields))
+        self._cond.notify_all()
+
+    def tool(self, **fields):
+        with self._cond:
+            if len(self.tools) < MAX_ITEMS:
+                self.tools.append(fields)
+
+    def query(self, query: dict):
+        with self._cond:
+            self.sql.append((query["kind"], query["ms"], query["rows"], query["ok"]))
+
+    def crew_finished(self, status: str):
+        with self._cond:
+            self._crew_done = True
+            if status != "ok":
+                self.status = status
+            self._cond.notify_all()
+
+    # ---------- from the worker ----------
+
+    def finish(self, failed: bool = False) -> dict:
+        """
+        Unregister, wait for late handlers, and build the metrics line.
+        failed: the reply was an error (the only sign of it without a crew).
+        """
+        total_ms = _ms(time.perf_counter() - self.started)
+        if failed:
+            self.status = "error"
+        with self._cond:
+            complete = self._cond.wait_for(
+                lambda: self._crew_done and not self._open, FINISH_TIMEOUT)
+        _unregister(self)
+
+        with self._cond:
+            done = list(self._done)
+            tools = list(self.tools)
+            sql = list(self.sql)
+
+        tokens = {}
+        for role, llm in self._llms.items():
+            after, before = _usage(llm), self._usage_before.get(role, {})
+            used = {k: after[k] - before.get(k, 0) for k in after}
+            if any(used.values()):
+                tokens[role] = used
+
+        by_kind = {}
+        for kind, ms, rows, ok in sql:
+            entry = by_kind.setdefault(kind, {"queries": 0, "ms": 0.0, "rows": 0, "errors": 0})
+            entry["queries"] += 1
+            entry["ms"] = round(entry["ms"] + ms, 3)
+            entry["rows"] += rows
+            entry["errors"] += 0 if ok else 1
+
+        return {
+            "type": "metrics",
+            "id": self.req_id,
+            "pipeline": self.pipeline,
+            "status": self.status,
+            "queue_ms": self.queue_ms,
+            "total_ms": total_ms,
+            "tasks": [f for kind, f in done if kind == "task"],
+            "llm_calls": [f for kind, f in done if kind == "llm"],
+            "tokens": tokens,
+            "tools": tools,
+            "sql": {
+                "queries": len(sql),
+                "ms": round(sum(q[1] for q in sql), 3),
+                "rows": sum(q[2] for q in sql),
+                "by_kind": by_kind,
+            },
+            "complete": complete,
+        }
+
+
+def _lookup(*keys):
+    with _active_lock:
+        for key in keys:
+            if key is not None and key in _active:
+                return _active[key]
+    return None
+
+
+def _unregister(metrics: RequestMetrics):
+    with _active_lock:
+        for key in metrics._keys:
+            if _active.get(key) is metrics:
+                del _active[key]
+
+
+def begin_request(pipeline, req_id, queue_ms=None) -> RequestMetrics:
+    """Start collecting for a kickoff of pipeline; call finish() after it."""
+    metrics = RequestMetrics(pipeline, req_id, queue_ms)
+    with _active_lock:
+        for key in metrics._keys:
+            _active[key] = metrics
+    return metrics
+
+
+def _on_query(query: dict):
+    # On the kickoff thread: crewai's crew context names the crew copy
+    from crewai.utilities.crew.crew_context import get_crew_context
+
+    context = get_crew_context()
+    metrics = _lookup(getattr(context, "id", None), ("thread", threading.get_ident()))
+    if metrics is not None:
+        metrics.query(query)
+
+
+def install_request_metrics():
+    """
+    Register the metrics handlers on crewai's event bus and the SQL
+    listener on sqlite_tool (imports crewai). Only the first call in a
+    process does anything.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.types.crew_events import (
+            CrewKickoffCompletedEvent, CrewKickoffFailedEvent,
+        )
+        from crewai.events.types.task_events import (
+            TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+        )
+        from crewai.events.types.llm_events import (
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        )
+        from crewai.events.types.tool_usage_events import (
+            ToolUsageFinishedEvent, ToolUsageErrorEvent,
+        )
+        from calendar_interaction.tools.sqlite_tool import set_query_listener
+
+        bus = crewai_event_bus
+
+        @bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            metrics = _lookup(str(source.id))
+            if metrics is not None:
+                metrics.crew_finished("ok")
+
+        @bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            metrics = _lookup(str(source.id))
+            if metrics is not None:
+                metrics.crew_finished("error")
+
+        def task_event(event, status=None):
+            task = event.task
+            metrics = _lookup(str(task.id)) if task is not None else None
+            if metrics is None:
+                return
+            at = event.timestamp.timestamp()
+            key = ("task", str(task.id))
+            if status is None:
+                agent = getattr(task, "agent", None)
+                metrics.start(key, at, name=task.name or task.description.strip()[:60],
+                              agent=agent.role.strip() if agent is not None else None)
+            else:
+                metrics.end(key, at, status)
+
+        @bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task_event(event)
+
+        @bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            task_event(event, "ok")
+
+        @bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            task_event(event, "error")
+
+        def llm_event(source, event, status=None):
+            metrics = _lookup(event.task_id, event.agent_id, id(source))
+            if metrics is None:
+                return
+            # One agent's LLM calls on one task run one at a time
+            key = ("llm", event.agent_id or id(source), event.task_id)
+            at = event.timestamp.timestamp()
+            if status is None:
+                metrics.start(key, at, agent=(event.agent_role or "").strip() or None,
+                              task=event.task_name,
+                              model=event.model)
+            else:
+                metrics.end(key, at, status)
+
+        @bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            llm_event(source, event)
+
+        @bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            llm_event(source, event, "ok")
+
+        @bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            llm_event(source, event, "error")
+
+        @bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            metrics = _lookup(event.task_id, event.agent_id)
+            if metrics is not None:
+                metrics.tool(name=event.tool_name, agent=(event.agent_role or "").strip(),
+                             ms=_ms((event.finished_at - event.started_at).total_seconds()),
+                             from_cache=event.from_cache, status="ok")
+
+        @bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            metrics = _lookup(event.task_id, event.agent_id)
+            if metrics is not None:
+                metrics.tool(name=event.tool_name, agent=(event.agent_role or "").strip(), ms=None,
+                             from_cache=False, status="error")
+
+        set_query_listener(_on_query)
+        _installed = True
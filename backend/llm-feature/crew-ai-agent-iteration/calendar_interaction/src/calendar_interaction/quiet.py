@@ -0,0 +1,78 @@
+"""
+Quiet mode for the production runner (CALENDAR_QUIET=1, which
+crewai_runner sets unless told otherwise).
+
+crew.py used to make every agent and the Crew verbose, and crewai_runner
+threw the output away with suppress_stdout_stderr(). The rendering still
+ran: crewai's EventListener singleton subscribes to every crew, task,
+agent, tool and LLM event and builds rich trees and panels in its
+ConsoleFormatter, on the event bus's handler threads, where it also
+escaped the redirection now and then. In quiet mode:
+
+  - crew_verbose() is False, so agents and the Crew are built with
+    verbose=False and the agent log events are never emitted
+  - install_quiet_mode() takes the EventListener's handlers off the event
+    bus, so the events that are still emitted have nothing to render them
+    (crewai's own telemetry spans live in those handlers and go with them)
+
+The `crewai run` entry points (main.py) leave CALENDAR_QUIET unset and
+keep the verbose console output.
+"""
+
+import os
+import threading
+
+QUIET_ENV = "CALENDAR_QUIET"
+
+_install_lock = threading.Lock()
+_installed = False
+
+# Handlers EventListener.setup_listeners() defines and registers
+_LISTENER_PREFIX = "EventListener.setup_listeners."
+
+
+def quiet_enabled() -> bool:
+    return os.getenv(QUIET_ENV, "0") == "1"
+
+
+def crew_verbose() -> bool:
+    """The verbose= crew.py gives agents and the Crew."""
+    return not quiet_enabled()
+
+
+def install_quiet_mode() -> int:
+    """
+    Unregister crewai's console EventListener from the event bus (imports
+    crewai). Safe to call more than once; returns how many handlers were
+    removed, 0 after the first call.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return 0
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.event_listener import event_listener
+
+        event_listener.verbose = False
+        event_listener.formatter.verbose = False
+
+        # The bus has no public way to unregister, so filter its handler
+        # sets the way _register_handler builds them
+        bus = crewai_event_bus
+        removed = 0
+        with bus._rwlock.w_locked():
+            for handlers in (bus._sync_handlers, bus._async_handlers):
+                for event_type, registered in list(handlers.items()):
+                    kept = frozenset(
+                        h for h in registered
+                        if not getattr(h, "__qualname__", "").startswith(_LISTENER_PREFIX)
+                    )
+                    if len(kept) != len(registered):
+                        removed += len(registered) - len(kept)
+                        bus._execution_plan_cache.pop(event_type, None)
+                        if kept:
+                            handlers[event_type] = kept
+                        else:
+                            del handlers[event_type]
+        _installed = True
+        return removed
@@ -0,0 +1,359 @@
+"""
+Recurring events.
+
+A series is a single events row (the master) whose rrule column holds an
+RFC 5545 RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20260630". The master's
+start_time/end_time are the first occurrence. Supported parts:
+
+  FREQ      DAILY | WEEKLY | MONTHLY | YEARLY
+  INTERVAL  every N periods (default 1)
+  BYDAY     weekdays, WEEKLY only (default: the master's weekday)
+  COUNT     total number of occurrences
+  UNTIL     last allowed start, YYYYMMDD or YYYYMMDDTHHMMSS[Z]
+
+Occurrences are never stored as events rows. expand() jumps straight to the
+first period that can touch the requested range, so its cost depends on the
+range, not on how long the series has been running.
+
+Expansions for months near today (the hot window) are cached in
+event_occurrences; occurrence_windows records which (event, month) buckets
+are complete. Triggers in schema.py drop both when the master is edited or
+deleted.
+"""
+
+import calendar
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from calendar_interaction.schema import utc_epoch
+
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Months either side of the current one whose expansions are cached
+HOT_WINDOW_MONTHS = 12
+
+# A COUNT rule is resolved to its last start once; cap the walk for safety.
+MAX_COUNT = 10000
+
+
+class RRuleError(ValueError):
+    """The rrule text is not in the supported subset."""
+
+
+def parse_local(iso: str) -> Optional[datetime]:
+    """Stored ISO time as naive local wall time ("Z"/offsets converted)."""
+    try:
+        text = iso.strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        dt = datetime.fromisoformat(text)
+    except (AttributeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def _parse_until(value: str) -> datetime:
+    value = value.strip().upper()
+    if value.endswith("Z"):
+        parsed = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S")
+        return parsed.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S")
+    # Date-only UNTIL includes the whole day
+    return datetime.strptime(value, "%Y%m%d") + timedelta(days=1) - timedelta(seconds=1)
+
+
+@lru_cache(maxsize=256)
+def parse_rrule(text: str) -> Dict[str, Any]:
+    """Parse the supported RRULE subset into a dict (cached; treat as read-only)."""
+    parts = {}
+    for piece in text.strip().removeprefix("RRULE:").split(";"):
+        if not piece.strip():
+            continue
+        key, sep, value = piece.partition("=")
+        if not sep:
+            raise RRuleError(f"Malformed rrule part: {piece!r}")
+        parts[key.strip().upper()] = value.strip()
+
+    freq = parts.get("FREQ", "").upper()
+    if freq not in FREQUENCIES:
+        raise RRuleError(f"Unsupported FREQ: {freq or '(missing)'}")
+
+    rule = {"freq": freq, "interval": 1, "byday": None, "count": None, "until": None}
+    try:
+        rule["interval"] = max(1, int(parts.get("INTERVAL", "1")))
+        if "COUNT" in parts:
+            rule["count"] = min(MAX_COUNT, max(1, int(parts["COUNT"])))
+        if "UNTIL" in parts:
+            rule["until"] = _parse_until(parts["UNTIL"])
+    except ValueError as e:
+        raise RRuleError(str(e)) from e
+
+    if "BYDAY" in parts:
+        codes = [c.strip().upper()[-2:] for c in parts["BYDAY"].split(",") if c.strip()]
+        if any(c not in WEEKDAY_CODES for c in codes):
+            raise RRuleError(f"Unsupported BYDAY: {parts['BYDAY']}")
+        rule["byday"] = tuple(sorted({WEEKDAY_CODES.index(c) for c in codes}))
+    return rule
+
+
+def _add_months(dt: datetime, months: int) -> Optional[datetime]:
+    """dt shifted by whole months, or None if that month has no such day."""
+    total = dt.month - 1 + months
+    year, month = dt.year + total // 12, total % 12 + 1
+    if year < 1 or year > 9999 or dt.day > calendar.monthrange(year, month)[1]:
+        return None
+    return dt.replace(year=year, month=month)
+
+
+def _periods(rule: dict, dtstart: datetime, after: datetime) -> Iterator[datetime]:
+    """
+    Candidate starts in order, beginning at (or shortly before) the period
+    containing `after`. Unbounded; the caller filters and stops it.
+    """
+    freq, interval = rule["freq"], rule["interval"]
+
+    if freq == "DAILY":
+        step = timedelta(days=interval)
+        k = max(0, (after - dtstart) // step)
+        while True:
+            yield dtstart + k * step
+            k += 1
+
+    elif freq == "WEEKLY":
+        days = rule["byday"] or (dtstart.weekday(),)
+        week0 = dtstart - timedelta(days=dtstart.weekday())
+        step = timedelta(weeks=interval)
+        k = max(0, (after - week0) // step)
+        while True:
+            week = week0 + k * step
+            for d in days:
+                candidate = week + timedelta(days=d)
+                if candidate >= dtstart:
+                    yield candidate
+            k += 1
+
+    else:
+        unit = 12 if freq == "YEARLY" else 1
+        months = (after.year - dtstart.year) * 12 + (after.month - dtstart.month)
+        k = max(0, months // (unit * interval) - 1)
+        while True:
+            candidate = _add_months(dtstart, k * unit * interval)
+            if candidate is not None:
+                yield candidate
+            elif dtstart.year + (k * unit * interval) // 12 > 9999:
+                return
+            k += 1
+
+
+@lru_cache(maxsize=1024)
+def _last_start(rrule: str, dtstart: datetime) -> Optional[datetime]:
+    """
+    Latest start the series may have: UNTIL, or the COUNT-th occurrence
+    (walked once from the beginning, then cached). None = unbounded.
+    """
+    rule = parse_rrule(rrule)
+    until = rule["until"]
+    if rule["count"] is None:
+        return until
+    last = None
+    for i, start in enumerate(_periods(rule, dtstart, dtstart - timedelta(days=1))):
+        if i >= rule["count"] or (until is not None and start > until):
+            break
+        last = start
+    return last
+
+
+def starts_between(rrule: str, dtstart: datetime,
+                   lo: datetime, hi: datetime) -> Iterator[datetime]:
+    """Lazily yield every occurrence start in [lo, hi), in order."""
+    rule = parse_rrule(rrule)
+    last = _last_start(rrule, dtstart)
+    for start in _periods(rule, dtstart, lo):
+        if start >= hi or (last is not None and start > last):
+            return
+        if start >= lo:
+            yield start
+
+
+def expand(rrule: str, dtstart: datetime, dtend: datetime,
+           range_start: datetime, range_end: datetime) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Lazily yield (start, end) of every occurrence overlapping
+    [range_start, range_end), in order. All times are naive local.
+    """
+    duration = max(dtend - dtstart, timedelta(0))
+    for start in starts_between(rrule, dtstart, range_start - duration, range_end):
+        end = start + duration
+        if end > range_start or (not duration and start >= range_start):
+            yield start, end
+
+
+# ------------------------------------------------------------
+# Materialized cache for the hot window
+# ------------------------------------------------------------
+
+def _bucket_range(first: date, last: date) -> Iterator[Tuple[str, datetime, datetime]]:
+    """(bucket, month_start, next_month_start) for every month in [first, last]."""
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        start = datetime(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        yield f"{start.year:04d}-{start.month:02d}", start, datetime(year, month, 1)
+
+
+def _is_hot(bucket: str, today: date) -> bool:
+    year, month = map(int, bucket.split("-"))
+    distance = (year - today.year) * 12 + (month - today.month)
+    return abs(distance) <= HOT_WINDOW_MONTHS
+
+
+def _occurrence_row(master: dict, start: datetime, end: datetime) -> dict:
+    row = dict(master)
+    row["start_time"] = start.isoformat()
+    row["end_time"] = end.isoformat()
+    row["start_utc"] = utc_epoch(row["start_time"])
+    row["end_utc"] = utc_epoch(row["end_time"])
+    row["day_key"] = start.date().isoformat()
+    row["is_occurrence"] = 1
+    return row
+
+
+def _bucket_occurrences(master: dict, dtstart: datetime, dtend: datetime,
+                        bucket: str, month_start: datetime, month_end: datetime,
+                        cache_conn: Optional[sqlite3.Connection], hot: bool) -> List[Tuple[datetime, datetime]]:
+    """Occurrences *starting* in one month, from the cache when possible."""
+    if cache_conn is not None and hot:
+        done = cache_conn.execute(
+            "SELECT 1 FROM occurrence_windows WHERE event_id = ? AND bucket = ?",
+            (master["id"], bucket),
+        ).fetchone()
+        if done:
+            return [
+                (datetime.fromisoformat(r[0]), datetime.fromisoformat(r[1]))
+                for r in cache_conn.execute(
+                    "SELECT start_time, end_time FROM event_occurrences "
+                    "WHERE event_id = ? AND bucket = ? ORDER BY start_time",
+                    (master["id"], bucket),
+                )
+            ]
+
+    duration = max(dtend - dtstart, timedelta(0))
+    found = [
+        (s, s + duration)
+        for s in starts_between(master["rrule"], dtstart, month_start, month_end)
+    ]
+
+    if cache_conn is not None and hot:
+        try:
+            with cache_conn:
+                cache_conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO event_occurrences
+                      (event_id, bucket, start_time, end_time, start_utc, end_utc)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (master["id"], bucket, s.isoformat(), e.isoformat(),
+                         utc_epoch(s.isoformat()), utc_epoch(e.isoformat()))
+                        for s, e in found
+                    ],
+                )
+                cache_conn.execute(
+                    "INSERT OR REPLACE INTO occurrence_windows (event_id, bucket) VALUES (?, ?)",
+                    (master["id"], bucket),
+                )
+        except sqlite3.Error:
+            # Cache is best-effort (e.g. another writer holds the lock); results stand
+            pass
+    return found
+
+
+# Written so the planner scans the partial idx_events_rrule (masters only):
+# "start_utc IS NULL OR start_utc < x" would walk idx_events_utc instead.
+RECURRING_MASTERS_SQL = """
+SELECT *
+FROM events
+WHERE rrule IS NOT NULL AND rrule != ''
+  AND IFNULL(start_utc < :end_utc, 1)
+"""
+
+
+def master_occurrences(master: dict, range_start: datetime, range_end: datetime,
+                       cache_conn: Optional[sqlite3.Connection] = None,
+                       today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Occurrences of one series overlapping [range_start, range_end) (naive
+    local), as events-shaped dicts (is_occurrence=1, id = the master's id).
+    A master whose rrule is outside the supported subset is treated as a
+    single event.
+    """
+    dtstart, dtend = parse_local(master["start_time"]), parse_local(master["end_time"])
+    if dtstart is None or dtend is None:
+        return []
+    try:
+        parse_rrule(master["rrule"])
+    except RRuleError:
+        return [master] if dtstart < range_end and dtend > range_start else []
+
+    today = today or date.today()
+    duration = max(dtend - dtstart, timedelta(0))
+    first = max(range_start - duration, dtstart)
+    if first >= range_end:
+        return []
+
+    rows = []
+    for bucket, month_start, month_end in _bucket_range(first.date(), range_end.date()):
+        for s, e in _bucket_occurrences(master, dtstart, dtend, bucket,
+                                        month_start, month_end,
+                                        cache_conn, _is_hot(bucket, today)):
+            if s < range_end and (e > range_start or (s == e and s >= range_start)):
+                rows.append(_occurrence_row(master, s, e))
+    return rows
+
+
+def occurrences_between(conn: sqlite3.Connection, start_iso: str, end_iso: str,
+                        cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    """
+    Occurrences of every recurring series overlapping [start_iso, end_iso).
+    `conn` reads the masters; `cache_conn` (a writable connection that no
+    caller has a transaction open on, e.g. ConnectionManager.cache_writer())
+    enables the hot-window cache.
+    """
+    from calendar_interaction.schema import EPOCH_MAX
+
+    range_start, range_end = parse_local(start_iso), parse_local(end_iso)
+    if range_start is None or range_end is None or range_end <= range_start:
+        return []
+    end_utc = utc_epoch(end_iso)
+
+    rows = []
+    for master in conn.execute(RECURRING_MASTERS_SQL,
+                               {"end_utc": EPOCH_MAX if end_utc is None else end_utc}):
+        rows.extend(master_occurrences(dict(master), range_start, range_end, cache_conn))
+    return rows
+
+
+def expand_rows(rows: List[Dict[str, Any]], start_iso: str, end_iso: str,
+                cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    """
+    Replace every series master in a SELECT result with its occurrences in
+    [start_iso, end_iso); other rows pass through unchanged.
+    """
+    range_start, range_end = parse_local(start_iso), parse_local(end_iso)
+    if range_start is None or range_end is None:
+        return rows
+
+    expanded = []
+    for row in rows:
+        if row.get("rrule") and "start_time" in row and "end_time" in row:
+            expanded.extend(master_occurrences(row, range_start, range_end, cache_conn))
+        else:
+            expanded.append(row)
+    return expanded
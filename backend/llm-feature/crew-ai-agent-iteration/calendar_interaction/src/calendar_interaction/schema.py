@@ -0,0 +1,477 @@
+"""
+Derived schema the Python side relies on, on top of the tables Electron
+creates in backend/database/db.js.
+
+Everything here is idempotent (IF NOT EXISTS) and mirrors db.js exactly, so
+whichever process opens the database first sets it up. db_pool runs
+ensure_schema() once per database file.
+
+Normalized times
+----------------
+start_time/end_time are free-form ISO 8601 TEXT: naive local wall time from
+the LLM paths, UTC with a "Z" suffix from the calendar UI. Three derived,
+indexed columns make lookups independent of that formatting:
+
+  start_utc / end_utc   INTEGER  UTC epoch seconds
+  day_key               TEXT     local calendar day of start_time (YYYY-MM-DD)
+
+Naive times are converted from local time and offset-qualified ones taken
+as-is. SQLite refuses 'utc'/'localtime' in generated columns (they are not
+deterministic), so these are plain columns filled in by triggers instead.
+They are NULL only when SQLite cannot parse the time.
+
+Recurrence
+----------
+A recurring series is one events row with an RRULE in its rrule column (see
+recurrence.py). Range queries here return only non-recurring rows;
+events_between() adds the series' occurrences. event_occurrences and
+occurrence_windows cache expansions per (event, month) and are cleared by
+triggers whenever a master's times or rule change.
+
+Imported events
+---------------
+uid holds the iCalendar UID of events imported from .ics files (NULL for
+everything else). idx_events_uid makes it unique, so re-importing the same
+file updates events instead of duplicating them (see ics_import.py).
+
+Change log
+----------
+Triggers append one event_changes row per INSERT, UPDATE or DELETE on
+events: (version, op, event_id, changed columns), where version is an
+AUTOINCREMENT counter. Updates record only the user-visible columns that
+changed, so the normalized-time triggers' own UPDATEs are not logged.
+changelog.py reads it as deltas ("changes since version N"), prunes and
+compacts it.
+
+Full-text search
+----------------
+events_fts is an FTS5 index over title, description and location with
+events as its external content table (rowid = events.id), kept in sync by
+triggers. search_events() turns free text into a prefix query per word and
+ranks matches with bm25, weighting title over location over description.
+Unlike LIKE it is case- and accent-insensitive, has no wildcard characters
+to escape, and answers from the index instead of scanning every row.
+
+Interval index
+--------------
+events_rtree is an R*Tree over each event's [start, end] in epoch seconds,
+kept in sync by triggers. Range queries ask it for candidate ids and then
+apply the exact overlap predicate on the normalized columns:
+
+  - R*Tree coordinates are 32-bit floats, rounded outward, so the tree can
+    only ever return a superset of the overlapping events.
+  - Times SQLite cannot parse get the sentinel bounds below, so those rows
+    are always candidates and fall back to comparing the text.
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+EPOCH_MIN = -100000000000
+EPOCH_MAX = 100000000000
+
+# Largest UTC offset in use (+14:00). events_rtree boxes are built from the
+# text as written, so a naive local time can sit this far from its UTC epoch.
+MAX_UTC_OFFSET = 14 * 60 * 60
+
+
+def _epoch(expr: str, sentinel: int) -> str:
+    return f"COALESCE(CAST(strftime('%s', {expr}) AS INTEGER), {sentinel})"
+
+
+def _box(row: str) -> str:
+    start = _epoch(f"{row}.start_time", EPOCH_MIN)
+    end = _epoch(f"{row}.end_time", EPOCH_MAX)
+    # R*Tree rejects min > max; a reversed event just gets the covering box
+    return f"min({start}, {end}), max({start}, {end})"
+
+
+def _has_offset(expr: str) -> str:
+    return f"({expr} GLOB '*Z' OR {expr} GLOB '*[+-][0-9][0-9]:[0-9][0-9]')"
+
+
+def _utc_epoch(expr: str) -> str:
+    return (
+        f"CAST(strftime('%s', {expr}, "
+        f"CASE WHEN {_has_offset(expr)} THEN '+0 seconds' ELSE 'utc' END) AS INTEGER)"
+    )
+
+
+def _day_key(expr: str) -> str:
+    return f"CASE WHEN {_has_offset(expr)} THEN date({expr}, 'localtime') ELSE date({expr}) END"
+
+
+def _normalized_set(row: str) -> str:
+    return (
+        f"start_utc = {_utc_epoch(row + '.start_time')},\n"
+        f"      end_utc   = {_utc_epoch(row + '.end_time')},\n"
+        f"      day_key   = {_day_key(row + '.start_time')}"
+    )
+
+
+NORMALIZED_COLUMNS = (
+    ("start_utc", "INTEGER"),
+    ("end_utc", "INTEGER"),
+    ("day_key", "TEXT"),
+)
+
+# Columns added to events after the original schema, in order
+ADDED_COLUMNS = NORMALIZED_COLUMNS + (
+    ("rrule", "TEXT"),
+    ("uid", "TEXT"),
+)
+
+# Only start_time/end_time are watched, so the trigger's own UPDATE does not
+# fire it (or events_rtree_au) again.
+NORMALIZED_TIMES_DDL = f"""
+CREATE INDEX IF NOT EXISTS idx_events_utc ON events(start_utc, end_utc);
+CREATE INDEX IF NOT EXISTS idx_events_day_key ON events(day_key);
+
+CREATE TRIGGER IF NOT EXISTS events_times_ai AFTER INSERT ON events BEGIN
+  UPDATE events
+  SET {_normalized_set("new")}
+  WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_times_au AFTER UPDATE OF start_time, end_time ON events BEGIN
+  UPDATE events
+  SET {_normalized_set("new")}
+  WHERE id = new.id;
+END;
+"""
+
+# Rows written before the columns existed (or by an older app version)
+NORMALIZED_TIMES_BACKFILL = f"""
+UPDATE events
+SET {_normalized_set("events")}
+WHERE day_key IS NULL;
+"""
+
+RECURRENCE_DDL = """
+CREATE INDEX IF NOT EXISTS idx_events_rrule ON events(start_utc) WHERE rrule IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS event_occurrences (
+  event_id    INTEGER NOT NULL,
+  bucket      TEXT NOT NULL,     -- local month of start_time, 'YYYY-MM'
+  start_time  TEXT NOT NULL,     -- naive local ISO 8601
+  end_time    TEXT NOT NULL,
+  start_utc   INTEGER,
+  end_utc     INTEGER,
+  PRIMARY KEY (event_id, start_time)
+);
+
+CREATE TABLE IF NOT EXISTS occurrence_windows (
+  event_id    INTEGER NOT NULL,
+  bucket      TEXT NOT NULL,
+  PRIMARY KEY (event_id, bucket)
+);
+
+CREATE TRIGGER IF NOT EXISTS events_occurrences_au AFTER UPDATE OF start_time, end_time, rrule ON events BEGIN
+  DELETE FROM occurrence_windows WHERE event_id = old.id;
+  DELETE FROM event_occurrences WHERE event_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_occurrences_ad AFTER DELETE ON events BEGIN
+  DELETE FROM occurrence_windows WHERE event_id = old.id;
+  DELETE FROM event_occurrences WHERE event_id = old.id;
+END;
+"""
+
+IMPORT_DDL = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_uid ON events(uid) WHERE uid IS NOT NULL;
+"""
+
+# Columns whose changes are logged, in the order they are listed
+CHANGELOG_COLUMNS = ("title", "description", "start_time", "end_time", "all_day",
+                     "location", "rrule", "uid")
+
+
+def _changed_columns() -> str:
+    parts = " || ".join(
+        f"CASE WHEN old.{c} IS NOT new.{c} THEN '{c},' ELSE '' END" for c in CHANGELOG_COLUMNS
+    )
+    return f"rtrim({parts}, ',')"
+
+
+CHANGELOG_DDL = f"""
+CREATE TABLE IF NOT EXISTS event_changes (
+  version     INTEGER PRIMARY KEY AUTOINCREMENT,
+  op          TEXT NOT NULL,        -- 'insert' | 'update' | 'delete'
+  event_id    INTEGER NOT NULL,
+  columns     TEXT,                 -- changed columns (update), comma-separated
+  changed_at  INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- Highest version removed by pruning; older clients must reload
+CREATE TABLE IF NOT EXISTS event_changes_state (
+  id              INTEGER PRIMARY KEY CHECK (id = 1),
+  pruned_through  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO event_changes_state (id, pruned_through) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS events_changes_ai AFTER INSERT ON events BEGIN
+  INSERT INTO event_changes (op, event_id) VALUES ('insert', new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_changes_au AFTER UPDATE ON events
+WHEN {" OR ".join(f"old.{c} IS NOT new.{c}" for c in CHANGELOG_COLUMNS)}
+BEGIN
+  INSERT INTO event_changes (op, event_id, columns)
+  VALUES ('update', new.id, {_changed_columns()});
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_changes_ad AFTER DELETE ON events BEGIN
+  INSERT INTO event_changes (op, event_id) VALUES ('delete', old.id);
+END;
+"""
+
+INTERVAL_INDEX_DDL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(
+  id,
+  start_epoch, end_epoch
+);
+
+CREATE TRIGGER IF NOT EXISTS events_rtree_ai AFTER INSERT ON events BEGIN
+  INSERT OR REPLACE INTO events_rtree (id, start_epoch, end_epoch)
+  VALUES (new.id, {_box("new")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_rtree_au AFTER UPDATE OF id, start_time, end_time ON events BEGIN
+  DELETE FROM events_rtree WHERE id = old.id;
+  INSERT OR REPLACE INTO events_rtree (id, start_epoch, end_epoch)
+  VALUES (new.id, {_box("new")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_rtree_ad AFTER DELETE ON events BEGIN
+  DELETE FROM events_rtree WHERE id = old.id;
+END;
+"""
+
+# The update trigger only watches the indexed columns, so the time triggers'
+# own UPDATEs do not rewrite the index. 'delete' must be given the old values.
+FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+  title, description, location,
+  content = 'events', content_rowid = 'id',
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+  INSERT INTO events_fts (rowid, title, description, location)
+  VALUES (new.id, new.title, new.description, new.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF id, title, description, location ON events BEGIN
+  INSERT INTO events_fts (events_fts, rowid, title, description, location)
+  VALUES ('delete', old.id, old.title, old.description, old.location);
+  INSERT INTO events_fts (rowid, title, description, location)
+  VALUES (new.id, new.title, new.description, new.location);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+  INSERT INTO events_fts (events_fts, rowid, title, description, location)
+  VALUES ('delete', old.id, old.title, old.description, old.location);
+END;
+"""
+
+# Rebuild from events (rows written before the index existed)
+FTS_REBUILD = "INSERT INTO events_fts (events_fts) VALUES ('rebuild');"
+
+# bm25 weights per column: title, description, location (lower rank = better)
+SEARCH_SQL = """
+SELECT e.*, bm25(events_fts, 10.0, 1.0, 3.0) AS rank
+FROM events_fts
+JOIN events e ON e.id = events_fts.rowid
+WHERE events_fts MATCH :query
+ORDER BY rank, e.start_utc DESC
+LIMIT :limit
+"""
+
+# Rows written before the index existed (or by an older app version)
+INTERVAL_INDEX_BACKFILL = f"""
+DELETE FROM events_rtree WHERE id NOT IN (SELECT id FROM events);
+INSERT INTO events_rtree (id, start_epoch, end_epoch)
+SELECT e.id, {_box("e")}
+FROM events e
+WHERE e.id NOT IN (SELECT id FROM events_rtree);
+"""
+
+# Non-recurring events overlapping [:start, :end). events_rtree narrows to
+# candidate ids (widened by MAX_UTC_OFFSET), then the UTC columns decide; rows
+# whose times SQLite cannot parse keep the old text comparison.
+# Parameters come from overlap_params().
+OVERLAP_SQL = f"""
+SELECT e.*
+FROM events e
+WHERE e.id IN (
+        SELECT id FROM events_rtree
+        WHERE start_epoch <= :end_utc + {MAX_UTC_OFFSET}
+          AND end_epoch   >= :start_utc - {MAX_UTC_OFFSET}
+      )
+  AND CASE
+        WHEN e.start_utc IS NULL OR e.end_utc IS NULL
+          THEN e.start_time < :end AND e.end_time > :start
+        ELSE e.start_utc < :end_utc AND e.end_utc > :start_utc
+      END
+  AND (e.rrule IS NULL OR e.rrule = '')
+ORDER BY e.start_utc ASC, e.start_time ASC
+"""
+
+# Same result without the R*Tree (idx_events_utc still serves the range).
+OVERLAP_SQL_SCAN = """
+SELECT *
+FROM events
+WHERE ((start_utc < :end_utc AND end_utc > :start_utc)
+       OR ((start_utc IS NULL OR end_utc IS NULL)
+           AND start_time < :end AND end_time > :start))
+  AND (rrule IS NULL OR rrule = '')
+ORDER BY start_utc ASC, start_time ASC
+"""
+
+# All events starting on one local day; an index seek on idx_events_day_key.
+DELETE_ON_DAY_SQL = "DELETE FROM events WHERE day_key = ?"
+
+
+def utc_epoch(iso: str) -> Optional[int]:
+    """
+    UTC epoch seconds for an ISO 8601 string, with the same rules as the
+    start_utc/end_utc triggers: naive times are local, suffixed ones as given.
+    """
+    try:
+        text = iso.strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        return int(datetime.fromisoformat(text).timestamp())
+    except (AttributeError, ValueError):
+        return None
+
+
+def overlap_params(start_iso: str, end_iso: str) -> Dict[str, Any]:
+    """Named parameters for OVERLAP_SQL / OVERLAP_SQL_SCAN."""
+    start_utc = utc_epoch(start_iso)
+    end_utc = utc_epoch(end_iso)
+    return {
+        "start": start_iso,
+        "end": end_iso,
+        "start_utc": EPOCH_MIN if start_utc is None else start_utc,
+        "end_utc": EPOCH_MAX if end_utc is None else end_utc,
+    }
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must match as a prefix
+    ("jake lunch" -> '"jake"* "lunch"*'). Quoting each word keeps FTS5
+    operators and punctuation in user text from being parsed as syntax.
+    Returns None if the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Add the normalized time, recurrence and uid columns, the occurrence cache,
+    the change log, the full-text and interval indexes with their triggers,
+    and backfill rows written without them. Returns False if the events
+    table does not exist yet (Electron has not initialised the file), so the
+    caller can try again later.
+    """
+    if not _table_exists(conn, "events"):
+        return False
+
+    existing = {r[1] for r in conn.execute("PRAGMA table_info(events)")}
+    for name, decl in ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {name} {decl}")
+    conn.executescript(
+        "BEGIN;" + NORMALIZED_TIMES_DDL + NORMALIZED_TIMES_BACKFILL
+        + RECURRENCE_DDL + IMPORT_DDL + CHANGELOG_DDL + "COMMIT;"
+    )
+
+    try:
+        conn.executescript("BEGIN;" + FTS_DDL + "COMMIT;")
+        indexed = conn.execute("SELECT count(*) FROM events_fts_docsize").fetchone()[0]
+        total = conn.execute("SELECT count(*) FROM events").fetchone()[0]
+        if indexed != total:
+            conn.executescript("BEGIN;" + FTS_REBUILD + "COMMIT;")
+    except sqlite3.OperationalError:
+        # An SQLite build without FTS5: search_events() falls back to LIKE
+        if conn.in_transaction:
+            conn.rollback()
+
+    try:
+        conn.executescript("BEGIN;" + INTERVAL_INDEX_DDL + "COMMIT;")
+        indexed = conn.execute("SELECT count(*) FROM events_rtree").fetchone()[0]
+        total = conn.execute("SELECT count(*) FROM events").fetchone()[0]
+        if indexed != total:
+            conn.executescript("BEGIN;" + INTERVAL_INDEX_BACKFILL + "COMMIT;")
+    except sqlite3.OperationalError:
+        # e.g. an SQLite build without R*Tree: events_between() falls back
+        # to a scan (not logged: this can run before the runner redirects stdout)
+        if conn.in_transaction:
+            conn.rollback()
+    return True
+
+
+def events_between(conn: sqlite3.Connection, start_iso: str, end_iso: str,
+                   cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
+    """
+    All events overlapping [start_iso, end_iso), ordered by start time,
+    including occurrences of recurring series (expanded lazily for just this
+    range; pass a writable cache_conn to use the hot-window cache).
+    """
+    from calendar_interaction.recurrence import occurrences_between
+
+    params = overlap_params(start_iso, end_iso)
+    try:
+        cur = conn.execute(OVERLAP_SQL, params)
+    except sqlite3.OperationalError:
+        cur = conn.execute(OVERLAP_SQL_SCAN, params)
+    rows = [dict(r) for r in cur.fetchall()]
+
+    occurrences = occurrences_between(conn, start_iso, end_iso, cache_conn)
+    if occurrences:
+        rows.extend(occurrences)
+        rows.sort(key=lambda r: (r["start_utc"] is not None, r["start_utc"] or 0, r["start_time"]))
+    return rows
+
+
+def search_events(conn: sqlite3.Connection, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Events whose title, description or location match every word of text
+    (as a prefix, ignoring case and accents), best match first. Each row
+    carries its bm25 score in "rank". Recurring series match as their
+    master row.
+    """
+    query = fts_query(text)
+    if query is None:
+        return []
+    try:
+        cur = conn.execute(SEARCH_SQL, {"query": query, "limit": limit})
+    except sqlite3.OperationalError:
+        # No events_fts (SQLite without FTS5): substring scan, newest first
+        words = re.findall(r"\w+", text)
+        clause = " AND ".join(
+            "(title LIKE ? OR description LIKE ? OR location LIKE ?)" for _ in words
+        )
+        params = [f"%{w}%" for w in words for _ in range(3)]
+        cur = conn.execute(
+            f"SELECT *, 0.0 AS rank FROM events WHERE {clause} "
+            "ORDER BY start_utc DESC LIMIT ?",
+            params + [limit],
+        )
+    return [dict(r) for r in cur.fetchall()]
@@ -0,0 +1,252 @@
+"""
+Single-call structured-output pipeline.
+
+An alternative to the three-task CalendarInteractionCrew: one LLM call returns
+a strict JSON plan (intent, fields, parameterized SQL, reply templates), the
+SQL is executed locally through _run_sql, and the final reply is rendered from
+the templates without another model round-trip.
+
+Selected per deployment with CALENDAR_PIPELINE=single_call (see crewai_runner).
+"""
+
+import os
+import sys
+import json
+from typing import List, Optional, Union
+
+import yaml
+from pydantic import BaseModel, Field
+from crewai import LLM
+
+from calendar_interaction.tools.sqlite_tool import _run_sql, _free_busy, expand_recurring
+from calendar_interaction.fast_path import describe_conflicts, describe_event, describe_span
+
+
+if getattr(sys, "frozen", False):
+    # Same layout as crew.py: config is bundled under calendar_interaction/config
+    BASE_PATH = os.path.join(sys._MEIPASS, "calendar_interaction")
+else:
+    BASE_PATH = os.path.dirname(__file__)
+
+LLMS_CONFIG = os.path.join(BASE_PATH, "config/llms.yaml")
+
+ALLOWED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+class PlanFields(BaseModel):
+    """Structured fields pulled out of the user's message."""
+
+    title: Optional[str]
+    description: Optional[str]
+    start_time: Optional[str] = Field(description="ISO 8601, e.g. 2025-12-11T13:00:00")
+    end_time: Optional[str] = Field(description="ISO 8601, e.g. 2025-12-11T14:00:00")
+    all_day: Optional[bool]
+    location: Optional[str]
+
+
+class CalendarPlan(BaseModel):
+    """Everything the runner needs to finish a request without another LLM call."""
+
+    intent: str = Field(
+        description=(
+            "One of create_event, update_event, delete_event, list_events, "
+            "check_availability, chit_chat"
+        )
+    )
+    fields: PlanFields
+    sql: Optional[str] = Field(
+        description=(
+            "A single SQL statement using ? placeholders, or null for "
+            "check_availability and chit_chat"
+        )
+    )
+    params: List[Union[str, int, None]] = Field(
+        description="Values for the ? placeholders in sql, in order"
+    )
+    reply_template: str = Field(
+        description=(
+            "Reply shown on success. May use {count} (rows returned), "
+            "{rows_affected} and {events} (a rendered bullet list of rows); "
+            "for check_availability, {free} and {busy} (rendered time ranges)."
+        )
+    )
+    empty_reply: str = Field(
+        description="Reply shown when a SELECT returns no rows or a write changes nothing"
+    )
+
+
+SYSTEM_PROMPT = """\
+You are a calendar assistant that turns one user message into a complete plan.
+Current date: {current_date}. Current time: {current_time}. Current year: {current_year}.
+
+The SQLite schema is:
+
+  events(
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    title       TEXT NOT NULL,
+    description TEXT,
+    start_time  TEXT NOT NULL, -- ISO 8601 string, e.g. 2025-12-11T13:00:00
+    end_time    TEXT NOT NULL, -- ISO 8601 string
+    all_day     INTEGER NOT NULL DEFAULT 0,
+    rrule       TEXT,          -- RRULE for a recurring series, else NULL
+    location    TEXT,
+    created_at  TEXT,
+    updated_at  TEXT,
+    start_utc   INTEGER, -- UTC epoch seconds of start_time (automatic, indexed)
+    end_utc     INTEGER, -- UTC epoch seconds of end_time (automatic, indexed)
+    day_key     TEXT     -- local day of start_time, 'YYYY-MM-DD' (automatic, indexed)
+  )
+  events_fts(title, description, location) -- FTS5 index, rowid = events.id
+
+Rules:
+- intent is one of create_event, update_event, delete_event, list_events,
+  check_availability, chit_chat.
+- sql is exactly ONE statement (SELECT, INSERT, UPDATE or DELETE on events), or null
+  for check_availability and chit_chat. Never put user-provided values in the SQL text: use ? placeholders
+  and list the values in params, in order.
+- create_event: INSERT at least title, start_time, end_time, all_day.
+  For a repeating event insert ONE row: start_time/end_time are the first
+  occurrence and rrule is e.g. 'FREQ=WEEKLY;BYDAY=MO' (FREQ=DAILY|WEEKLY|MONTHLY|YEARLY,
+  optional INTERVAL=n, BYDAY=MO,TU,... for weekly, COUNT=n or UNTIL=YYYYMMDD).
+- update_event / delete_event: target a specific event with a narrow WHERE clause
+  (a title match and day_key = ? or a UTC time window). Never update or delete everything.
+  For relative shifts use strftime('%Y-%m-%dT%H:%M:%S', col, ?) with a modifier
+  param such as '+1 hour'.
+- Match events by name or keyword with
+  id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?), never LIKE; the
+  param quotes each word and adds *, e.g. '"jake"* "lunch"*'.
+- Never set start_utc, end_utc or day_key; filter on them instead of wrapping
+  start_time/end_time in date() or strftime().
+- list_events: SELECT * with an overlap filter on the UTC columns
+  (start_utc < CAST(strftime('%s', ?, 'utc') AS INTEGER)
+   AND end_utc > CAST(strftime('%s', ?, 'utc') AS INTEGER), params in local time),
+  or day_key = ? for a single day, ordered by start_utc. Also match recurring
+  series with OR (rrule IS NOT NULL AND start_utc < <range end>), and put the
+  listed range in fields.start_time/fields.end_time so they can be expanded.
+- check_availability ("when am I free Thursday afternoon?"): sql is null and
+  fields.start_time/fields.end_time are the range to check. Free gaps and busy
+  blocks are computed locally; reply with {{free}} / {{busy}}.
+- reply_template is the friendly final answer, written as if the SQL succeeded.
+  Use {{events}} where the list of matching events should go, {{count}} for how many
+  were found and {{rows_affected}} for how many were changed. Never show SQL or JSON.
+- empty_reply is what to say if nothing matched (for check_availability: no free
+  time in the range). For chit_chat, put the full
+  answer in both reply_template and empty_reply.
+"""
+
+
+def load_llm_config(name: str = "default_llm") -> dict:
+    """Read one entry from config/llms.yaml (provider + model)."""
+    with open(LLMS_CONFIG, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f).get(name, {})
+
+
+def single_call_llm() -> LLM:
+    """The planner model; uses the same default model as the crew agents."""
+    cfg = load_llm_config()
+    return LLM(
+        model=cfg.get("model", "gpt-4o-mini"),
+        temperature=0.1,
+        max_tokens=1024,
+    )
+
+
+class _SafeFormat(dict):
+    """Leave unknown {placeholders} in a template untouched instead of raising."""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def _fill(template: str, fallback: str, **values) -> str:
+    """
+    The model-written template filled from values, or fallback if it is not
+    a valid format string (a stray brace, {0}, {a.b}): by the time the reply
+    is rendered the SQL has already run, so rendering must not fail.
+    """
+    try:
+        return template.format_map(_SafeFormat(values))
+    except (ValueError, IndexError, KeyError, AttributeError):
+        return fallback
+
+
+def render_reply(plan: CalendarPlan, result: Optional[dict]) -> str:
+    """Fill the plan's templates from the local SQL result."""
+    if result is None:
+        return plan.reply_template
+
+    if not result.get("success"):
+        return (
+            "Sorry — I couldn't update your calendar because something went wrong "
+            "with that request. Could you try rephrasing it?"
+        )
+
+    if "free" in result:
+        template = plan.reply_template if result["free"] else plan.empty_reply
+        free = "\n".join(describe_span(s) for s in result["free"])
+        busy = "\n".join(describe_span(s) for s in result["busy"])
+        fallback = f"You're free:\n{free}" if free else "You have no free time then."
+        return _fill(template, fallback, free=free, busy=busy)
+
+    rows = result.get("rows") or []
+    rows_affected = result.get("rows_affected") or 0
+    is_select = plan.sql.strip().upper().startswith("SELECT")
+    if (is_select and not rows) or (not is_select and rows_affected == 0):
+        template = plan.empty_reply
+    else:
+        template = plan.reply_template
+
+    events = "\n".join(describe_event(r) for r in rows if "title" in r)
+    if is_select:
+        fallback = f"Found {len(rows)} event(s)." + (f"\n{events}" if events else "")
+    else:
+        fallback = f"Done — {rows_affected} event(s) updated."
+    reply = _fill(template, fallback, count=len(rows), rows_affected=rows_affected, events=events)
+    return reply + describe_conflicts(result.get("conflicts"))
+
+
+def execute_plan(plan: CalendarPlan) -> Optional[dict]:
+    """Run the plan's SQL locally (no LLM). Returns None when there is no SQL."""
+    if plan.intent == "check_availability":
+        return _free_busy(plan.fields.start_time, plan.fields.end_time)
+    if plan.intent == "chit_chat" or not plan.sql:
+        return None
+
+    statement = plan.sql.strip().split(None, 1)[0].upper() if plan.sql.strip() else ""
+    if statement not in ALLOWED_STATEMENTS:
+        return {"success": False, "sql": plan.sql, "error": f"Refusing {statement} statement"}
+
+    result = json.loads(_run_sql(plan.sql, tuple(plan.params)))
+    if plan.intent == "list_events":
+        result = expand_recurring(result, plan.fields.start_time, plan.fields.end_time)
+    return result
+
+
+class SingleCallPipeline:
+    """
+    Drop-in replacement for the crew inside crewai_runner's worker pool:
+    kickoff(inputs) takes the same template inputs and returns the reply.
+    """
+
+    # No per-agent token stream to forward; the runner sends a single "done" line.
+    streams = False
+
+    def __init__(self, llm: LLM = None):
+        self.llm = llm or single_call_llm()
+
+    def plan(self, inputs: dict) -> CalendarPlan:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT.format(**inputs)},
+            {"role": "user", "content": inputs["user_query"]},
+        ]
+        raw = self.llm.call(messages, response_model=CalendarPlan)
+        if isinstance(raw, CalendarPlan):
+            return raw
+        return CalendarPlan.model_validate_json(raw)
+
+    def kickoff(self, inputs: dict) -> str:
+        plan = self.plan(inputs)
+        return render_reply(plan, execute_plan(plan))
+
+    def copy(self) -> "SingleCallPipeline":
+        return SingleCallPipeline(single_call_llm())
@@ -0,0 +1,168 @@
+"""
+Slot search: "schedule 45 minutes with X sometime next week".
+
+find_slots() looks for free starts of a given duration inside a window,
+limited to working hours on working days and keeping a buffer around
+existing events. Busy time comes from freebusy.busy_intervals(), a range
+scan narrowed by events_rtree rather than a full table read. Each interval
+is padded by the buffer and merged with merge_intervals().
+
+Candidate starts are aligned to step minutes from local midnight (:00, :15,
+...) and never lie in the past. Ranking is earliest first, spread across
+days: every day's first slot outranks any day's second (non-overlapping)
+slot. So "sometime next week" offers Monday, Tuesday and Wednesday rather
+than 09:00, 09:15 and 09:30 on Monday.
+"""
+
+import sqlite3
+import time as _time
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from calendar_interaction.freebusy import busy_intervals, merge_intervals
+from calendar_interaction.schema import utc_epoch
+
+
+WORKDAYS = (0, 1, 2, 3, 4)  # Monday..Friday
+
+# Merged busy blocks [(start, end, event ids)] and their end times
+Timeline = Tuple[List[Tuple[int, int, list]], List[int]]
+
+
+def parse_hhmm(value) -> time:
+    """A local time of day from "HH:MM" (or a time). Raises ValueError."""
+    if isinstance(value, time):
+        return value
+    try:
+        return time.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Invalid time of day: {value!r} (expected HH:MM)") from None
+
+
+def _local_iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
+
+
+def _epoch(day: date, at: time) -> int:
+    return int(datetime.combine(day, at).timestamp())
+
+
+def _day_starts(busy: List[Tuple[int, int, list]], ends: List[int],
+                day_lo: int, day_hi: int, midnight: int,
+                duration: int, step: int) -> Iterator[int]:
+    """
+    Aligned starts in [day_lo, day_hi) whose whole slot avoids the merged
+    busy blocks (ends = their end times, for bisecting).
+    """
+    i = bisect_right(ends, day_lo)  # first block ending after day_lo
+    cursor = day_lo
+    while cursor < day_hi:
+        gap_end = day_hi if i >= len(busy) else min(busy[i][0], day_hi)
+        start = midnight - (midnight - cursor) // step * step  # align up
+        while start + duration <= gap_end:
+            yield start
+            start += step
+        if i >= len(busy):
+            break
+        cursor = busy[i][1]
+        i += 1
+
+
+def busy_timeline(conn: sqlite3.Connection, lo: int, hi: int, buffer: int = 0,
+                  include_all_day: bool = False,
+                  cache_conn: Optional[sqlite3.Connection] = None) -> Timeline:
+    """
+    Merged busy blocks around [lo, hi) (epoch seconds), each event padded
+    by `buffer` seconds, plus their end times for bisecting.
+    """
+    # Events up to one buffer outside the window still push slots away
+    intervals = busy_intervals(conn, _local_iso(lo - buffer), _local_iso(hi + buffer),
+                               include_all_day, cache_conn)
+    busy = merge_intervals(
+        ((s - buffer, e + buffer, i) for s, e, i in intervals), lo - buffer, hi + buffer
+    )
+    return busy, [b[1] for b in busy]
+
+
+def candidate_starts(timeline: Timeline, lo: int, hi: int, duration: int, step: int,
+                     day_open: time, day_close: time,
+                     weekdays: Sequence[int] = WORKDAYS) -> Iterator[Tuple[date, int]]:
+    """(local day, start epoch) of every aligned free start in [lo, hi), in order."""
+    busy, ends = timeline
+    day, last_day = datetime.fromtimestamp(lo).date(), datetime.fromtimestamp(hi).date()
+    while day <= last_day:
+        if day.weekday() in weekdays:
+            day_lo = max(_epoch(day, day_open), lo)
+            day_hi = min(_epoch(day, day_close), hi)
+            for start in _day_starts(busy, ends, day_lo, day_hi, _epoch(day, time()),
+                                     duration, step):
+                yield day, start
+        day += timedelta(days=1)
+
+
+def parse_window(window_start: str, window_end: str, not_before: Optional[str] = None) -> Tuple[int, int]:
+    """
+    [lo, hi) epoch seconds for a local/UTC ISO window, starting no earlier
+    than not_before (default: now). Raises ValueError if unparseable.
+    """
+    lo, hi = utc_epoch(window_start), utc_epoch(window_end)
+    if lo is None or hi is None or lo >= hi:
+        raise ValueError(f"Invalid window: {window_start!r} to {window_end!r}")
+    earliest = utc_epoch(not_before) if not_before else int(_time.time())
+    return max(lo, earliest or lo), hi
+
+
+def working_hours(work_start, work_end) -> Tuple[time, time]:
+    """Parsed ("HH:MM", "HH:MM") working hours. Raises ValueError if invalid."""
+    day_open, day_close = parse_hhmm(work_start), parse_hhmm(work_end)
+    if day_close <= day_open:
+        raise ValueError(f"Working hours end before they start: {work_start}-{work_end}")
+    return day_open, day_close
+
+
+def find_slots(conn: sqlite3.Connection, duration_minutes: int,
+               window_start: str, window_end: str,
+               work_start="09:00", work_end="17:00",
+               buffer_minutes: int = 0, count: int = 3, step_minutes: int = 15,
+               weekdays: Sequence[int] = WORKDAYS, include_all_day: bool = False,
+               not_before: Optional[str] = None,
+               cache_conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, str]]:
+    """
+    Up to `count` free slots of duration_minutes in [window_start,
+    window_end), best first, as [{start, end}] naive local ISO 8601.
+
+    work_start/work_end bound each day ("HH:MM", local), weekdays lists the
+    days to use (0 = Monday), buffer_minutes must stay free on both sides of
+    existing events. Slots start no earlier than not_before (default: now).
+    Raises ValueError for an unparseable window or bad working hours.
+    """
+    lo, hi = parse_window(window_start, window_end, not_before)
+    day_open, day_close = working_hours(work_start, work_end)
+    duration = int(duration_minutes) * 60
+    if duration <= 0:
+        raise ValueError("duration_minutes must be positive")
+    step = max(int(step_minutes), 1) * 60
+    if lo >= hi:
+        return []
+
+    timeline = busy_timeline(conn, lo, hi, max(int(buffer_minutes or 0), 0) * 60,
+                             include_all_day, cache_conn)
+
+    ranked: List[Tuple[int, int]] = []   # (rank within its day, start)
+    overlapping: List[int] = []          # starts overlapping a better one that day
+    current_day, rank, taken_until = None, 0, None
+    for day, start in candidate_starts(timeline, lo, hi, duration, step,
+                                       day_open, day_close, weekdays):
+        if day != current_day:
+            current_day, rank, taken_until = day, 0, None
+        if taken_until is None or start >= taken_until:
+            ranked.append((rank, start))
+            rank, taken_until = rank + 1, start + duration
+        else:
+            overlapping.append(start)
+
+    ranked.sort()
+    starts = [s for _, s in ranked[:count]]
+    starts += sorted(overlapping)[:count - len(starts)]
+    return [{"start": _local_iso(s), "end": _local_iso(s + duration)} for s in starts]
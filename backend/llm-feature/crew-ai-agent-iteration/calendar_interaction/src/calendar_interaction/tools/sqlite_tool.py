@@ -1,28 +1,102 @@
 import os
-import sqlite3
+import time
 import json
+import threading
 
-# CrewAI's @tool decorator (fallback for local testing)
-try:
-    from crewai.tools import tool
-except Exception:
-    def tool(*args, **kwargs):
-        def decorator(fn):
-            return fn
-        return decorator
+from calendar_interaction.db_pool import get_manager, is_read_only_sql
+from calendar_interaction.schema import events_between, search_events
+from calendar_interaction.recurrence import expand_rows
+from calendar_interaction.freebusy import free_busy
+from calendar_interaction.slots import find_slots
+from calendar_interaction.batch_scheduler import schedule_batch
+from calendar_interaction.changelog import fetch_rows
+from calendar_interaction.conflicts import find_conflicts, touched_ids, track_writes, written_events
+
+
+def _crewai_tool(name: str):
+    """
+    CrewAI's @tool decorator (fallback for local testing). Imported only when
+    a crew first asks for one of the tools in section 2: importing crewai is
+    most of the runner's startup, and the fast path, imports and exports
+    never need it.
+    """
+    try:
+        from crewai.tools import tool
+    except Exception:
+        return lambda fn: fn
+    return tool(name)
 
 
 # ============================================================
 # 1. CORE SQL EXECUTION LOGIC (shared by everything)
 # ============================================================
 
-def _run_sql(sql: str) -> str:
+# Called with {"op", "ids", "rows"} after every successful write; see
+# set_write_listener()
+_write_listener = None
+
+# Ids (and rows) per listener call, so a bulk UPDATE is several calls
+NOTIFY_CHUNK = 500
+
+
+def set_write_listener(listener):
+    """
+    Register listener(change) to be told about every events row a write
+    through _run_sql or _schedule_batch inserted, updated or deleted, right
+    after it commits. change is {"op": "insert" | "update" | "delete",
+    "ids": [...], "rows": [current row for each id]} (rows is [] for
+    deletes). The runner pushes these to Electron. None unregisters.
+    """
+    global _write_listener
+    _write_listener = listener
+
+
+# Called with {"kind", "ms", "rows", "ok"} after every query; see
+# set_query_listener()
+_query_listener = None
+
+
+def set_query_listener(listener):
+    """
+    Register listener(query) to be told, on the thread that ran it, how
+    long each _run_sql statement (and each free/busy, slot search or batch
+    schedule, each search) took: query is {"kind": "select" | "write" |
+    "free_busy" | "find_slots" | "schedule_batch" | "search", "ms", "rows",
+    "ok"}, rows being the
+    rows returned or affected. The runner adds these to its per-request
+    metrics. None unregisters.
+    """
+    global _query_listener
+    _query_listener = listener
+
+
+def _report_query(kind: str, started: float, rows: int, ok: bool):
+    listener = _query_listener
+    if listener is None:
+        return
+    try:
+        listener({"kind": kind, "ms": round((time.perf_counter() - started) * 1000, 3),
+                  "rows": rows, "ok": ok})
+    except Exception as e:
+        print(f"[SQLITE_TOOL] query listener failed: {e}")
+
+
+def _run_sql(sql: str, params=()) -> str:
     """
     Core SQL execution logic used by BOTH Crew (via sqlite_tool)
     and your manual tests (via Tools.run_sql).
+
+    `params` are bound to `?` placeholders; the crew passes plain SQL,
+    deterministic callers (e.g. the runner's fast path) pass values here
+    instead of formatting them into the string.
+
+    Writes also report "conflicts": events overlapping whatever the
+    statement inserted or moved (see conflicts.py).
     """
     print("[SQLITE_TOOL] CALLED with SQL:")
     print(sql)
+    if params:
+        print(f"[SQLITE_TOOL] PARAMS: {params}")
 
     db_path = os.getenv("CALENDAR_DB_PATH")
     print(f"[SQLITE_TOOL] CALENDAR_DB_PATH = {db_path}")
@@ -36,16 +110,22 @@ def _run_sql(sql: str) -> str:
         print(f"[SQLITE_TOOL] RESULT: {result}")
         return json.dumps(result)
 
+    conn = None
+    started = time.perf_counter()
+    is_select = is_read_only_sql(sql)
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        # Pooled per-thread connection: read-only for SELECTs, WAL writer otherwise
+        conn = get_manager(db_path).connection_for(sql)
         cur = conn.cursor()
 
-        cur.execute(sql)
+        if not is_select:
+            track_writes(conn)
+        cur.execute(sql, params)
 
-        is_select = sql.strip().upper().startswith("SELECT")
         rows = []
         rows_affected = 0
+        last_row_id = None
+        conflicts = None
 
         if is_select:
             fetched = cur.fetchall()
@@ -53,19 +133,29 @@ def _run_sql(sql: str) -> str:
         else:
             conn.commit()
             rows_affected = cur.rowcount
-
-        conn.close()
+            last_row_id = cur.lastrowid
+            _notify_write(conn)
+            conflicts = _conflicts_after_write(conn)
 
         result = {
             "success": True,
             "sql": sql,
             "rows": rows,
             "rows_affected": rows_affected,
+            "last_row_id": last_row_id,
         }
+        if conflicts is not None:
+            result["conflicts"] = conflicts
+        _report_query("select" if is_select else "write", started,
+                      len(rows) if is_select else rows_affected, True)
         print(f"[SQLITE_TOOL] RESULT: {result}")
         return json.dumps(result, default=str)
 
     except Exception as e:
+        # The connection outlives this call, so undo any half-finished write
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        _report_query("select" if is_select else "write", started, 0, False)
         result = {
             "success": False,
             "sql": sql,
@@ -75,12 +165,44 @@ def _run_sql(sql: str) -> str:
         return json.dumps(result)
 
 
+def _conflicts_after_write(conn) -> list:
+    """Conflicts for the rows the last write touched; [] if the check fails."""
+    try:
+        return find_conflicts(conn, touched_ids(conn), conn)
+    except Exception as e:
+        # The write itself succeeded; a failed check must not turn it into an error
+        print(f"[SQLITE_TOOL] conflict check failed: {e}")
+        return []
+
+
+def _notify_write(conn):
+    """Pass the rows the last write changed to the write listener, if any."""
+    listener = _write_listener
+    if listener is None:
+        return
+    try:
+        for op, ids in written_events(conn).items():
+            for i in range(0, len(ids), NOTIFY_CHUNK):
+                chunk = ids[i:i + NOTIFY_CHUNK]
+                rows = []
+                if op != "delete":
+                    # A row deleted since (by another connection) is left out
+                    found = fetch_rows(conn, chunk)
+                    rows = [found[event_id] for event_id in chunk if event_id in found]
+                listener({"op": op, "ids": chunk, "rows": rows})
+    except Exception as e:
+        # As with conflicts: the write succeeded whatever the listener does
+        print(f"[SQLITE_TOOL] write notification failed: {e}")
+
+
 # ============================================================
 # 2. MODULE-LEVEL TOOL FUNCTION FOR CREW AI  (IMPORTANT PART)
 # ============================================================
+# Plain functions here; __getattr__ below wraps each with @tool the first
+# time its tool name is imported (e.g. `from ...sqlite_tool import
+# free_busy_tool` in crew.py).
 
-@tool("sqlite_tool")
-def sqlite_tool(sql: str) -> str:
+def _sqlite_tool(sql: str) -> str:
     """
     This is the CrewAI tool. CrewAI looks for this function name.
     The name must match what you list in agents.yaml:
@@ -90,8 +212,249 @@ def sqlite_tool(sql: str) -> str:
     return _run_sql(sql)
 
 
+def _free_busy_tool(range_start: str, range_end: str, granularity_minutes: int = 15) -> str:
+    """
+    Busy blocks and free gaps in the user's calendar between range_start and
+    range_end (local ISO 8601, e.g. 2025-12-11T12:00:00). Use this instead of
+    working out free time from raw events. granularity_minutes rounds busy
+    blocks out to that grid (0 = exact times).
+    """
+    return json.dumps(_free_busy(range_start, range_end, granularity_minutes))
+
+
+def _find_slots_tool(duration_minutes: int, window_start: str, window_end: str,
+                    work_start: str = "09:00", work_end: str = "17:00",
+                    buffer_minutes: int = 0, count: int = 3) -> str:
+    """
+    Best free slots of duration_minutes between window_start and window_end
+    (local ISO 8601), inside working hours (work_start/work_end as HH:MM) on
+    weekdays, keeping buffer_minutes free around existing events. Use this
+    to pick a time whenever the user did not give an exact one.
+    """
+    return json.dumps(_find_slots(duration_minutes, window_start, window_end,
+                                  work_start=work_start, work_end=work_end,
+                                  buffer_minutes=buffer_minutes, count=count))
+
+
+def _search_events_tool(text: str, limit: int = 10) -> str:
+    """
+    Events whose title, description or location match every word of text
+    (word prefixes, ignoring case and accents), best match first, with
+    their id and times. Use this to find the event an update or delete is
+    about instead of guessing its id.
+    """
+    return json.dumps(_search_events(text, limit), default=str)
+
+
+# Tool name (as listed in agents.yaml / passed to Agent(tools=...)) -> function
+CREW_TOOLS = {
+    "sqlite_tool": _sqlite_tool,
+    "free_busy_tool": _free_busy_tool,
+    "find_slots_tool": _find_slots_tool,
+    "search_events_tool": _search_events_tool,
+}
+_tools_lock = threading.Lock()
+
+
+def __getattr__(name):
+    """Build the CrewAI tool `name` on first access (PEP 562)."""
+    fn = CREW_TOOLS.get(name)
+    if fn is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _tools_lock:
+        if name not in globals():
+            globals()[name] = _crewai_tool(name)(fn)
+    return globals()[name]
+
+
+# ============================================================
+# 3. DETERMINISTIC EXECUTION OF THE PLANNER'S SQL (no LLM turn)
+# ============================================================
+
+def parse_plan(text: str):
+    """
+    Pull the planner's JSON object ({intent, fields, sql, notes}) out of its
+    output. Tolerates ```json fences and prose around the object.
+    Returns the dict, or None if there is no usable JSON object.
+    """
+    if not text:
+        return None
+    start = text.find("{")
+    end = text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        plan = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(plan, dict) or "sql" not in plan:
+        return None
+    return plan
+
+
+def execute_plan_sql(plan: dict) -> dict:
+    """
+    Run the SQL from a parsed plan through _run_sql. A null/empty sql
+    (e.g. chit_chat) is not executed and yields an empty, successful result.
+    check_availability and schedule_batch plans carry no SQL: they are
+    answered by _free_busy / _schedule_batch instead.
+    """
+    fields = plan.get("fields") or {}
+    if plan.get("intent") == "check_availability":
+        return _free_busy(fields.get("range_start"), fields.get("range_end"),
+                          fields.get("granularity_minutes") or 15)
+    if plan.get("intent") == "schedule_batch":
+        return _schedule_batch(fields)
+
+    sql = plan.get("sql")
+    if not sql or not str(sql).strip():
+        return {"success": True, "sql": None, "rows": [], "rows_affected": 0}
+    result = json.loads(_run_sql(str(sql)))
+
+    # For a listing, the planner puts the range it queried in fields
+    if plan.get("intent") == "list_events":
+        result = expand_recurring(result, fields.get("range_start"), fields.get("range_end"))
+    return result
+
+
+def expand_recurring(result: dict, range_start, range_end) -> dict:
+    """
+    Recurring series are one master row each: in a successful SELECT result,
+    swap every master for its occurrences in [range_start, range_end).
+    Returns the result unchanged if there is no range or nothing to expand.
+    """
+    rows = result.get("rows")
+    if not (result.get("success") and rows and range_start and range_end):
+        return result
+    if not any(r.get("rrule") for r in rows):
+        return result
+    cache_conn = get_manager(os.getenv("CALENDAR_DB_PATH")).cache_writer()
+    rows = expand_rows(rows, str(range_start), str(range_end), cache_conn)
+    rows.sort(key=lambda r: str(r.get("start_time", "")))
+    return dict(result, rows=rows)
+
+
+def _events_between(start_iso: str, end_iso: str) -> dict:
+    """
+    Every event overlapping [start_iso, end_iso), recurring occurrences
+    included (schema.events_between), in _run_sql's result shape.
+    """
+    db_path = os.getenv("CALENDAR_DB_PATH")
+    if not db_path:
+        return {"success": False, "error": "CALENDAR_DB_PATH environment variable is not set."}
+    try:
+        manager = get_manager(db_path)
+        rows = events_between(manager.reader(), start_iso, end_iso, manager.cache_writer())
+        return {"success": True, "rows": rows, "rows_affected": 0}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def _free_busy(range_start, range_end, granularity_minutes=15) -> dict:
+    """
+    Merged busy blocks and free gaps in [range_start, range_end)
+    (freebusy.free_busy), with success/error like _run_sql's results.
+    """
+    db_path = os.getenv("CALENDAR_DB_PATH")
+    if not db_path:
+        return {"success": False, "error": "CALENDAR_DB_PATH environment variable is not set."}
+    if not range_start or not range_end:
+        return {"success": False, "error": "range_start and range_end are required."}
+    started = time.perf_counter()
+    try:
+        manager = get_manager(db_path)
+        result = free_busy(manager.reader(), str(range_start), str(range_end),
+                           int(granularity_minutes or 0), cache_conn=manager.cache_writer())
+        _report_query("free_busy", started, len(result.get("busy", [])), True)
+        return dict(result, success=True)
+    except Exception as e:
+        _report_query("free_busy", started, 0, False)
+        return {"success": False, "error": str(e)}
+
+
+def _find_slots(duration_minutes, window_start, window_end, **options) -> dict:
+    """
+    Ranked free slots (slots.find_slots) as {success, slots: [{start, end}]}.
+    options are passed through (work_start, work_end, buffer_minutes, count, ...).
+    """
+    db_path = os.getenv("CALENDAR_DB_PATH")
+    if not db_path:
+        return {"success": False, "error": "CALENDAR_DB_PATH environment variable is not set."}
+    started = time.perf_counter()
+    try:
+        manager = get_manager(db_path)
+        slots = find_slots(manager.reader(), int(duration_minutes), str(window_start),
+                           str(window_end), cache_conn=manager.cache_writer(), **options)
+        _report_query("find_slots", started, len(slots), True)
+        return {"success": True, "slots": slots}
+    except Exception as e:
+        _report_query("find_slots", started, 0, False)
+        return {"success": False, "error": str(e)}
+
+
+# Constraint keys a schedule_batch plan may set in its fields
+BATCH_CONSTRAINTS = (
+    "min_gap_minutes", "max_per_day", "preferred_start", "preferred_end",
+    "work_start", "work_end", "buffer_minutes",
+)
+
+
+def _schedule_batch(fields: dict) -> dict:
+    """
+    Place and insert every event of a schedule_batch plan in one transaction
+    (batch_scheduler.schedule_batch). fields: events [{title,
+    duration_minutes, earliest?, latest?, ...}], window_start, window_end
+    and any BATCH_CONSTRAINTS. Returns the inserted rows like a SELECT.
+    """
+    db_path = os.getenv("CALENDAR_DB_PATH")
+    if not db_path:
+        return {"success": False, "error": "CALENDAR_DB_PATH environment variable is not set."}
+    if not fields.get("events") or not fields.get("window_start") or not fields.get("window_end"):
+        return {"success": False, "error": "events, window_start and window_end are required."}
+    constraints = {k: fields[k] for k in BATCH_CONSTRAINTS if fields.get(k) is not None}
+    started = time.perf_counter()
+    conn = None
+    try:
+        conn = get_manager(db_path).writer()
+        track_writes(conn)
+        # The tracking reset's DELETEs opened an implicit transaction, and
+        # schedule_batch needs to BEGIN IMMEDIATE its own
+        if conn.in_transaction:
+            conn.commit()
+        rows = schedule_batch(conn, fields["events"],
+                              str(fields["window_start"]), str(fields["window_end"]),
+                              **constraints)
+        _notify_write(conn)
+        _report_query("schedule_batch", started, len(rows), True)
+        return {"success": True, "rows": rows, "rows_affected": len(rows)}
+    except Exception as e:
+        # The writer is pooled: never leave it with a transaction open
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        _report_query("schedule_batch", started, 0, False)
+        return {"success": False, "error": str(e)}
+
+
+def _search_events(text: str, limit: int = 20) -> dict:
+    """
+    Ranked full-text search over title/description/location via the
+    events_fts index (schema.search_events), in _run_sql's result shape.
+    """
+    db_path = os.getenv("CALENDAR_DB_PATH")
+    if not db_path:
+        return {"success": False, "error": "CALENDAR_DB_PATH environment variable is not set."}
+    started = time.perf_counter()
+    try:
+        rows = search_events(get_manager(db_path).reader(), text, int(limit or 20))
+        _report_query("search", started, len(rows), True)
+        return {"success": True, "rows": rows, "rows_affected": 0}
+    except Exception as e:
+        _report_query("search", started, 0, False)
+        return {"success": False, "error": str(e)}
+
+
 # ============================================================
-# 3. CLASS FOR MANUAL TESTING (e.g., insert_test.py)
+# 4. CLASS FOR MANUAL TESTING (e.g., insert_test.py)
 # ============================================================
 
 class Tools:
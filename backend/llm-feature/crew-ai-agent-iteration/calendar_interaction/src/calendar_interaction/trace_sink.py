@@ -0,0 +1,404 @@
+"""
+Local trace sink for crewai_runner (CALENDAR_TRACE, default "sqlite").
+
+crew.py used to set tracing=True, which has crewai's TraceBatchManager
+open a batch on its backend at kickoff and send the events at the end,
+so on offline or firewalled desktops every request waited on the network.
+Tracing now stays on this machine:
+
+  - Handlers on crewai's event bus turn crew, task, agent, LLM call, tool
+    and guardrail events into a small tuple each and put it on a bounded
+    queue without blocking. When the queue is full the record is dropped
+    and counted; a kickoff never waits on trace I/O.
+  - A background thread pairs start and end records into spans (trace_id
+    per crew kickoff, span_id, parent_id, kind, name, start/end time,
+    duration, status, attributes) and hands them in batches to an
+    exporter: SqliteTraceExporter (traces.db next to the calendar DB,
+    trimmed to the newest max_spans) or JsonlTraceExporter (traces.jsonl,
+    one span per line). Anything with export(spans) and close() fits.
+
+Memory is bounded by the queue size and by how many spans may be open at
+once. crewai is imported only by LocalTraceSink.register().
+"""
+
+import os
+import json
+import queue
+import sqlite3
+import uuid
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_MAX_SPANS = 50000
+MAX_OPEN_SPANS = 1000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+
+SPANS_DDL = """
+CREATE TABLE IF NOT EXISTS spans (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  trace_id    TEXT,
+  span_id     TEXT NOT NULL,
+  parent_id   TEXT,
+  kind        TEXT NOT NULL,
+  name        TEXT,
+  start_time  REAL NOT NULL,
+  end_time    REAL NOT NULL,
+  duration_ms REAL NOT NULL,
+  status      TEXT NOT NULL,
+  attributes  TEXT
+);
+CREATE INDEX IF NOT EXISTS spans_trace ON spans(trace_id);
+"""
+
+SPAN_COLUMNS = ("trace_id", "span_id", "parent_id", "kind", "name", "start_time",
+                "end_time", "duration_ms", "status", "attributes")
+
+
+def get_trace_path(mode: str) -> str:
+    """traces.db (or traces.jsonl) in the same directory as the calendar DB."""
+    db_path = os.getenv("CALENDAR_DB_PATH", "calendar_llm.db")
+    name = "traces.jsonl" if mode == "jsonl" else "traces.db"
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), name)
+
+
+class SqliteTraceExporter:
+    """Spans in a SQLite table, trimmed to the newest max_spans rows."""
+
+    def __init__(self, path: str, max_spans: int = DEFAULT_MAX_SPANS):
+        self.max_spans = max_spans
+        self._since_trim = 0
+        self._conn = sqlite3.connect(path, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(SPANS_DDL)
+
+    def export(self, spans):
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO spans ({', '.join(SPAN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SPAN_COLUMNS))})",
+                [tuple(s[c] if c != "attributes" else json.dumps(s[c], default=str)
+                       for c in SPAN_COLUMNS) for s in spans],
+            )
+            self._since_trim += len(spans)
+            if self._since_trim >= max(self.max_spans // 10, 1):
+                self._since_trim = 0
+                self._conn.execute(
+                    "DELETE FROM spans WHERE id <= (SELECT MAX(id) FROM spans) - ?",
+                    (self.max_spans,),
+                )
+
+    def close(self):
+        self._conn.close()
+
+
+class JsonlTraceExporter:
+    """Spans appended to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans):
+        # One write per batch, so processes sharing the file do not interleave lines
+        self._file.write("".join(json.dumps(s, default=str) + "\n" for s in spans))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _ts(event) -> float:
+    return event.timestamp.timestamp()
+
+
+def _id(obj):
+    return str(obj.id) if obj is not None and getattr(obj, "id", None) is not None else None
+
+
+class LocalTraceSink:
+    """
+    Event bus handlers plus the writer thread. make_exporter is called on
+    the writer thread, so the exporter (a SQLite connection, a file) is
+    only ever used there; after a fork the child starts its own writer.
+    """
+
+    def __init__(self, make_exporter, max_queue: int = DEFAULT_MAX_QUEUE):
+        self._make_exporter = make_exporter
+        self._max_queue = max_queue
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.export_errors = 0
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Fresh queue and no writer: the first record starts one (in this process)
+        self._queue = queue.Queue(maxsize=self._max_queue)
+        self._thread = None
+        self.dropped = 0
+
+    # ---------- event bus side: never blocks ----------
+
+    def _put(self, record):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer_loop,
+                                                name="trace-sink", daemon=True)
+                self._thread.start()
+
+    def register(self, bus):
+        """Subscribe to the events that make up spans on crewai's event bus."""
+        from crewai.events.types.crew_events import (
+            CrewKickoffStartedEvent, CrewKickoffCompletedEvent, CrewKickoffFailedEvent,
+        )
+        from crewai.events.types.task_events import (
+            TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+        )
+        from crewai.events.types.agent_events import (
+            AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+        )
+        from crewai.events.types.llm_events import (
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        )
+        from crewai.events.types.tool_usage_events import (
+            ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent,
+        )
+        from crewai.events.types.llm_guardrail_events import (
+            LLMGuardrailStartedEvent, LLMGuardrailCompletedEvent,
+        )
+
+        # Records: (phase, kind, key, parent_key, crew_key, time, name, attributes)
+        # Keys name a span while it is open; crew_key (or the task's, for
+        # spans below a task) picks the trace.
+
+        @bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            key = f"crew:{_id(source)}"
+            self._put(("start", "crew", key, None, key, _ts(event), event.crew_name, None))
+
+        @bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            self._put(("end", "crew", f"crew:{_id(source)}", None, None, _ts(event), None,
+                       {"total_tokens": event.total_tokens}))
+
+        @bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            self._put(("error", "crew", f"crew:{_id(source)}", None, None, _ts(event), None,
+                       {"error": event.error}))
+
+        def task_span(phase, event, attrs=None):
+            task = event.task
+            crew_key = None
+            if phase == "start":
+                crew_key = f"crew:{_id(getattr(getattr(task, 'agent', None), 'crew', None))}"
+            name = (task.name or task.description.strip()[:60]) if phase == "start" else None
+            self._put((phase, "task", f"task:{_id(task)}", crew_key, crew_key,
+                       _ts(event), name, attrs))
+
+        @bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task_span("start", event)
+
+        @bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            task_span("end", event)
+
+        @bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            task_span("error", event, {"error": event.error})
+
+        def agent_span(phase, event, attrs=None):
+            task_key = f"task:{_id(event.task)}"
+            key = f"agent:{_id(event.agent)}:{task_key}"
+            name = event.agent.role.strip() if phase == "start" else None
+            self._put((phase, "agent", key, task_key, None, _ts(event), name, attrs))
+
+        @bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            agent_span("start", event)
+
+        @bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            agent_span("end", event)
+
+        @bus.on(AgentExecutionErrorEvent)
+        def on_agent_error(source, event):
+            agent_span("error", event, {"error": event.error})
+
+        def below_agent(kind, phase, event, name=None, attrs=None, suffix=""):
+            # LLM calls, tools and guardrails of one agent on one task run one
+            # at a time, so the agent's span key identifies them
+            task_key = f"task:{event.task_id}"
+            parent = f"agent:{event.agent_id}:{task_key}" if event.agent_id else task_key
+            self._put((phase, kind, f"{kind}:{parent}{suffix}", parent, None,
+                       _ts(event), name, attrs))
+
+        @bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            below_agent("llm", "start", event, event.model)
+
+        @bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            below_agent("llm", "end", event, attrs={"call_type": event.call_type.value})
+
+        @bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            below_agent("llm", "error", event, attrs={"error": event.error})
+
+        @bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            below_agent("tool", "start", event, event.tool_name, suffix=f":{event.tool_name}")
+
+        @bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            below_agent("tool", "end", event, attrs={"from_cache": event.from_cache},
+                        suffix=f":{event.tool_name}")
+
+        @bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            below_agent("tool", "error", event, attrs={"error": str(event.error)},
+                        suffix=f":{event.tool_name}")
+
+        @bus.on(LLMGuardrailStartedEvent)
+        def on_guardrail_started(source, event):
+            name = getattr(event.guardrail, "__name__", None) or "guardrail"
+            below_agent("guardrail", "start", event, name,
+                        attrs={"retry_count": event.retry_count})
+
+        @bus.on(LLMGuardrailCompletedEvent)
+        def on_guardrail_completed(source, event):
+            phase = "end" if event.success else "error"
+            below_agent("guardrail", phase, event, attrs={"error": event.error})
+
+    # ---------- writer thread ----------
+
+    def _writer_loop(self):
+        try:
+            exporter = self._make_exporter()
+        except Exception:
+            self.export_errors += 1
+            exporter = None
+        open_spans = OrderedDict()  # key -> span
+        traces = OrderedDict()      # crew key -> trace id of its current kickoff
+        task_crews = OrderedDict()  # task key -> crew key
+        source = self._queue
+
+        while True:
+            records = []
+            try:
+                records.append(source.get(timeout=FLUSH_INTERVAL))
+                while len(records) < BATCH_SIZE:
+                    records.append(source.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in records
+            # Handlers run on several bus threads, so restore emission order
+            records = sorted((r for r in records if r is not None), key=lambda r: r[5])
+
+            finished = []
+            for phase, kind, key, parent_key, crew_key, at, name, attrs in records:
+                if phase != "start":
+                    span = open_spans.pop(key, None)
+                    if span is not None:  # else its start was dropped or evicted
+                        finished.append(self._finish(span, phase, at, attrs,
+                                                     traces, task_crews, parent_key or key))
+                    continue
+                if key in open_spans:
+                    # crewai retries a failed agent by starting it again,
+                    # with no error event: the earlier attempt ends here
+                    finished.append(self._finish(open_spans.pop(key), "error", at,
+                                                 {"retried": True}, traces, task_crews,
+                                                 parent_key or key))
+                if kind == "crew":
+                    traces[key] = uuid.uuid4().hex
+                elif kind == "task" and crew_key:
+                    task_crews[key] = crew_key
+                parent = open_spans.get(parent_key) if parent_key else None
+                open_spans[key] = {
+                    "_crew": crew_key or (parent["_crew"] if parent else None),
+                    "trace_id": None,
+                    "span_id": uuid.uuid4().hex[:16],
+                    "parent_id": parent["span_id"] if parent else None,
+                    "kind": kind,
+                    "name": name,
+                    "start_time": at,
+                    "attributes": dict(attrs or {}),
+                }
+                for bounded in (open_spans, traces, task_crews):
+                    while len(bounded) > MAX_OPEN_SPANS:
+                        bounded.popitem(last=False)
+
+            if finished and exporter is not None:
+                try:
+                    exporter.export(finished)
+                    self.exported += len(finished)
+                except Exception:
+                    self.export_errors += 1
+            if stop:
+                if exporter is not None:
+                    exporter.close()
+                return
+
+    @staticmethod
+    def _finish(span, phase, at, attrs, traces, task_crews, task_key):
+        crew = span.pop("_crew") or task_crews.get(task_key)
+        span["trace_id"] = traces.get(crew)
+        span["end_time"] = at
+        span["duration_ms"] = round((at - span["start_time"]) * 1000, 2)
+        span["status"] = "ok" if phase == "end" else "error"
+        span["attributes"].update({k: v for k, v in (attrs or {}).items() if v is not None})
+        return span
+
+    def close(self, timeout: float = 2.0):
+        """Write out what is queued and stop the writer (best effort)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def summary(self) -> str:
+        return f"{self.exported} span(s) written, {self.dropped} dropped, {self.export_errors} error(s)"
+
+
+def make_exporter_factory(mode: str, path: str, max_spans: int = DEFAULT_MAX_SPANS):
+    if mode == "jsonl":
+        return lambda: JsonlTraceExporter(path)
+    return lambda: SqliteTraceExporter(path, max_spans)
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def install_trace_sink(make_exporter, max_queue: int = DEFAULT_MAX_QUEUE) -> LocalTraceSink:
+    """
+    Register a LocalTraceSink on crewai's event bus (imports crewai). Only
+    the first call in a process installs one; later calls return it.
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            import atexit
+            from crewai.events.event_bus import crewai_event_bus
+
+            sink = LocalTraceSink(make_exporter, max_queue)
+            sink.register(crewai_event_bus)
+            atexit.register(sink.close)
+            _sink = sink
+        return _sink
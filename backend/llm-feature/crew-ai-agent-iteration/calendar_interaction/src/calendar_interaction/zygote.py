@@ -0,0 +1,202 @@
+"""
+Zygote mode for crewai_runner (CALENDAR_RUNNER_ZYGOTE=1, POSIX only).
+
+Kickoffs run in worker processes forked from a warm parent instead of on
+threads of the runner:
+
+  - The zygote is multiprocessing's fork server: a single-threaded process
+    started once (fork+exec, so it is safe from the threaded runner) that
+    imports this module as its preload. With CALENDAR_ZYGOTE_SERVER set,
+    the import imports crewai, builds the pipeline and calls gc.freeze(),
+    so those objects are never touched by the collector again.
+  - WorkerProcess forks a worker from it (a few ms, everything already
+    imported and built), hands it one end of a Pipe and speaks a small
+    protocol over it. Workers share the zygote's pages copy-on-write
+    instead of each importing crewai and building a crew of their own.
+  - A worker that dies (crash, OOM kill) is replaced with a fresh fork;
+    only the request it was running is lost.
+
+Protocol (runner -> worker): ("kickoff", id, message, stream, queue_ms),
+("reload", api_key), None to exit. Worker -> runner: ("ready", pid) once
+(or ("failed", error) if it has no pipeline), ("line", json) for every line
+the worker would emit, ("done", id) at the end of each request or reload.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import multiprocessing
+from typing import Optional
+
+# Set only for the fork server, so the runner importing this module for
+# WorkerProcess does not build a pipeline of its own
+SERVER_ENV = "CALENDAR_ZYGOTE_SERVER"
+
+# The zygote's warm pipeline (None outside the fork server and its workers,
+# or if building it failed: workers then build their own)
+_pipeline = None
+
+
+def zygote_supported() -> bool:
+    return "forkserver" in multiprocessing.get_all_start_methods()
+
+
+def start_zygote(paths=()):
+    """
+    Start the fork server (if not already running) and return its
+    multiprocessing context. paths are added to the server's PYTHONPATH so
+    it can import the runner's modules when not frozen. Returns at once:
+    the server warms up in the background, and the first fork waits for it.
+    """
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload([__name__])
+    if paths and not getattr(sys, "frozen", False):
+        existing = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = os.pathsep.join([*paths, *([existing] if existing else [])])
+    os.environ[SERVER_ENV] = "1"
+    try:
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+    finally:
+        del os.environ[SERVER_ENV]
+    return ctx
+
+
+def _warm():
+    """In the fork server: import everything and build the pipeline, once."""
+    global _pipeline
+    import crewai_runner
+    try:
+        with crewai_runner.suppress_stdout_stderr():
+            _pipeline = crewai_runner.build_pipeline()
+    except Exception:
+        # e.g. no API key yet. The fork server must not die on its preload.
+        pass
+    gc.collect()
+    gc.freeze()
+
+
+if os.environ.get(SERVER_ENV) == "1":
+    _warm()
+
+
+def _serve(conn, cache_enabled: bool, api_key: Optional[str]):
+    """Worker main loop, in a process forked from the zygote."""
+    import crewai_runner
+    from calendar_interaction.tools.sqlite_tool import set_write_listener
+
+    send_lock = threading.Lock()
+
+    def send_line(line):
+        with send_lock:
+            conn.send(("line", line))
+
+    crewai_runner.set_emit_sink(send_line)
+    set_write_listener(crewai_runner.emit_events_changed)
+
+    # The key the zygote was warmed with; the runner's may have changed since
+    warm_key = os.environ.get("OPENAI_API_KEY")
+    if api_key:
+        os.environ["OPENAI_API_KEY"] = api_key
+    cache = crewai_runner.build_llm_cache() if cache_enabled else None
+
+    def prepare():
+        if _pipeline is None:
+            calendar_crew = crewai_runner.build_pipeline()
+        else:
+            # A copy, so _pipeline stays unwrapped by the cache for the next reload
+            calendar_crew = _pipeline.copy()
+            if os.environ.get("OPENAI_API_KEY") != warm_key:
+                crewai_runner.refresh_llm_clients(calendar_crew)
+        scope = crewai_runner.install_pipeline_cache(calendar_crew, cache) if cache else None
+        return calendar_crew, scope
+
+    try:
+        with crewai_runner.suppress_stdout_stderr():
+            calendar_crew, scope = prepare()
+    except Exception as e:
+        conn.send(("failed", str(e)))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return  # the runner went away
+        if msg is None:
+            return
+        if msg[0] == "reload":
+            # Only rebuild the clients if the key actually changed
+            if msg[1] and msg[1] != os.environ.get("OPENAI_API_KEY"):
+                os.environ["OPENAI_API_KEY"] = msg[1]
+                try:
+                    with crewai_runner.suppress_stdout_stderr():
+                        calendar_crew, scope = prepare()
+                except Exception as e:
+                    crewai_runner.emit({"type": "log", "level": "error",
+                                        "message": f"Reloading settings failed: {e}"})
+            conn.send(("done", None))
+        else:
+            _, req_id, message, stream, queue_ms = msg
+            crewai_runner.kickoff_and_emit(calendar_crew, scope, req_id, message, stream,
+                                           queue_ms)
+            conn.send(("done", req_id))
+
+
+class WorkerDied(Exception):
+    """The worker process exited (or its pipe broke) mid-conversation."""
+
+
+class WorkerProcess:
+    """Runner-side handle on one worker forked from the zygote."""
+
+    def __init__(self, ctx, cache_enabled: bool, api_key: Optional[str] = None):
+        """Fork a worker and wait until it is ready. Raises WorkerDied if it is not."""
+        started = time.perf_counter()
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child_conn, cache_enabled, api_key),
+                                   name="crew-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        kind, value = self._recv()
+        if kind == "failed":
+            self.close(0)
+            raise WorkerDied(value)
+        self.pid = value
+        self.spawn_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def _recv(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.process.join(1.0)  # reap it, for the exit code
+            raise WorkerDied(f"worker exited with code {self.process.exitcode}") from e
+
+    def request(self, msg, on_line) -> None:
+        """Send msg and pass every line the worker emits to on_line until it is done."""
+        try:
+            self.conn.send(msg)
+        except OSError as e:
+            raise WorkerDied("worker pipe closed") from e
+        while True:
+            kind, value = self._recv()
+            if kind == "done":
+                return
+            on_line(value)
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def close(self, timeout: Optional[float] = 5.0):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
@@ -0,0 +1,39 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.join(SRC_DIR, "calendar_interaction"))
+
+from calendar_interaction import db_pool
+
+# The events table as Electron creates it (backend/database/db.js)
+EVENTS_DDL = """
+CREATE TABLE events (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  title       TEXT NOT NULL,
+  description TEXT,
+  start_time  TEXT NOT NULL,
+  end_time    TEXT NOT NULL,
+  all_day     INTEGER NOT NULL DEFAULT 0,
+  location    TEXT,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+
+@pytest.fixture
+def calendar_db(tmp_path, monkeypatch):
+    """An empty calendar database, set as CALENDAR_DB_PATH."""
+    db_path = str(tmp_path / "calendar_llm.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(EVENTS_DDL)
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("CALENDAR_DB_PATH", db_path)
+    yield db_path
+    db_pool.close_all()
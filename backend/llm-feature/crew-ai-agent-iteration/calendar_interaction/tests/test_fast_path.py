@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from calendar_interaction.fast_path import parse_command
+
+NOW = datetime(2030, 1, 7, 10, 0)  # a Monday
+
+
+@pytest.mark.parametrize("message, title, start", [
+    ("lunch with Sam at 1pm tomorrow", "Lunch with Sam", datetime(2030, 1, 8, 13, 0)),
+    ("schedule dentist tomorrow at 9am", "Dentist", datetime(2030, 1, 8, 9, 0)),
+    ("add gym at 6pm for 30 minutes tomorrow", "Gym", datetime(2030, 1, 8, 18, 0)),
+    ("book a call with Ana at 3pm friday", "Call with Ana", datetime(2030, 1, 11, 15, 0)),
+])
+def test_create(message, title, start):
+    parsed = parse_command(message, NOW)
+    assert parsed["intent"] == "create_event"
+    assert parsed["fields"]["title"] == title
+    assert parsed["fields"]["start"] == start
+
+
+@pytest.mark.parametrize("message", [
+    "don't schedule anything at 3pm tomorrow",
+    "do not schedule anything at 3pm tomorrow",
+    "drop gym at 6pm tomorrow",
+    "skip standup at 9am tomorrow",
+    "nothing at 3pm tomorrow",
+    "no meetings at 3pm tomorrow",
+    "remind me to call mom at 5pm tomorrow",
+    "cancel standup at 9am tomorrow",
+    "move lunch at 1pm tomorrow",
+    "schedule nothing at 3pm tomorrow",
+    "lunch is not at 1pm tomorrow",
+    "wake me up at 7am tomorrow",
+])
+def test_negations_and_commands_fall_through(message):
+    assert parse_command(message, NOW) is None
@@ -0,0 +1,61 @@
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from calendar_interaction import db_pool
+from calendar_interaction.llm_cache import LLMResponseCache
+from calendar_interaction.tools.sqlite_tool import _free_busy, _run_sql
+
+MONDAY = date.today() - timedelta(days=date.today().weekday())
+RANGE = (f"{MONDAY}T00:00:00", f"{MONDAY + timedelta(days=14)}T00:00:00")
+
+
+def add_standup():
+    _run_sql("INSERT INTO events (title, start_time, end_time, rrule) VALUES (?, ?, ?, ?)",
+             ("Standup", f"{MONDAY}T09:00:00", f"{MONDAY}T09:15:00", "FREQ=WEEKLY"))
+
+
+def cached_buckets(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM occurrence_windows").fetchone()[0]
+
+
+def clear_cache(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM occurrence_windows")
+        conn.execute("DELETE FROM event_occurrences")
+
+
+def test_cache_fill_skips_a_locked_database(calendar_db, monkeypatch):
+    monkeypatch.setenv("CALENDAR_DB_BUSY_TIMEOUT_MS", "2000")
+    db_pool.close_all()
+    add_standup()
+    clear_cache(calendar_db)
+    writer = db_pool.get_manager(calendar_db).writer()
+
+    other = sqlite3.connect(calendar_db)
+    other.execute("BEGIN IMMEDIATE")
+    started = time.perf_counter()
+    result = _free_busy(*RANGE)
+    assert time.perf_counter() - started < 1.0
+    other.rollback()
+    other.close()
+
+    assert result["success"] and len(result["busy"]) == 2
+    assert not writer.in_transaction
+    assert cached_buckets(calendar_db) == 0
+
+    assert _free_busy(*RANGE)["busy"] == result["busy"]
+    assert cached_buckets(calendar_db) > 0
+
+
+def test_cache_fill_keeps_llm_answers(calendar_db, tmp_path):
+    add_standup()
+    clear_cache(calendar_db)
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), calendar_db)
+    _free_busy(*RANGE)
+    assert cached_buckets(calendar_db) > 0
+    assert not cache.check_data_version()
+
+    _run_sql("UPDATE events SET title = 'Daily sync' WHERE id = 1")
+    assert cache.check_data_version()
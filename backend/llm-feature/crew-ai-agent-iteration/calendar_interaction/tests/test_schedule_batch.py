@@ -0,0 +1,39 @@
+from calendar_interaction.db_pool import get_manager
+from calendar_interaction.tools.sqlite_tool import _run_sql, _schedule_batch
+
+
+def batch(title: str) -> dict:
+    return {
+        "events": [{"title": title, "duration_minutes": 30}],
+        "window_start": "2030-01-07T09:00:00",
+        "window_end": "2030-01-07T17:00:00",
+    }
+
+
+def titles(db_path) -> list:
+    conn = get_manager(db_path).reader()
+    return [r[0] for r in conn.execute("SELECT title FROM events ORDER BY id")]
+
+
+def test_twice_on_same_connection(calendar_db):
+    first = _schedule_batch(batch("Review A"))
+    second = _schedule_batch(batch("Review B"))
+    assert first["success"], first
+    assert second["success"], second
+    assert titles(calendar_db) == ["Review A", "Review B"]
+
+
+def test_after_ordinary_write(calendar_db):
+    wrote = _run_sql("INSERT INTO events (title, start_time, end_time) VALUES "
+                     "('Standup', '2030-01-07T09:00:00', '2030-01-07T09:15:00')")
+    assert '"success": true' in wrote
+    result = _schedule_batch(batch("Review"))
+    assert result["success"], result
+    assert titles(calendar_db) == ["Standup", "Review"]
+
+
+def test_failure_leaves_no_transaction_open(calendar_db):
+    full = dict(batch("Too long"), events=[{"title": "Too long", "duration_minutes": 600}])
+    assert not _schedule_batch(full)["success"]
+    assert not get_manager(calendar_db).writer().in_transaction
+    assert _schedule_batch(batch("Review"))["success"]
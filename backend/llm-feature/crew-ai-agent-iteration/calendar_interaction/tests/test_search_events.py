@@ -0,0 +1,15 @@
+import json
+
+from calendar_interaction.tools.sqlite_tool import CREW_TOOLS, _run_sql
+
+
+def test_search_events_tool_finds_by_prefix(calendar_db):
+    for title in ("Lunch with Jake", "Dentist", "Jake's birthday"):
+        _run_sql("INSERT INTO events (title, start_time, end_time) VALUES "
+                 f"('{title.replace(chr(39), chr(39) * 2)}', '2030-01-07T12:00:00', "
+                 "'2030-01-07T13:00:00')")
+
+    found = json.loads(CREW_TOOLS["search_events_tool"]("jak lunch"))
+    assert found["success"]
+    assert [r["title"] for r in found["rows"]] == ["Lunch with Jake"]
+    assert found["rows"][0]["id"] == 1
@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from calendar_interaction.single_call import CalendarPlan, render_reply
+
+
+def make_plan(sql, reply_template, empty_reply="Nothing matched."):
+    return CalendarPlan(
+        intent="list_events",
+        fields={"title": None, "description": None, "start_time": None,
+                "end_time": None, "all_day": None, "location": None},
+        sql=sql, params=[], reply_template=reply_template, empty_reply=empty_reply,
+    )
+
+
+@pytest.mark.parametrize("template", ["Done {", "Done {0}", "Done {count.real.x}", "Done }"])
+def test_malformed_template_falls_back(template):
+    plan = make_plan("DELETE FROM events WHERE id = ?", template)
+    reply = render_reply(plan, {"success": True, "rows": [], "rows_affected": 2})
+    assert reply == "Done — 2 event(s) updated."
+
+
+def test_template_is_filled():
+    plan = make_plan("DELETE FROM events WHERE id = ?", "Removed {rows_affected}, kept {other}.")
+    reply = render_reply(plan, {"success": True, "rows": [], "rows_affected": 1})
+    assert reply == "Removed 1, kept {other}."
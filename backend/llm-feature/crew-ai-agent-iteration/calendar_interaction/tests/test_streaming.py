@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai.llms.base_llm import BaseLLM
+
+import crewai_runner
+
+# One answer per task, in the crew's order
+ANSWERS = [
+    'Thought: The user is just chatting.\nFinal Answer: {"intent": "chit_chat", "fields": {}}',
+    "Thought: No SQL is needed.\nFinal Answer: " + json.dumps(
+        {"intent": "chit_chat", "fields": {}, "sql": None, "notes": "no calendar change"}),
+    "Thought: I can reply directly.\nFinal Answer: Hello!",
+]
+
+
+class CannedLLM(BaseLLM):
+    def __init__(self, answer: str):
+        super().__init__(model="gpt-4.1-mini")
+        self.answer = answer
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        return self.answer
+
+
+@pytest.fixture
+def calendar_crew(calendar_db, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setattr(crewai_runner, "emit", lambda obj: None)
+    with crewai_runner.suppress_stdout_stderr():
+        crew = crewai_runner.build_pipeline()
+    for task, answer in zip(crew.tasks, ANSWERS):
+        task.agent.llm = CannedLLM(answer)
+    return crew
+
+
+def test_streaming_flags_do_not_leak(calendar_crew):
+    done = crewai_runner.run_streaming_request(calendar_crew, 1, "hi")
+    assert done["error"] is None, done["error"]
+    assert calendar_crew.stream is False
+    assert [agent.llm.stream for agent in calendar_crew.agents] == [False] * len(ANSWERS)
+
+    # The next, non-streaming request on the same crew runs as one
+    assert crewai_runner.run_request(calendar_crew, 2, "hi")["reply"] == "Hello!"
+    assert [agent.llm.stream for agent in calendar_crew.agents] == [False] * len(ANSWERS)
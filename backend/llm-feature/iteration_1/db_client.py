@@ -1,6 +1,6 @@
 from pathlib import Path
 import sqlite3
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
 # This file is at: backend/llm-feature/db_client.py
 # parents[0] -> "backend/llm-feature"
@@ -10,90 +10,217 @@ from typing import List, Dict, Any, Optional
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "dev_data" / "calendar_llm.db"
 
+# Shares the crew package's connection manager instead of reconnecting per
+# call. calendar_interaction is a dependency (see requirements.txt).
+from calendar_interaction.db_pool import get_manager
+from calendar_interaction.freebusy import free_busy as _free_busy
+from calendar_interaction.slots import find_slots
+from calendar_interaction.batch_scheduler import schedule_batch as _schedule_batch
+from calendar_interaction.changelog import (
+    changes_since as _changes_since, compact_changes as _compact_changes,
+    current_version, prune_changes as _prune_changes,
+)
+from calendar_interaction.conflicts import conflict_report as _conflict_report, find_conflicts
+from calendar_interaction.export import export_to_file, iter_events as _iter_events
+from calendar_interaction.ics_import import import_ics as _import_ics
+from calendar_interaction.schema import events_between, search_events as _search_events, DELETE_ON_DAY_SQL
 
-def get_connection():
-    """Create a sqlite3 connection to the Electron DB."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+
+def get_connection() -> sqlite3.Connection:
+    """
+    This thread's pooled read/write connection to the Electron DB
+    (WAL mode, busy_timeout). It is persistent: do not close it.
+    """
+    return get_manager(str(DB_PATH)).writer()
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """This thread's pooled read-only connection, for SELECTs."""
+    return get_manager(str(DB_PATH)).reader()
 
 def read_openai_key_from_db():
     """
     Read the OpenAI API key from the SQLite 'settings' table.
     Returns the key string, or None if not found.
     """
-    conn = get_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     cur.execute(
         "SELECT value FROM settings WHERE key = 'openai_api_key';"
     )
     row = cur.fetchone()
-    conn.close()
     return row[0] if row else None
 def get_openai_key() -> Optional[str]:
-    conn = get_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     cur.execute(
         "SELECT value FROM settings WHERE key = 'openai_api_key' LIMIT 1;"
     )
     row = cur.fetchone()
-    conn.close()
     return row["value"] if row else None
 
 
 def get_all_events() -> List[Dict[str, Any]]:
-    conn = get_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     cur.execute("SELECT * FROM events ORDER BY start_time ASC;")
     rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
     return rows
 
 
+def iter_events(start_iso: Optional[str] = None, end_iso: Optional[str] = None,
+                batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Like get_all_events() (optionally limited to a range), but streamed from
+    the cursor batch_size rows at a time instead of loaded all at once.
+    Recurring series come back as their master rows.
+    """
+    return _iter_events(get_read_connection(), start_iso, end_iso, batch_size)
+
+
+def change_version() -> int:
+    """Current change-log version; pass it to changes_since() later."""
+    return current_version(get_read_connection())
+
+
+def changes_since(version: int, limit: int = 1000, with_rows: bool = True) -> Dict[str, Any]:
+    """
+    Events changed after a change-log version, one entry per event:
+    {version, reset, more, changes: [{id, op, columns, row}]}. On reset,
+    reload everything and continue from the returned version (see
+    calendar_interaction/changelog.py).
+    """
+    return _changes_since(get_read_connection(), version, limit, with_rows)
+
+
+def prune_changes(max_age_days: float = 30, max_rows: int = 50000) -> int:
+    """Drop change-log history older/beyond the limits; returns rows removed."""
+    return _prune_changes(get_connection(), max_age_days, max_rows)
+
+
+def compact_changes() -> int:
+    """Merge each event's change-log rows into one; returns rows removed."""
+    return _compact_changes(get_connection())
+
+
 def get_events_between(start_iso: str, end_iso: str) -> List[Dict[str, Any]]:
     """
     Return all events that overlap [start_iso, end_iso).
+    Bounds may be naive local or UTC ("Z") ISO strings; matching uses the
+    start_utc/end_utc columns, narrowed by the events_rtree interval index
+    (see calendar_interaction/schema.py).
+    Recurring series are expanded into their occurrences for this range.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT *
-        FROM events
-        WHERE start_time < ?
-          AND end_time   > ?
-        ORDER BY start_time ASC;
-        """,
-        (end_iso, start_iso),
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return rows
+    return events_between(get_read_connection(), start_iso, end_iso, get_connection())
+
+
+def free_busy(start_iso: str, end_iso: str, granularity: int = 15,
+              include_all_day: bool = False) -> Dict[str, Any]:
+    """
+    Busy blocks and free gaps in [start_iso, end_iso): overlapping events
+    (recurring occurrences included) merged with a sorted sweep.
+    granularity (minutes) rounds busy blocks out to that grid, 0 = exact.
+    See calendar_interaction/freebusy.py for the result shape.
+    """
+    return _free_busy(get_read_connection(), start_iso, end_iso, granularity,
+                      include_all_day, get_connection())
+
+
+def find_free_slots(duration_minutes: int, window_start: str, window_end: str,
+                    **options) -> List[Dict[str, str]]:
+    """
+    Best free slots of duration_minutes in [window_start, window_end), as
+    [{start, end}] local ISO strings. options: work_start / work_end
+    ("HH:MM"), buffer_minutes, count, step_minutes, weekdays, not_before
+    (see calendar_interaction/slots.py).
+    """
+    return find_slots(get_read_connection(), duration_minutes, window_start,
+                      window_end, cache_conn=get_connection(), **options)
+
+
+def schedule_batch(events: List[Dict[str, Any]], window_start: str, window_end: str,
+                   **constraints) -> List[Dict[str, Any]]:
+    """
+    Place several events together and insert them in one transaction.
+    events: [{title, duration_minutes, description?, location?, earliest?,
+    latest?}]; constraints: min_gap_minutes, max_per_day, preferred_start /
+    preferred_end, work_start / work_end, buffer_minutes, ... (see
+    calendar_interaction/batch_scheduler.py). Returns the inserted rows;
+    raises BatchScheduleError (nothing inserted) if they do not fit.
+    """
+    return _schedule_batch(get_connection(), events, window_start, window_end, **constraints)
+
+
+def import_ics(path: str, progress=None) -> Dict[str, int]:
+    """
+    Import an .ics file, streamed and deduplicated by UID (see
+    calendar_interaction/ics_import.py). Returns the import counts.
+    """
+    return _import_ics(get_connection(), path, progress=progress)
+
+
+def export_events(path: str, fmt: Optional[str] = None,
+                  start_iso: Optional[str] = None, end_iso: Optional[str] = None) -> Dict[str, int]:
+    """
+    Stream events to an .ics or .jsonl file (format from the extension
+    unless given), optionally only a date range. Returns the export counts.
+    """
+    return export_to_file(get_read_connection(), path, fmt, start=start_iso, end=end_iso)
+
+
+def get_conflicts(event_id: int) -> List[Dict[str, Any]]:
+    """
+    Events overlapping the given event (an indexed overlap query), as
+    {id, title, start_time, end_time}; [] if it has none or is all-day.
+    """
+    found = find_conflicts(get_read_connection(), [event_id], get_connection())
+    return found[0]["conflicts_with"] if found else []
+
+
+def conflict_report(max_pairs: int = 1000) -> Dict[str, Any]:
+    """
+    Every overlapping pair of timed events in the calendar (vectorized with
+    NumPy when installed), e.g. to audit an imported calendar.
+    See calendar_interaction/conflicts.py for the result shape.
+    """
+    return _conflict_report(get_read_connection(), max_pairs)
+
+
+def search_events(text: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Events whose title, description or location contain every word of
+    text (prefix match, case- and accent-insensitive), best match first.
+    Served by the events_fts full-text index.
+    """
+    return _search_events(get_read_connection(), text, limit)
 
 
 def insert_event(event: Dict[str, Any]) -> int:
     """
-    event keys: title, description, start_time, end_time, all_day, location
+    event keys: title, description, start_time, end_time, all_day, location,
+    and optionally rrule (e.g. "FREQ=WEEKLY;BYDAY=MO") for a recurring series
+    whose first occurrence is start_time/end_time
     """
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO events (title, description, start_time, end_time, all_day, location)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            event.get("title"),
-            event.get("description", "") or "",
-            event.get("start_time"),
-            event.get("end_time"),
-            1 if event.get("all_day") else 0,
-            event.get("location", "") or "",
-        ),
-    )
-    eid = cur.lastrowid
-    conn.commit()
-    conn.close()
+    # Commits on success, rolls back on error (the connection stays open)
+    with conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO events (title, description, start_time, end_time, all_day, location, rrule)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                event.get("title"),
+                event.get("description", "") or "",
+                event.get("start_time"),
+                event.get("end_time"),
+                1 if event.get("all_day") else 0,
+                event.get("location", "") or "",
+                event.get("rrule") or None,
+            ),
+        )
+        eid = cur.lastrowid
     return eid
 
 
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional, List
 
@@ -17,8 +17,16 @@ from db_client import (
     read_openai_key_from_db,
     insert_event,
     get_all_events,
+    find_free_slots,
+    get_conflicts,
 )
 
+DEFAULT_DURATION_MINUTES = 60
+
+
+class NoFreeSlotError(Exception):
+    """No time was given and no free slot fits the requested window."""
+
 # ---------- LLM helper ----------
 
 def get_llm() -> ChatOpenAI:
@@ -47,8 +55,10 @@ def parse_nl_to_event(
       - title (str)
       - description (str)
       - date (YYYY-MM-DD)
+      - date_end (YYYY-MM-DD or null): last day of a window like "next week"
       - start_time ('HH:MM' or null)
       - end_time ('HH:MM' or null)
+      - duration_minutes (int or null)
       - all_day (bool)
       - location (str)
     """
@@ -79,16 +89,22 @@ def parse_nl_to_event(
                     "- title (string)\n"
                     "- description (string)\n"
                     "- date (string, 'YYYY-MM-DD')\n"
+                    "- date_end (string, 'YYYY-MM-DD' or null)\n"
                     "- start_time (string, 'HH:MM' 24-hour or null)\n"
                     "- end_time (string, 'HH:MM' 24-hour or null)\n"
+                    "- duration_minutes (integer or null)\n"
                     "- all_day (boolean)\n"
                     "- location (string)\n\n"
                     "Rules:\n"
                     "- date must be in 'YYYY-MM-DD' format.\n"
                     "- start_time and end_time must be 'HH:MM' 24-hour format, "
                     "  or null if all_day is true.\n"
-                    "- If no time is given but it's not clearly all-day, you may "
-                    "  choose a reasonable time (e.g. 09:00–10:00)."
+                    "- If no time is given, set start_time and end_time to null "
+                    "  (a free slot is picked from the calendar) and set "
+                    "  duration_minutes if the user said how long.\n"
+                    "- If the user gave a range of days instead of one day "
+                    "  (e.g. 'sometime next week'), date is its first day and "
+                    "  date_end its last day; otherwise date_end is null."
                 ),
             ),
         ]
@@ -108,7 +124,9 @@ def parse_nl_to_event(
 def nl_to_event_and_insert(user_text: str) -> Dict[str, Any]:
     """
     Parse the user's request into an event, then insert it into SQLite.
-    Returns the full DB row as a dict.
+    Returns the full DB row as a dict, plus "conflicts": the events it
+    overlaps. Raises NoFreeSlotError (nothing is inserted) when no time was
+    given and the requested window has no free slot.
     """
     parsed = parse_nl_to_event(user_text)
 
@@ -120,9 +138,11 @@ def nl_to_event_and_insert(user_text: str) -> Dict[str, Any]:
     if all_day:
         start_iso = f"{date_str}T00:00:00"
         end_iso = f"{date_str}T23:59:59"
-    else:
+    elif start_time and end_time:
         start_iso = f"{date_str}T{start_time}:00"
         end_iso = f"{date_str}T{end_time}:00"
+    else:
+        start_iso, end_iso = pick_free_slot(parsed)
 
     event_row = {
         "title": parsed["title"],
@@ -135,9 +155,45 @@ def nl_to_event_and_insert(user_text: str) -> Dict[str, Any]:
 
     event_id = insert_event(event_row)
     event_row["id"] = event_id
+    event_row["conflicts"] = get_conflicts(event_id)
     return event_row
 
 
+def pick_free_slot(parsed: Dict[str, Any]) -> tuple:
+    """
+    (start_iso, end_iso) for a parsed event without an exact time: the best
+    free slot on its date (or date..date_end) within working hours, starting
+    at start_time if only that was given. Raises NoFreeSlotError when the
+    window is fully booked, rather than picking a time known to collide.
+    """
+    date_str = parsed["date"]
+    duration = int(parsed.get("duration_minutes") or DEFAULT_DURATION_MINUTES)
+    last_day = datetime.strptime(parsed.get("date_end") or date_str, "%Y-%m-%d")
+
+    if parsed.get("start_time"):
+        # Start known, end missing: just apply the duration
+        start = datetime.strptime(f"{date_str} {parsed['start_time']}", "%Y-%m-%d %H:%M")
+        return start.isoformat(), (start + timedelta(minutes=duration)).isoformat()
+
+    options = {"count": 1}
+    if not parsed.get("date_end"):
+        options["weekdays"] = range(7)  # the user named this day, even a weekend
+    slots = find_free_slots(
+        duration,
+        f"{date_str}T00:00:00",
+        (last_day + timedelta(days=1)).strftime("%Y-%m-%dT00:00:00"),
+        **options,
+    )
+    if not slots:
+        when = date_str if not parsed.get("date_end") else f"{date_str} to {parsed['date_end']}"
+        raise NoFreeSlotError(
+            f"I couldn't find a free {duration}-minute slot for "
+            f"**{parsed.get('title') or 'that'}** ({when}), so I didn't add it. "
+            "Tell me a time and I'll book it anyway."
+        )
+    return slots[0]["start"], slots[0]["end"]
+
+
 # ---------- SQL agent for calendar questions ----------
 
 def get_sql_db() -> SQLDatabase:
@@ -4,17 +4,17 @@ from __future__ import annotations
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import sqlite3
 import uvicorn
 
 # Use your existing integration module
 from langchain_integration import (
     nl_to_event_and_insert,
+    NoFreeSlotError,
     answer_calendar_question,
     get_llm,
 )
 
-from db_client import DB_PATH
+from db_client import DB_PATH, get_connection, DELETE_ON_DAY_SQL
 
 
 # ---------- FastAPI app ----------
@@ -42,22 +42,18 @@ class ChatResponse(BaseModel):
 
 def delete_events_on_date(date_str: str) -> int:
     """
-    Delete events whose start_time falls on the given YYYY-MM-DD date.
-    Returns the number of rows deleted.
+    Delete events whose start_time falls on the given YYYY-MM-DD date
+    (local day). Returns the number of rows deleted.
 
-    Uses DB_PATH from db_client and sqlite3 directly,
-    so we don't have to change db_client.py.
+    Uses db_client's pooled connection for DB_PATH. Matches on the indexed
+    day_key column, so any stored time format works and the lookup is an
+    index seek.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    # Assumes start_time is stored like 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SS'
-    cur.execute(
-        "DELETE FROM events WHERE date(start_time) = date(?)",
-        (date_str,),
-    )
-    deleted = cur.rowcount
-    conn.commit()
-    conn.close()
+    conn = get_connection()
+    with conn:
+        cur = conn.cursor()
+        cur.execute(DELETE_ON_DAY_SQL, (date_str[:10],))
+        deleted = cur.rowcount
     return deleted
 
 
@@ -174,10 +170,18 @@ def chat(req: ChatRequest):
                 lines.append(f"• Location: {location}")
             if description:
                 lines.append(f"• Notes: {description}")
+            conflicts = evt.get("conflicts") or []
+            if conflicts:
+                lines.append("")
+                lines.append("Heads up, this overlaps with:")
+                for other in conflicts:
+                    lines.append(f"• {other['title']} ({other['start_time']} – {other['end_time']})")
             lines.append("")
             lines.append("You should see it in your calendar now.")
 
             return ChatResponse(reply="\n".join(lines))
+        except NoFreeSlotError as e:
+            return ChatResponse(reply=str(e))
         except Exception as e:
             print("[calendar_llm] schedule error:", e)
             return ChatResponse(
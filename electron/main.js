@@ -110,7 +110,7 @@
 // electron/main.js with crew ai
 // electron/main.js with crew ai
 
-const { app, BrowserWindow, ipcMain } = require("electron");
+const { app, BrowserWindow, ipcMain, dialog } = require("electron");
 const path = require("path");
 const { spawn } = require("child_process");
 
@@ -125,7 +125,7 @@ let mainWindow = null;
 // Python process + LLM request tracking
 let pythonProc = null;
 let nextRequestId = 1;
-const pendingLLMRequests = new Map(); // id -> { resolve, reject }
+const pendingLLMRequests = new Map(); // id -> { resolve, reject, onChunk?, onProgress? }
 
 function createWindow() {
     mainWindow = new BrowserWindow({
@@ -191,6 +191,7 @@ function startPythonBackend() {
     const dbPath = path.join(userDataPath, "calendar_llm.db");
 
     console.log("Starting Python backend...");
+    const spawnedAt = Date.now();
     pythonProc = spawn(
         pythonExecutable,
         scriptArgs,
@@ -221,10 +222,58 @@ function startPythonBackend() {
                 return;
             }
 
+            // Sent once the runner reads requests; startup_ms and phases
+            // are measured inside Python, this adds process/bundle startup
+            if (msg.type === "ready") {
+                console.log(
+                    `[PYTHON] ready ${Date.now() - spawnedAt} ms after spawn ` +
+                    `(runner startup ${msg.startup_ms} ms)`,
+                    msg.phases
+                );
+                return;
+            }
+
             if (msg.type === "log") {
                 const level = msg.level || "log";
                 const logFn = level === "error" ? console.error : console.log;
                 logFn("[PYTHON LOG]", msg.message);
+                // Long-running commands (ics import) report progress here
+                if (msg.progress) {
+                    const pending = pendingLLMRequests.get(msg.id);
+                    if (pending && pending.onProgress) {
+                        pending.onProgress(msg.progress);
+                    }
+                }
+                return;
+            }
+
+            // Stage timings of a finished request; it carries the request's id
+            // but arrives after its reply, so it must not resolve anything
+            if (msg.type === "metrics") {
+                console.log("[PYTHON METRICS]", JSON.stringify(msg));
+                return;
+            }
+
+            // Writes the LLM made: forward the new rows so the calendar can
+            // patch its state instead of re-reading its range
+            if (msg.type === "events_changed") {
+                if (mainWindow && !mainWindow.isDestroyed()) {
+                    mainWindow.webContents.send("events:changed", {
+                        op: msg.op,
+                        ids: msg.ids,
+                        rows: msg.rows,
+                    });
+                }
+                return;
+            }
+
+            // Streaming: partial responder output; the request stays pending
+            // until its { type: "done", id, reply, error } line arrives.
+            if (msg.type === "chunk") {
+                const pending = pendingLLMRequests.get(msg.id);
+                if (pending && pending.onChunk) {
+                    pending.onChunk(msg.delta);
+                }
                 return;
             }
 
@@ -237,7 +286,7 @@ function startPythonBackend() {
             if (error) {
                 pending.reject(new Error(error));
             } else {
-                pending.resolve(reply);
+                pending.resolve(pending.raw ? msg : reply);
             }
         });
     });
@@ -334,26 +383,46 @@ ipcMain.handle("events:get-all", () => {
     return db.getAllEvents();
 });
 
+// Changes since a change-log version: { version, reset, more, changes }.
+// version null (or pruned history) -> reset: reload, then continue from version.
+ipcMain.handle("events:changes-since", (event, version) => {
+    return db.getChangesSince(version);
+});
+
 /* --------- Settings (OpenAI API key) --------- */
 
 ipcMain.handle("settings:get-openai-key", () => {
     return db.getOpenAIKey();
 });
 
-ipcMain.handle("settings:set-openai-key", (event, key) => {
+// The running backend re-reads the key and rebuilds its LLM clients in
+// place: no restart, and requests already running finish on the old key.
+ipcMain.handle("settings:set-openai-key", async (event, key) => {
     db.setOpenAIKey(key);
-    console.log("API Key updated. Restarting Python backend...");
 
-    if (pythonProc) {
-        pythonProc.kill();
-        pythonProc = null;
+    if (!pythonProc) {
+        startPythonBackend(); // reads the key itself on startup
+        return { ok: true };
     }
 
-    // Give it a moment to die cleanly, then restart
-    setTimeout(() => {
-        startPythonBackend();
-    }, 500);
+    console.log("API Key updated. Reloading Python backend settings...");
+    const id = nextRequestId++;
+    const payload = { id, type: "reload_settings" };
 
+    try {
+        await new Promise((resolve, reject) => {
+            pendingLLMRequests.set(id, { resolve, reject });
+            try {
+                pythonProc.stdin.write(JSON.stringify(payload) + "\n");
+            } catch (e) {
+                pendingLLMRequests.delete(id);
+                reject(e);
+            }
+        });
+    } catch (e) {
+        console.error("Reloading Python backend settings failed:", e.message);
+        return { ok: false, error: e.message };
+    }
     return { ok: true };
 });
 
@@ -377,4 +446,130 @@ ipcMain.handle("llm:chat", async (event, message) => {
             reject(e);
         }
     });
-});
\ No newline at end of file
+});
+
+// Streaming variant: { message, streamKey } -> resolves with the full reply,
+// while partial text is pushed to the renderer as "llm:chunk" { streamKey, delta }.
+ipcMain.handle("llm:chat-stream", async (event, { message, streamKey }) => {
+    if (!pythonProc) {
+        throw new Error("Python LLM backend is not running.");
+    }
+
+    const id = nextRequestId++;
+    const payload = { id, message, stream: true };
+    const sender = event.sender;
+
+    return new Promise((resolve, reject) => {
+        pendingLLMRequests.set(id, {
+            resolve,
+            reject,
+            onChunk: (delta) => {
+                if (!sender.isDestroyed()) {
+                    sender.send("llm:chunk", { streamKey, delta });
+                }
+            },
+        });
+
+        try {
+            pythonProc.stdin.write(JSON.stringify(payload) + "\n");
+        } catch (e) {
+            pendingLLMRequests.delete(id);
+            reject(e);
+        }
+    });
+});
+
+/* --------- Calendar import / export --------- */
+// Import an .ics file through the Python backend (streamed, deduped by UID).
+// filePath is optional: without it the user picks a file. Resolves with
+// { reply, import: counts }, or null if the dialog was cancelled; progress
+// counts are pushed to the renderer as "events:import-progress".
+ipcMain.handle("events:import-ics", async (event, filePath) => {
+    if (!pythonProc) {
+        throw new Error("Python LLM backend is not running.");
+    }
+
+    if (!filePath) {
+        const picked = await dialog.showOpenDialog(mainWindow, {
+            properties: ["openFile"],
+            filters: [{ name: "iCalendar", extensions: ["ics"] }],
+        });
+        if (picked.canceled || picked.filePaths.length === 0) {
+            return null;
+        }
+        filePath = picked.filePaths[0];
+    }
+
+    const id = nextRequestId++;
+    const payload = { id, type: "import_ics", path: filePath };
+    const sender = event.sender;
+
+    return new Promise((resolve, reject) => {
+        pendingLLMRequests.set(id, {
+            resolve: (msg) => resolve({ reply: msg.reply, import: msg.import }),
+            reject,
+            raw: true,
+            onProgress: (counts) => {
+                if (!sender.isDestroyed()) {
+                    sender.send("events:import-progress", counts);
+                }
+            },
+        });
+
+        try {
+            pythonProc.stdin.write(JSON.stringify(payload) + "\n");
+        } catch (e) {
+            pendingLLMRequests.delete(id);
+            reject(e);
+        }
+    });
+});
+
+// Export events through the Python backend, streamed to a file.
+// options: { filePath?, format?: "ics" | "jsonl", start?, end? } (ISO range).
+// Without filePath the user picks one. Resolves with { reply, export: counts },
+// or null if cancelled; progress goes out as "events:export-progress".
+ipcMain.handle("events:export", async (event, options = {}) => {
+    if (!pythonProc) {
+        throw new Error("Python LLM backend is not running.");
+    }
+
+    let { filePath, format, start, end } = options;
+    if (!filePath) {
+        const picked = await dialog.showSaveDialog(mainWindow, {
+            defaultPath: format === "jsonl" ? "calendar.jsonl" : "calendar.ics",
+            filters: [
+                { name: "iCalendar", extensions: ["ics"] },
+                { name: "JSON Lines", extensions: ["jsonl"] },
+            ],
+        });
+        if (picked.canceled || !picked.filePath) {
+            return null;
+        }
+        filePath = picked.filePath;
+    }
+
+    const id = nextRequestId++;
+    const payload = { id, type: "export_events", path: filePath, format, start, end };
+    const sender = event.sender;
+
+    return new Promise((resolve, reject) => {
+        pendingLLMRequests.set(id, {
+            resolve: (msg) => resolve({ reply: msg.reply, export: msg.export }),
+            reject,
+            raw: true,
+            onProgress: (counts) => {
+                if (!sender.isDestroyed()) {
+                    sender.send("events:export-progress", counts);
+                }
+            },
+        });
+
+        try {
+            pythonProc.stdin.write(JSON.stringify(payload) + "\n");
+        } catch (e) {
+            pendingLLMRequests.delete(id);
+            reject(e);
+        }
+    });
+});
@@ -9,6 +9,18 @@ contextBridge.exposeInMainWorld("calendarDB", {
     getAllEvents: () =>
         ipcRenderer.invoke("events:get-all"),
 
+    // version: number | null → { version, reset, more, changes: [{ id, op, row? }] }
+    getChangesSince: (version) =>
+        ipcRenderer.invoke("events:changes-since", version),
+
+    // callback: ({ op, ids, rows }) => void, called for every write the
+    // LLM makes (rows: new values, [] for deletes) → returns an unsubscribe
+    onEventsChanged: (callback) => {
+        const listener = (_event, change) => callback(change);
+        ipcRenderer.on("events:changed", listener);
+        return () => ipcRenderer.removeListener("events:changed", listener);
+    },
+
     addEvent: (event) =>
         ipcRenderer.invoke("events:add", event),
 
@@ -18,6 +30,35 @@ contextBridge.exposeInMainWorld("calendarDB", {
     deleteEvent: (id) =>
         ipcRenderer.invoke("events:delete", id),
 
+    // filePath?: string, onProgress?: (counts) => void → returns
+    // { reply, import: counts }, or null if the file dialog was cancelled.
+    importIcs: async (filePath, onProgress) => {
+        const listener = (_event, counts) => {
+            if (onProgress) onProgress(counts);
+        };
+        ipcRenderer.on("events:import-progress", listener);
+        try {
+            return await ipcRenderer.invoke("events:import-ics", filePath);
+        } finally {
+            ipcRenderer.removeListener("events:import-progress", listener);
+        }
+    },
+
+    // options?: { filePath, format: "ics" | "jsonl", start, end },
+    // onProgress?: (counts) => void → returns { reply, export: counts },
+    // or null if the save dialog was cancelled.
+    exportEvents: async (options, onProgress) => {
+        const listener = (_event, counts) => {
+            if (onProgress) onProgress(counts);
+        };
+        ipcRenderer.on("events:export-progress", listener);
+        try {
+            return await ipcRenderer.invoke("events:export", options || {});
+        } finally {
+            ipcRenderer.removeListener("events:export-progress", listener);
+        }
+    },
+
     // ----- Settings (OpenAI API key) -----
     getOpenAIKey: () =>
         ipcRenderer.invoke("settings:get-openai-key"),
@@ -29,4 +70,21 @@ contextBridge.exposeInMainWorld("calendarDB", {
     // message: string → returns: reply string from Python CrewAI
     llmChat: (message) =>
         ipcRenderer.invoke("llm:chat", message),
+
+    // message: string, onDelta: (text) => void → returns: full reply string.
+    // onDelta is called with each piece of the reply as it streams in.
+    llmChatStream: async (message, onDelta) => {
+        const streamKey = `${Date.now()}-${Math.random()}`;
+        const listener = (_event, chunk) => {
+            if (chunk.streamKey === streamKey && onDelta) {
+                onDelta(chunk.delta);
+            }
+        };
+        ipcRenderer.on("llm:chunk", listener);
+        try {
+            return await ipcRenderer.invoke("llm:chat-stream", { message, streamKey });
+        } finally {
+            ipcRenderer.removeListener("llm:chunk", listener);
+        }
+    },
 });
\ No newline at end of file
@@ -112,14 +112,17 @@ export default function App() {
   };
 
   // 🔹 NEW: use Electron IPC -> Python instead of HTTP fetch
-  const handleLlmSend = async (message) => {
+  const handleLlmSend = async (message, onDelta) => {
     try {
       if (!window.calendarDB?.llmChat) {
         console.error("calendarDB.llmChat is not available");
         return "LLM backend is not available in this environment.";
       }
 
-      const reply = await window.calendarDB.llmChat(message);
+      // Prefer streaming so the reply starts showing before the crew finishes
+      const reply = window.calendarDB.llmChatStream
+        ? await window.calendarDB.llmChatStream(message, onDelta)
+        : await window.calendarDB.llmChat(message);
       return reply || "I didn't get a reply from the calendar LLM.";
     } catch (err) {
       console.error("Error calling LLM backend via IPC:", err);
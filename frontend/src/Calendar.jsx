@@ -38,6 +38,36 @@ const containerStyle = {
 
 const INITIAL_EVENTS = [];
 
+// events row from SQLite -> FullCalendar event. Occurrences of a recurring
+// series (is_occurrence) share the series' row id, so each gets its own
+// calendar id; eventId is always the events row to write to.
+function toCalendarEvent(row) {
+  const recurring = !!row.is_occurrence;
+  return {
+    id: recurring ? `${row.id}@${row.start_time}` : row.id.toString(),
+    title: row.title,
+    start: row.start_time,
+    end: row.end_time,
+    allDay: !!row.all_day,
+    notes: row.description || "",
+    // A single occurrence cannot be dragged: edits apply to the whole series
+    editable: !recurring,
+    extendedProps: {
+      notes: row.description || "",
+      location: row.location || "",
+      eventId: row.id,
+      recurring,
+      seriesStart: row.series_start_time,
+      seriesEnd: row.series_end_time,
+    },
+  };
+}
+
+// The events row behind a calendar event (the series for an occurrence)
+function rowId(evt) {
+  return evt?.extendedProps?.eventId ?? Number(evt?.id);
+}
+
 export default function Calendar() {
   const [events, setEvents] = useState(INITIAL_EVENTS);
 
@@ -49,57 +79,110 @@ export default function Calendar() {
 
   const idCounter = useRef(3);
 
-  // 🔹 Load events from SQLite on mount + poll so LLM changes show up
+  // 🔹 Load events from SQLite on mount, then poll the change log so LLM
+  // changes show up: only events changed since the last poll are re-read.
   useEffect(() => {
     let isMounted = true;
+    let version = null; // change-log version the current events reflect
+    let polling = false; // a slow poll must not overlap the next tick
+    let seriesIds = new Set(); // recurring series shown in the current range
 
-    async function loadEvents() {
-      if (!window.calendarDB?.getEventsInRange) return;
-
-      // wide range: 1 year back to 1 year forward
+    // wide range: 1 year back to 1 year forward
+    function loadRange() {
       const now = new Date();
       const start = new Date(now);
       start.setFullYear(now.getFullYear() - 1);
       const end = new Date(now);
       end.setFullYear(now.getFullYear() + 1);
+      return { start, end };
+    }
+
+    async function loadEvents(range) {
+      const rows = await window.calendarDB.getEventsInRange(
+        range.start.toISOString(),
+        range.end.toISOString()
+      );
+      if (!isMounted) return;
+      seriesIds = new Set(rows.filter(r => r.is_occurrence).map(r => r.id.toString()));
+      setEvents(rows.map(toCalendarEvent));
+    }
+
+    function applyChanges(changes, range) {
+      // A series' occurrences come from getEventsInRange's expansion, not
+      // from its row: re-read the range when one is involved
+      if (changes.some(c => (c.row && c.row.rrule) || seriesIds.has(c.id.toString()))) {
+        return loadEvents(range);
+      }
+      const lo = range.start.getTime() / 1000;
+      const hi = range.end.getTime() / 1000;
+      setEvents(prev => {
+        const byId = new Map(prev.map(e => [e.id, e]));
+        for (const change of changes) {
+          const id = change.id.toString();
+          const row = change.row;
+          // Same window as loadEvents(); rows with unparseable times are kept
+          const inRange = row && (row.start_utc == null || row.end_utc == null ||
+            (row.start_utc < hi && row.end_utc > lo));
+          if (change.op === "delete" || !inRange) {
+            byId.delete(id);
+          } else {
+            byId.set(id, toCalendarEvent(row));
+          }
+        }
+        return [...byId.values()];
+      });
+    }
+
+    async function poll() {
+      if (!window.calendarDB?.getEventsInRange || polling) return;
 
+      polling = true;
       try {
-        const rows = await window.calendarDB.getEventsInRange(
-          start.toISOString(),
-          end.toISOString()
-        );
-
-        if (!isMounted) return;
-
-        const mapped = rows.map(row => ({
-          id: row.id.toString(),
-          title: row.title,
-          start: row.start_time,
-          end: row.end_time,
-          allDay: !!row.all_day,
-          notes: row.description || "",
-          extendedProps: {
-            notes: row.description || "",
-            location: row.location || "",
-          },
-        }));
-
-        setEvents(mapped);
+        const range = loadRange();
+        if (!window.calendarDB.getChangesSince) {
+          await loadEvents(range);
+          return;
+        }
+
+        let delta = await window.calendarDB.getChangesSince(version);
+        while (isMounted) {
+          if (delta.reset) {
+            // First load, or the log was pruned past our version
+            await loadEvents(range);
+            version = delta.version;
+            return;
+          }
+          if (delta.changes.length) await applyChanges(delta.changes, range);
+          version = delta.version;
+          if (!delta.more) return;
+          delta = await window.calendarDB.getChangesSince(version);
+        }
       } catch (err) {
         console.error("Failed to load events from DB:", err);
+      } finally {
+        polling = false;
       }
     }
 
     // initial load
-    loadEvents();
+    poll();
+
+    // LLM writes are pushed with their new rows as they happen
+    const unsubscribe = window.calendarDB?.onEventsChanged?.(({ op, ids, rows }) => {
+      if (!isMounted) return;
+      const byId = new Map(rows.map(row => [row.id, row]));
+      applyChanges(ids.map(id => ({ id, op, row: byId.get(id) })), loadRange());
+    });
 
-    // ✅ poll every 5 seconds so LLM changes are picked up
-    const intervalId = setInterval(loadEvents, 1000);
+    // ✅ poll every second too: it catches every other writer (and anything
+    // a push missed); applying a change twice is harmless
+    const intervalId = setInterval(poll, 1000);
 
     // cleanup on unmount
     return () => {
       isMounted = false;
       clearInterval(intervalId);
+      if (unsubscribe) unsubscribe();
     };
   }, []);
 
@@ -165,15 +248,19 @@ export default function Calendar() {
   // 🔹 Update event: React state + SQLite
   async function handleUpdate(updated) {
     const { id, title, start, end, allDay, notes } = updated;
+    const current = events.find(e => e.id === id);
+    const series = current?.extendedProps?.recurring ? current.extendedProps : null;
 
     if (window.calendarDB?.updateEvent) {
       try {
+        // For an occurrence: title and notes change for the whole series,
+        // which keeps its own times
         const dbEvent = {
-          id: Number(id),
+          id: rowId(current ?? { id }),
           title,
           description: notes || "",
-          start_time: start,
-          end_time: end,
+          start_time: series ? series.seriesStart : start,
+          end_time: series ? series.seriesEnd : end,
           all_day: allDay ? 1 : 0,
           location: "",
         };
@@ -184,24 +271,34 @@ export default function Calendar() {
     }
 
     setEvents(prev =>
-      prev.map(e =>
-        e.id === id ? { ...e, title, start, end, allDay, notes } : e
-      )
+      prev.map(e => {
+        if (series) {
+          return rowId(e) === series.eventId ? { ...e, title, notes } : e;
+        }
+        return e.id === id ? { ...e, title, start, end, allDay, notes } : e;
+      })
     );
     setOpen(false);
   }
 
   // 🔹 Delete event: React state + SQLite
   async function handleDelete(id) {
+    const current = events.find(e => e.id === id);
+    const dbId = rowId(current ?? { id });
+    if (current?.extendedProps?.recurring &&
+        !window.confirm("This is a repeating event. Delete every occurrence?")) {
+      return;
+    }
+
     if (window.calendarDB?.deleteEvent) {
       try {
-        await window.calendarDB.deleteEvent(Number(id));
+        await window.calendarDB.deleteEvent(dbId);
       } catch (err) {
         console.error("Failed to delete event from DB:", err);
       }
     }
 
-    setEvents(prev => prev.filter(e => e.id !== id));
+    setEvents(prev => prev.filter(e => rowId(e) !== dbId));
     setOpen(false);
   }
 
@@ -234,19 +234,34 @@ export default function LlmChatBox({ onSend }) {
         setInput("");
         setIsLoading(true);
 
+        // Drops the in-progress streamed bubble (if any) so the final reply replaces it
+        const withoutStreaming = (prev) =>
+            prev.length && prev[prev.length - 1].streaming ? prev.slice(0, -1) : prev;
+
         if (onSend) {
             try {
-                const reply = await onSend(trimmed);
+                const reply = await onSend(trimmed, (delta) => {
+                    setMessages((prev) => {
+                        const last = prev[prev.length - 1];
+                        if (last && last.streaming) {
+                            return [
+                                ...prev.slice(0, -1),
+                                { ...last, content: last.content + delta },
+                            ];
+                        }
+                        return [...prev, { role: "assistant", content: delta, streaming: true }];
+                    });
+                });
                 if (reply) {
                     setMessages((prev) => [
-                        ...prev,
+                        ...withoutStreaming(prev),
                         { role: "assistant", content: reply },
                     ]);
                 }
             } catch (err) {
                 console.error("LLM error:", err);
                 setMessages((prev) => [
-                    ...prev,
+                    ...withoutStreaming(prev),
                     {
                         role: "assistant",
                         content: "Sorry, something went wrong talking to the LLM.",